@@ -0,0 +1,156 @@
+"""
+Acceso a la tabla del compendio: los pedidos al server pasan por acá.
+
+- Los errores transitorios (red, timeouts, 5xx, 429) se reintentan con
+  espera exponencial; si se agotan los reintentos, o el error no es de los
+  que se arreglan solos, se lanza ErrorDeDatos diciendo qué se estaba
+  pidiendo. Nada falla en silencio.
+- Varias lecturas se mandan juntas (leer_varios / traer_por_ids): salen en
+  paralelo por la sesión HTTP compartida de conexion (keep-alive, HTTP/2 si
+  está instalado h2), así N tandas cuestan más o menos una ida y vuelta.
+- Las escrituras masivas van por tandas de ids con in_.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import medicion
+
+REINTENTOS = int(os.environ.get("COMPENDIO_REINTENTOS", "3"))
+ESPERA_REINTENTO = 0.4  # segundos; se duplica en cada reintento
+PEDIDOS_PARALELOS = int(os.environ.get("COMPENDIO_PEDIDOS_PARALELOS", "4"))
+LOTE_IDS = 50
+
+# estados HTTP que vale la pena reintentar
+_HTTP_TRANSITORIOS = {408, 425, 429, 500, 502, 503, 504, 520, 522, 524}
+# códigos de PostgREST / Postgres que vienen de un problema pasajero del server
+# (timeout de la consulta, conexión a la base, deadlock, sin conexiones libres...)
+_PG_TRANSITORIOS = {"57014", "57P01", "57P03", "53300", "40001", "40P01", "PGRST000", "PGRST001", "PGRST002"}
+
+
+class ErrorDeDatos(RuntimeError):
+    """Falló un pedido al server. 'hechos' son los ids que sí se procesaron (escrituras por tandas)."""
+
+    def __init__(self, mensaje, hechos=()):
+        super().__init__(mensaje)
+        self.hechos = list(hechos)
+
+
+def _estado_http(error):
+    """Estado HTTP del error si se puede saber (httpx o un APIError sin cuerpo JSON)."""
+    respuesta = getattr(error, "response", None)
+    estado = getattr(respuesta, "status_code", None)
+    if estado is not None:
+        return int(estado)
+    # postgrest pone el estado HTTP en .code solo cuando la respuesta no era un error
+    # JSON de PostgREST (p. ej. un 502/429 del gateway); si no, .code es de PostgREST/Postgres
+    codigo = getattr(error, "code", None)
+    if isinstance(codigo, int) or (isinstance(codigo, str) and len(codigo) == 3 and codigo.isdigit()):
+        return int(codigo)
+    return None
+
+
+def es_transitorio(error):
+    estado = _estado_http(error)
+    if estado is not None:
+        return estado in _HTTP_TRANSITORIOS
+    codigo = getattr(error, "code", None)
+    if codigo is not None:
+        return str(codigo) in _PG_TRANSITORIOS
+    if isinstance(error, (OSError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        import httpx
+    except ImportError:  # httpx viene con supabase; sin él no hay errores suyos
+        return False
+    # red, timeouts, conexión cortada (no los errores de armado del pedido)
+    return isinstance(error, httpx.TransportError)
+
+
+class TablaCompendio:
+    def __init__(self, cliente, tabla="compendio", reintentos=REINTENTOS,
+                 espera_reintento=ESPERA_REINTENTO, paralelo=PEDIDOS_PARALELOS):
+        self.cliente = cliente
+        self.tabla = tabla
+        self.reintentos = max(0, int(reintentos))
+        self.espera_reintento = espera_reintento
+        self.paralelo = max(1, int(paralelo))
+        self._pool = None
+        self._lock = threading.Lock()
+
+    # ---------- un pedido ----------
+    def ejecutar(self, armar, que="pedido"):
+        """
+        armar(consulta) -> builder listo para execute(). Devuelve la respuesta.
+        Reintenta los errores transitorios; el resto se lanza como ErrorDeDatos.
+        """
+        return self._con_reintentos(lambda: armar(self.cliente.table(self.tabla)).execute(), que)
+
+    def funcion(self, nombre, parametros, que="función"):
+        """Llama una función del server (rpc) con los mismos reintentos que ejecutar."""
+        return self._con_reintentos(lambda: self.cliente.rpc(nombre, parametros).execute(), que)
+
+    def _con_reintentos(self, pedido, que):
+        fallos = 0
+        while True:
+            try:
+                with medicion.tramo("http.pedido"):
+                    return pedido()
+            except Exception as e:
+                fallos += 1
+                if fallos > self.reintentos or not es_transitorio(e):
+                    medicion.contar("http.errores")
+                    raise ErrorDeDatos(f"{que}: {e}") from e
+                medicion.contar("http.reintentos")
+                time.sleep(self.espera_reintento * (2 ** (fallos - 1)))
+
+    def datos(self, armar, que="lectura"):
+        return getattr(self.ejecutar(armar, que), "data", None) or []
+
+    # ---------- varias lecturas juntas ----------
+    def _pool_lecturas(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.paralelo, thread_name_prefix="pedidos")
+            return self._pool
+
+    def leer_varios(self, armados, que="lectura"):
+        """Ejecuta varias lecturas a la vez; devuelve sus data en el mismo orden."""
+        if len(armados) <= 1:
+            return [self.datos(a, que) for a in armados]
+        return list(self._pool_lecturas().map(lambda a: self.datos(a, que), armados))
+
+    def traer_por_ids(self, ids, columnas, lote=LOTE_IDS):
+        """Filas de esos ids (con las columnas pedidas), en tandas de 'lote' que salen juntas."""
+        tandas = [ids[i:i + lote] for i in range(0, len(ids), lote)]
+        armados = [lambda c, t=t: c.select(columnas).in_("id", t) for t in tandas]
+        filas = []
+        for data in self.leer_varios(armados, que=f"traer {len(ids)} registros"):
+            filas.extend(data)
+        return filas
+
+    # ---------- escrituras ----------
+    def _por_tandas(self, ids, armar, que, lote):
+        hechos = []
+        for i in range(0, len(ids), lote):
+            tanda = ids[i:i + lote]
+            try:
+                self.ejecutar(lambda c: armar(c, tanda), que)
+            except ErrorDeDatos as e:
+                raise ErrorDeDatos(str(e), hechos) from e.__cause__
+            hechos.extend(tanda)
+        return hechos
+
+    def actualizar(self, ids, cambios, lote=500):
+        """Los mismos cambios para todos los ids (un update con in_ por tanda, sin devolver filas)."""
+        return self._por_tandas(
+            ids, lambda c, t: c.update(cambios, returning="minimal").in_("id", t),
+            f"actualizar {len(ids)} registros", lote,
+        )
+
+    def borrar(self, ids, lote=500):
+        return self._por_tandas(
+            ids, lambda c, t: c.delete(returning="minimal").in_("id", t),
+            f"borrar {len(ids)} registros", lote,
+        )
@@ -0,0 +1,71 @@
+"""
+Benchmark de arranque: cuánto tarda `import informacion` en un intérprete nuevo.
+
+Además de medir, verifica que la importación no arrastre lo pesado
+(supabase, docx, PIL, webbrowser, edicion, busqueda): eso se carga recién
+cuando se usa. Sale con código 1 si se pasa del presupuesto o si algo
+pesado se cargó antes de tiempo.
+
+    python benchmarks/inicio.py [--repeticiones 7] [--presupuesto-ms 150]
+
+El presupuesto también se puede fijar con COMPENDIO_PRESUPUESTO_IMPORT_MS.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ("supabase", "docx", "PIL", "webbrowser", "edicion", "busqueda")
+PRESUPUESTO_MS = float(os.environ.get("COMPENDIO_PRESUPUESTO_IMPORT_MS", "150"))
+
+# corre en un proceso aparte: así cada medición arranca con sys.modules vacío
+SONDA = """
+import json, sys, time
+t0 = time.perf_counter()
+import informacion
+ms = (time.perf_counter() - t0) * 1000
+pesados = [m for m in {pesados!r} if m in sys.modules]
+print(json.dumps({{"ms": ms, "pesados": pesados}}))
+"""
+
+
+def medir_una():
+    salida = subprocess.run(
+        [sys.executable, "-c", SONDA.format(pesados=PESADOS)],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    args = parser.parse_args(argv)
+
+    medidas = [medir_una() for _ in range(max(1, args.repeticiones))]
+    tiempos = sorted(m["ms"] for m in medidas)
+    mediana = statistics.median(tiempos)
+    pesados = sorted({p for m in medidas for p in m["pesados"]})
+
+    print(f"import informacion: mediana {mediana:.1f} ms  "
+          f"(min {tiempos[0]:.1f}, max {tiempos[-1]:.1f}, n={len(tiempos)})  "
+          f"presupuesto {args.presupuesto_ms:.0f} ms")
+    ok = True
+    if pesados:
+        print("ERROR: se importaron al arrancar:", ", ".join(pesados))
+        ok = False
+    if mediana > args.presupuesto_ms:
+        print("ERROR: el arranque se pasó del presupuesto")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
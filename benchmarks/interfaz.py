@@ -0,0 +1,292 @@
+"""
+Benchmark de la ventana con datos sintéticos (1k, 10k y 50k registros).
+
+Cada tamaño corre en un proceso aparte (memoria pico limpia) con la ventana
+real de Tk y un Supabase de mentira con latencia (supabase_falso.py). Mide:
+
+- carga_ms: desde que se crea la ventana hasta que terminó la carga;
+- primera_tarjeta_ms: hasta que se ve la primera tarjeta;
+- pagina_p50_ms / pagina_p95_ms: cambiar de página (_go_to_page + dibujo);
+- scroll_p50_ms / scroll_p95_ms: una ráfaga de rueda (EVENTOS_POR_PASO eventos,
+  como un trackpad) hasta que se aplicó y se dibujó;
+- scroll_cuadro_p95_ms / eventos_por_cuadro: lo que informa el motor de la rueda
+  (cuánto tarda un cuadro y cuántos eventos juntó en cada uno);
+- tarjeta_p50_ms: enlazar una tarjeta (visualizar_registro);
+- rss_pico_mb: memoria pico del proceso (incluye al Supabase de mentira).
+
+Sin DISPLAY levanta un Xvfb propio. Sale con código 1 si algo se pasa de
+PRESUPUESTO (topes absolutos, valen en cualquier máquina). Hay dos modos:
+
+- CI (máquinas que cambian de una corrida a otra): --sin-base. Solo cuentan
+  los topes absolutos; una línea base de otra máquina no sirve para comparar.
+- Máquina fija: una vez --guardar (queda linea_base.json con la máquina y la
+  pantalla virtual) y después sin opciones: además de los topes, falla si algo
+  empeoró más que la tolerancia respecto de esa base. Sin linea_base.json y
+  sin --sin-base sale con código 1, para que no pase sin comparar nada.
+
+linea_base.json no va al repo: los tiempos dependen de la máquina.
+
+    python benchmarks/interfaz.py --sin-base     # CI: solo los topes absolutos
+    python benchmarks/interfaz.py --guardar      # fija la línea base de esta máquina
+    python benchmarks/interfaz.py [--tamanios 1000 10000 50000] [--latencia-ms 20]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AQUI = os.path.dirname(os.path.abspath(__file__))
+LINEA_BASE = os.path.join(AQUI, "linea_base.json")
+TAMANIOS = (1000, 10000, 50000)
+TOLERANCIA = float(os.environ.get("COMPENDIO_BENCH_TOLERANCIA", "0.25"))
+# holgura absoluta: diferencias chicas no cuentan como regresión (ruido)
+HOLGURA = {"ms": 3.0, "mb": 15.0}
+LIMITE_CARGA_S = 600
+PANTALLA = "1600x1000x24"  # la del Xvfb propio
+EVENTOS_POR_PASO = 4
+# métricas que no son tiempos ni memoria (no se comparan)
+SIN_COMPARAR = ("n", "pedidos", "eventos_por_cuadro")
+# topes absolutos (ms) para cualquier tamaño: lo que el usuario nota como traba
+PRESUPUESTO = {
+    "primera_tarjeta_ms": 2000.0,
+    "pagina_p95_ms": 100.0,
+    "scroll_p95_ms": 50.0,
+    "scroll_cuadro_p95_ms": 16.0,
+    "tarjeta_p50_ms": 10.0,
+}
+
+
+# ---------- proceso hijo: una corrida con n registros ----------
+def _percentil(valores, p):
+    if not valores:
+        return 0.0
+    orden = sorted(valores)
+    return orden[min(len(orden) - 1, int(p * len(orden)))]
+
+
+def _esperar(root, condicion, limite_s):
+    """Procesa eventos hasta que se cumpla la condición; devuelve los ms que tardó."""
+    inicio = time.perf_counter()
+    while not condicion():
+        if time.perf_counter() - inicio > limite_s:
+            raise TimeoutError("la ventana no llegó al estado esperado")
+        root.update()
+        time.sleep(0.001)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def medir(n, latencia_ms, paginas, pasos_scroll):
+    os.environ.setdefault("SUPABASE_URL", "http://benchmark.invalid")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "benchmark")
+    os.environ["COMPENDIO_CACHE_DIR"] = tempfile.mkdtemp(prefix="compendio-bench-")
+    sys.path.insert(0, RAIZ)
+    sys.path.insert(0, AQUI)
+
+    import resource
+    import tkinter as tk
+
+    import conexion
+    import medicion
+    from supabase_falso import SupabaseFalso
+
+    conexion._cliente = SupabaseFalso(n, latencia_ms=latencia_ms)
+    medicion.activar()
+
+    import informacion
+
+    root = tk.Tk()
+    root.withdraw()
+    inicio = time.perf_counter()
+    v = informacion.VisualizadorBase(root)
+    _esperar(root, lambda: v._tarjetas, LIMITE_CARGA_S)
+    primera = (time.perf_counter() - inicio) * 1000
+    _esperar(root, lambda: not v._carga_activa and len(v.datos) >= n, LIMITE_CARGA_S)
+    carga = (time.perf_counter() - inicio) * 1000
+    root.update()
+
+    # cambio de página (ida por las primeras páginas)
+    flips = []
+    total = v._total_paginas()
+    for pagina in list(range(2, min(total, paginas + 1) + 1)) or [1]:
+        t0 = time.perf_counter()
+        v._go_to_page(pagina)
+        root.update()
+        flips.append((time.perf_counter() - t0) * 1000)
+
+    # scroll: una ráfaga de rueda hacia abajo (Button-5) y el dibujo que provoca
+    v._go_to_page(1)
+    root.update()
+    v.rueda.reiniciar_estadisticas()
+    abajo = type("Evento", (), {"num": 5, "delta": 0})()
+    pasos = []
+    for _ in range(pasos_scroll):
+        t0 = time.perf_counter()
+        for _ in range(EVENTOS_POR_PASO):
+            v.rueda.al_girar(abajo)
+        _esperar(root, lambda: v.rueda._cuadro is None, 5)
+        root.update()
+        pasos.append((time.perf_counter() - t0) * 1000)
+    rueda = v.rueda.estadisticas()
+
+    tramos, _ = medicion.resumen()
+    render = tramos.get("tarjeta.render")
+    resultado = {
+        "n": n,
+        "carga_ms": round(carga, 1),
+        "primera_tarjeta_ms": round(primera, 1),
+        "pagina_p50_ms": round(statistics.median(flips), 2),
+        "pagina_p95_ms": round(_percentil(flips, 0.95), 2),
+        "scroll_p50_ms": round(statistics.median(pasos), 2) if pasos else 0.0,
+        "scroll_p95_ms": round(_percentil(pasos, 0.95), 2),
+        "scroll_cuadro_p95_ms": rueda["cuadro_p95_ms"],
+        "eventos_por_cuadro": rueda["eventos_por_cuadro"],
+        "tarjeta_p50_ms": round(render.percentil(0.5), 3) if render else 0.0,
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "pedidos": conexion._cliente.pedidos,
+    }
+    v.destroy()
+    root.destroy()
+    return resultado
+
+
+# ---------- pantalla virtual ----------
+def pantalla_virtual():
+    """Si no hay DISPLAY, arranca un Xvfb y devuelve el proceso (o None)."""
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        raise SystemExit("No hay DISPLAY ni Xvfb: instalá xvfb (apt install xvfb) o corré con una pantalla.")
+    for numero in range(99, 140):
+        if os.path.exists(f"/tmp/.X{numero}-lock") or os.path.exists(f"/tmp/.X11-unix/X{numero}"):
+            continue
+        proceso = subprocess.Popen(
+            [xvfb, f":{numero}", "-screen", "0", PANTALLA, "-nolisten", "tcp"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        fin = time.time() + 10
+        while time.time() < fin and proceso.poll() is None:
+            if os.path.exists(f"/tmp/.X11-unix/X{numero}"):
+                os.environ["DISPLAY"] = f":{numero}"
+                return proceso
+            time.sleep(0.05)
+        proceso.kill()
+    raise SystemExit("No se pudo arrancar Xvfb.")
+
+
+# ---------- comparación ----------
+def _unidad(metrica):
+    return "mb" if metrica.endswith("_mb") else "ms"
+
+
+def regresiones(resultados, base, tolerancia):
+    """Lista de textos con lo que empeoró respecto de la línea base."""
+    malas = []
+    for r in resultados:
+        previo = base.get("tamanios", {}).get(str(r["n"]))
+        if not previo:
+            continue
+        for metrica, valor in r.items():
+            if metrica in SIN_COMPARAR or metrica not in previo:
+                continue
+            limite = previo[metrica] * (1 + tolerancia) + HOLGURA[_unidad(metrica)]
+            if valor > limite:
+                malas.append(f"n={r['n']} {metrica}: {valor} (base {previo[metrica]}, límite {limite:.1f})")
+    return malas
+
+
+def _maquina():
+    return f"{platform.node()} {platform.machine()} Python {platform.python_version()}"
+
+
+def fuera_de_presupuesto(resultados, presupuesto=PRESUPUESTO):
+    """Lista de textos con lo que se pasó de los topes absolutos."""
+    return [
+        f"n={r['n']} {metrica}: {r[metrica]} (tope {tope:.0f})"
+        for r in resultados
+        for metrica, tope in presupuesto.items()
+        if r.get(metrica, 0) > tope
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tamanios", type=int, nargs="+", default=list(TAMANIOS))
+    parser.add_argument("--latencia-ms", type=float, default=20.0, help="latencia de cada pedido al Supabase de mentira")
+    parser.add_argument("--paginas", type=int, default=10, help="cambios de página que se miden")
+    parser.add_argument("--pasos-scroll", type=int, default=120, help="pasos de rueda que se miden")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="empeoramiento relativo admitido")
+    parser.add_argument("--guardar", action="store_true", help="guardar los resultados como línea base")
+    parser.add_argument("--sin-base", action="store_true", help="no exigir línea base (solo los topes absolutos)")
+    parser.add_argument("--hijo", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.hijo is not None:
+        print(json.dumps(medir(args.hijo, args.latencia_ms, args.paginas, args.pasos_scroll)))
+        return 0
+
+    xvfb = pantalla_virtual()
+    try:
+        resultados = []
+        for n in args.tamanios:
+            salida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--hijo", str(n),
+                 "--latencia-ms", str(args.latencia_ms), "--paginas", str(args.paginas),
+                 "--pasos-scroll", str(args.pasos_scroll)],
+                cwd=RAIZ, capture_output=True, text=True,
+            )
+            if salida.returncode != 0:
+                print(salida.stderr)
+                print(f"ERROR: la corrida con n={n} falló")
+                return 1
+            r = json.loads(salida.stdout.strip().splitlines()[-1])
+            resultados.append(r)
+            print(f"n={n:>6}  carga {r['carga_ms']:>9.0f} ms  1ª tarjeta {r['primera_tarjeta_ms']:>7.0f} ms  "
+                  f"página p50/p95 {r['pagina_p50_ms']:.1f}/{r['pagina_p95_ms']:.1f} ms  "
+                  f"scroll p50/p95 {r['scroll_p50_ms']:.1f}/{r['scroll_p95_ms']:.1f} ms  "
+                  f"tarjeta {r['tarjeta_p50_ms']:.2f} ms  rss {r['rss_pico_mb']:.0f} MB")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    malas = fuera_de_presupuesto(resultados)
+    for m in malas:
+        print("FUERA DE PRESUPUESTO:", m)
+
+    if args.guardar:
+        with open(LINEA_BASE, "w", encoding="utf-8") as f:
+            json.dump({
+                "maquina": _maquina(),
+                "pantalla": f"Xvfb {PANTALLA}" if xvfb is not None else os.environ.get("DISPLAY"),
+                "latencia_ms": args.latencia_ms,
+                "tamanios": {str(r["n"]): r for r in resultados},
+            }, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {LINEA_BASE}")
+        return 1 if malas else 0
+
+    if not os.path.exists(LINEA_BASE):
+        if args.sin_base:
+            return 1 if malas else 0
+        print(f"ERROR: no hay línea base en {LINEA_BASE}: correr una vez con --guardar "
+              "en esta máquina (o usar --sin-base para comparar solo con los topes)")
+        return 1
+    with open(LINEA_BASE, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("maquina") != _maquina():
+        print(f"AVISO: la línea base es de otra máquina ({base.get('maquina')}); en CI usar --sin-base")
+    if base.get("latencia_ms") != args.latencia_ms:
+        print(f"AVISO: la línea base se tomó con latencia {base.get('latencia_ms')} ms")
+    regresadas = regresiones(resultados, base, args.tolerancia)
+    for m in regresadas:
+        print("REGRESIÓN:", m)
+    return 1 if malas or regresadas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Memoria del listado: filas como dicts (como llegan del server) contra
+registros.Registro, para la misma cantidad de filas sintéticas.
+
+Las filas pasan antes por JSON, igual que las que devuelve Supabase: cada
+una trae sus propios strings (nada compartido de antemano).
+
+    python benchmarks/memoria.py [--filas 10000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from registros import Registro  # noqa: E402
+from supabase_falso import filas_sinteticas  # noqa: E402
+
+
+def medir(armar, crudo):
+    """Bytes que quedan vivos después de armar la lista (sin contar 'crudo')."""
+    gc.collect()
+    tracemalloc.start()
+    filas = armar(json.loads(crudo))
+    gc.collect()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return actual, len(filas)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    crudo = json.dumps(filas_sinteticas(args.filas))
+    como_dict, n = medir(lambda filas: filas, crudo)
+    como_registro, _ = medir(lambda filas: [Registro(f) for f in filas], crudo)
+
+    print(f"{n} filas")
+    print(f"  dicts:     {como_dict / 2**20:7.2f} MB  ({como_dict / n:6.0f} B/fila)")
+    print(f"  Registro:  {como_registro / 2**20:7.2f} MB  ({como_registro / n:6.0f} B/fila)")
+    print(f"  ahorro:    {100 * (1 - como_registro / como_dict):6.1f} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Supabase de mentira para los benchmarks: responde la cadena
+table(...).select/order/gt/gte/lt/lte/eq/in_/limit/execute (y update/delete)
+sobre filas sintéticas del compendio, con una latencia configurable por pedido.
+
+Las filas tienen tamaños parecidos a los reales (autos de ~80 caracteres,
+voces de ~200, cuerpos de 2 a 12 mil). Los cuerpos no se guardan: se
+generan (siempre iguales) cuando alguien los pide, así el proceso del
+benchmark no carga con cientos de MB que la app real no tendría.
+"""
+import bisect
+import random
+import threading
+import time
+
+PALABRAS = (
+    "el la de que en los del se las por un para con no una su al es lo como más "
+    "pero sus le ya o fue este ha sí porque esta son entre cuando muy sin sobre "
+    "recurso sentencia cámara actor demandado daño perjuicio indemnización contrato "
+    "prueba pericia testigo plazo apelación agravio fallo resolución tribunal juez "
+    "responsabilidad obligación derecho ley artículo código civil comercial laboral"
+).split()
+TEMAS = [
+    "DAÑOS Y PERJUICIOS", "LABORAL", "FAMILIA", "CONTRATOS", "SUCESIONES",
+    "PROCESAL", "SEGUROS", "CONSUMIDOR", "PREVISIONAL", "TRIBUTARIO", "PENAL", "AMPAROS",
+]
+SUBTEMAS = ["ACCIDENTES", "MALA PRAXIS", "DESPIDO", "ALIMENTOS", "COSTAS", "PRESCRIPCIÓN", None]
+RESULTADOS = ["CONFIRMA", "REVOCA", "REVOCA PARCIALMENTE", "MODIFICA", "NULIDAD"]
+JURISDICCIONES = ["CNCiv. Sala A", "CNTrab. Sala V", "SCBA", "CSJN", "CCiv. y Com. Mar del Plata"]
+
+
+def _frase(rnd, palabras):
+    return " ".join(rnd.choice(PALABRAS) for _ in range(palabras))
+
+
+def cuerpo_sintetico(id_):
+    rnd = random.Random(id_ * 7919)
+    parrafos = []
+    largo = rnd.randint(2000, 12000)
+    total = 0
+    while total < largo:
+        p = _frase(rnd, rnd.randint(40, 120)).capitalize() + "."
+        parrafos.append(p)
+        total += len(p) + 2
+    return "\n\n".join(parrafos)
+
+
+def filas_sinteticas(n, semilla=1):
+    """n filas livianas (sin cuerpo) con ids crecientes y algunos huecos."""
+    rnd = random.Random(semilla)
+    filas = []
+    id_ = 0
+    for _ in range(n):
+        id_ += 1 if rnd.random() < 0.9 else rnd.randint(2, 20)
+        filas.append({
+            "id": id_,
+            "tema": rnd.choice(TEMAS),
+            "subtema": rnd.choice(SUBTEMAS),
+            "autos": f"{_frase(rnd, 4).upper()} C/ {_frase(rnd, 3).upper()} S/ {_frase(rnd, 3)}",
+            "jurisdiccion": rnd.choice(JURISDICCIONES),
+            "fecha": f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/{rnd.randint(1995, 2024)}",
+            "resultado": rnd.choice(RESULTADOS),
+            "voces": " - ".join(_frase(rnd, 3).upper() for _ in range(rnd.randint(3, 8))),
+            "link_fallo": f"https://jurisprudencia.example/fallo/{id_}" if rnd.random() < 0.7 else "",
+        })
+    return filas
+
+
+class Respuesta:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class Consulta:
+    def __init__(self, base):
+        self.base = base
+        self.columnas = "*"
+        self.contar = None
+        self.desde = 0               # rango de posiciones por id (se achica con gt/lt/...)
+        self.hasta = len(base.ids)
+        self.filtros = []
+        self.ids_in = None
+        self.orden = None
+        self.tope = None
+        self.operacion = "select"
+        self.cambios = None
+
+    # --- cadena ---
+    def select(self, columnas="*", count=None):
+        self.columnas = columnas
+        self.contar = count
+        return self
+
+    def order(self, columna, desc=False):
+        self.orden = (columna, desc)
+        return self
+
+    def _comparar(self, columna, valor, op):
+        if columna == "id":
+            ids = self.base.ids
+            if op == "gt":
+                self.desde = max(self.desde, bisect.bisect_right(ids, valor))
+            elif op == "gte":
+                self.desde = max(self.desde, bisect.bisect_left(ids, valor))
+            elif op == "lt":
+                self.hasta = min(self.hasta, bisect.bisect_left(ids, valor))
+            else:
+                self.hasta = min(self.hasta, bisect.bisect_right(ids, valor))
+        else:
+            self.base.verificar_columna(columna)
+            f = {
+                "gt": lambda r: r.get(columna) is not None and r.get(columna) > valor,
+                "gte": lambda r: r.get(columna) is not None and r.get(columna) >= valor,
+                "lt": lambda r: r.get(columna) is not None and r.get(columna) < valor,
+                "lte": lambda r: r.get(columna) is not None and r.get(columna) <= valor,
+            }[op]
+            self.filtros.append(f)
+        return self
+
+    def gt(self, columna, valor):
+        return self._comparar(columna, valor, "gt")
+
+    def gte(self, columna, valor):
+        return self._comparar(columna, valor, "gte")
+
+    def lt(self, columna, valor):
+        return self._comparar(columna, valor, "lt")
+
+    def lte(self, columna, valor):
+        return self._comparar(columna, valor, "lte")
+
+    def eq(self, columna, valor):
+        if columna == "id":
+            return self.in_("id", [valor])
+        self.filtros.append(lambda r: r.get(columna) == valor)
+        return self
+
+    def in_(self, columna, valores):
+        if columna == "id":
+            self.ids_in = set(valores)
+        else:
+            valores = set(valores)
+            self.filtros.append(lambda r: r.get(columna) in valores)
+        return self
+
+    def limit(self, n):
+        self.tope = n
+        return self
+
+    def update(self, cambios, **kwargs):
+        self.operacion, self.cambios = "update", dict(cambios)
+        return self
+
+    def delete(self, **kwargs):
+        self.operacion = "delete"
+        return self
+
+    # --- ejecución ---
+    def _seleccionadas(self):
+        base = self.base
+        if self.ids_in is not None:
+            permitidos = set(base.ids[self.desde:self.hasta]) if (self.desde, self.hasta) != (0, len(base.ids)) else None
+            filas = [
+                base.por_id[i] for i in sorted(self.ids_in)
+                if i in base.por_id and (permitidos is None or i in permitidos)
+            ]
+        else:
+            filas = base.filas[self.desde:self.hasta]
+        if self.filtros:
+            filas = [f for f in filas if all(c(f) for c in self.filtros)]
+        return filas
+
+    def execute(self):
+        base = self.base
+        base.esperar()
+        with base.lock:
+            base.pedidos += 1
+            if self.columnas != "*":
+                for c in self.columnas.split(","):
+                    base.verificar_columna(c.strip())
+            if self.operacion == "delete":
+                borrar = {f["id"] for f in self._seleccionadas()}
+                base.quitar(borrar)
+                return Respuesta([])
+            if self.operacion == "update":
+                for f in self._seleccionadas():
+                    f.update(self.cambios)
+                return Respuesta([])
+
+            filas = self._seleccionadas()
+            total = len(filas) if self.contar else None
+            if self.orden is not None and self.orden != ("id", False):
+                columna, desc = self.orden
+                filas = sorted(filas, key=lambda r: (r.get(columna) is None, r.get(columna)), reverse=desc)
+            if self.tope is not None:
+                filas = filas[:self.tope]
+            columnas = list(base.columnas) if self.columnas == "*" else [c.strip() for c in self.columnas.split(",")]
+            salida = []
+            for f in filas:
+                fila = {c: f.get(c) for c in columnas if c != "jurisprudencia"}
+                if "jurisprudencia" in columnas:
+                    fila["jurisprudencia"] = cuerpo_sintetico(f["id"])
+                salida.append(fila)
+            return Respuesta(salida, total)
+
+
+class SupabaseFalso:
+    """
+    Cliente de mentira. latencia_ms es la espera de cada pedido (con ±jitter
+    proporcional); las esperas corren en paralelo como en la red de verdad.
+    """
+
+    COLUMNAS = ("id", "tema", "subtema", "autos", "jurisdiccion", "fecha",
+                "resultado", "voces", "link_fallo", "jurisprudencia")
+
+    def __init__(self, n, latencia_ms=20.0, jitter=0.25, semilla=1):
+        self.filas = filas_sinteticas(n, semilla)
+        self.ids = [f["id"] for f in self.filas]
+        self.por_id = {f["id"]: f for f in self.filas}
+        self.columnas = self.COLUMNAS
+        self.latencia_ms = latencia_ms
+        self.jitter = jitter
+        self.pedidos = 0
+        self.lock = threading.Lock()
+        self._rnd = random.Random(semilla)
+
+    def table(self, nombre):
+        return Consulta(self)
+
+    def verificar_columna(self, columna):
+        if columna not in self.columnas:
+            raise ValueError(f"column compendio.{columna} does not exist")
+
+    def esperar(self):
+        if self.latencia_ms > 0:
+            variacion = 1 + self.jitter * (2 * self._rnd.random() - 1)
+            time.sleep(self.latencia_ms * variacion / 1000)
+
+    def quitar(self, ids):
+        self.filas = [f for f in self.filas if f["id"] not in ids]
+        self.ids = [f["id"] for f in self.filas]
+        for i in ids:
+            self.por_id.pop(i, None)
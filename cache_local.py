@@ -0,0 +1,448 @@
+"""
+Cache local del compendio en SQLite (en el directorio de datos del usuario).
+
+La ventana abre con lo que haya en disco y después sincroniza solo la
+diferencia contra Supabase:
+
+- filas nuevas: id mayor al máximo guardado;
+- filas modificadas: updated_at posterior a la última sincronización.
+  Si la tabla no tiene esa columna se comparan sumas por tramo de ids
+  (cantidad de filas + md5 de su contenido) que calcula el server con la
+  función de sql_funcion_sumas(); solo se traen los tramos que difieren.
+  Si esa función no está creada, pasada liviana con las columnas del
+  listado comparando contra lo guardado;
+- filas borradas: si el count del server no coincide con el local, se
+  comparan los ids.
+
+Los pedidos van por acceso_datos.TablaCompendio: un corte de red pasajero se
+reintenta en vez de abortar la sincronización.
+
+Los cuerpos de jurisprudencia también se guardan acá a medida que se piden.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+
+from acceso_datos import TablaCompendio
+
+NOMBRE_ARCHIVO = "compendio.sqlite3"
+COLUMNA_ACTUALIZACION = os.environ.get("COMPENDIO_COLUMNA_ACTUALIZACION", "updated_at")
+LOTE_IDS = 1000  # tamaño de tanda para la pasada de ids (reconciliar borrados)
+# Sumas por tramo de ids (sin updated_at): función del server y ids por tramo
+FUNCION_SUMAS = os.environ.get("COMPENDIO_FUNCION_SUMAS", "compendio_sumas")
+TRAMO_SUMAS = 1000
+_SEP_CAMPO = "\x1f"
+_SEP_FILA = "\x1e"
+_NULO = "\x02"
+
+
+def sql_funcion_sumas(columnas, tabla="compendio", nombre=FUNCION_SUMAS):
+    """
+    SQL de la función que devuelve (tramo, filas, suma) por cada tramo de
+    ids. Se crea una vez en Supabase (SQL editor); suma_tramo() calcula lo
+    mismo del lado local.
+    """
+    campos = ", ".join(
+        f"coalesce({c}::text, chr(2))" for c in (["id"] + [c for c in columnas if c != "id"])
+    )
+    return (
+        f"create or replace function {nombre}(tamanio integer)\n"
+        f"returns table (tramo bigint, filas bigint, suma text)\n"
+        f"language sql stable as $$\n"
+        f"  select id / tamanio, count(*), md5(string_agg(concat_ws(chr(31), {campos}), chr(30) order by id))\n"
+        f"  from {tabla} group by id / tamanio\n"
+        f"$$;\n"
+    )
+
+
+def suma_tramo(filas, columnas):
+    """md5 de las filas (ordenadas por id) igual que la función del server."""
+    texto = _SEP_FILA.join(
+        _SEP_CAMPO.join(_NULO if f.get(c) is None else str(f.get(c)) for c in columnas)
+        for f in filas
+    )
+    return hashlib.md5(texto.encode("utf-8")).hexdigest()
+
+
+def _columna_inexistente(error):
+    """True solo si el error dice que la columna no existe (no por un corte de red)."""
+    if str(getattr(error, "code", "")) in ("42703", "PGRST204"):
+        return True
+    return "does not exist" in str(error)
+
+
+def directorio_datos():
+    """Directorio de datos del usuario según el sistema (o COMPENDIO_CACHE_DIR)."""
+    forzado = os.environ.get("COMPENDIO_CACHE_DIR")
+    if forzado:
+        return forzado
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, "Compendio")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Compendio")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "compendio")
+
+
+def abrir_cache_local(columnas, ruta=None):
+    """CacheLocal lista para usar, o None si no se pudo abrir (la app sigue sin cache)."""
+    try:
+        if ruta is None:
+            carpeta = directorio_datos()
+            os.makedirs(carpeta, exist_ok=True)
+            ruta = os.path.join(carpeta, NOMBRE_ARCHIVO)
+        return CacheLocal(ruta, columnas)
+    except Exception as e:
+        print("ERROR abriendo cache local -> ", repr(e))
+        return None
+
+
+class CacheLocal:
+    """
+    Filas del listado + cuerpos de jurisprudencia + metadatos de sync.
+
+    Cada hilo usa su propia conexión (sqlite3 no comparte conexiones entre
+    hilos); el modo WAL deja leer mientras otro hilo escribe.
+    """
+
+    def __init__(self, ruta, columnas):
+        self.ruta = ruta
+        self.columnas = tuple(c.strip() for c in columnas if c.strip())
+        if "id" not in self.columnas:
+            self.columnas = ("id",) + self.columnas
+        self._local = threading.local()
+        self._crear_esquema()
+
+    # ---------- conexión / esquema ----------
+    def _con(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=10)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def _crear_esquema(self):
+        con = self._con()
+        con.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+        firma = ",".join(self.columnas)
+        if self.meta("columnas") != firma:
+            # cambió el juego de columnas del listado: se arranca de cero
+            con.execute("DROP TABLE IF EXISTS filas")
+            con.execute("DELETE FROM meta WHERE clave != 'columnas'")
+        otras = ", ".join(f'"{c}"' for c in self.columnas if c != "id")
+        con.execute(f"CREATE TABLE IF NOT EXISTS filas (id INTEGER PRIMARY KEY, {otras})")
+        con.execute("CREATE TABLE IF NOT EXISTS cuerpos (id INTEGER PRIMARY KEY, texto TEXT)")
+        con.execute("INSERT OR REPLACE INTO meta VALUES ('columnas', ?)", (firma,))
+        con.commit()
+
+    def meta(self, clave, defecto=None):
+        fila = self._con().execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else defecto
+
+    def poner_meta(self, clave, valor):
+        con = self._con()
+        con.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (clave, None if valor is None else str(valor)))
+        con.commit()
+
+    # ---------- filas ----------
+    def filas(self, fabrica=dict):
+        """Todas las filas; fabrica(pares clave/valor) arma cada una (dict o registros.Registro)."""
+        cols = ", ".join(f'"{c}"' for c in self.columnas)
+        cursor = self._con().execute(f"SELECT {cols} FROM filas")
+        nombres = self.columnas
+        return [fabrica(zip(nombres, fila)) for fila in cursor]
+
+    def max_id(self):
+        return self._con().execute("SELECT MAX(id) FROM filas").fetchone()[0]
+
+    def cantidad(self):
+        return self._con().execute("SELECT COUNT(*) FROM filas").fetchone()[0]
+
+    def ids(self):
+        return {fila[0] for fila in self._con().execute("SELECT id FROM filas")}
+
+    def guardar_filas(self, filas):
+        if not filas:
+            return
+        cols = ", ".join(f'"{c}"' for c in self.columnas)
+        marcas = ", ".join("?" for _ in self.columnas)
+        con = self._con()
+        con.executemany(
+            f"INSERT OR REPLACE INTO filas ({cols}) VALUES ({marcas})",
+            [tuple(f.get(c) for c in self.columnas) for f in filas],
+        )
+        con.commit()
+
+    def borrar_filas(self, ids):
+        ids = [(i,) for i in ids]
+        if not ids:
+            return
+        con = self._con()
+        con.executemany("DELETE FROM filas WHERE id = ?", ids)
+        con.executemany("DELETE FROM cuerpos WHERE id = ?", ids)
+        con.commit()
+
+    # ---------- cuerpos ----------
+    def cuerpos(self, ids):
+        """{id: texto} de los ids que estén guardados."""
+        resultado = {}
+        ids = list(ids)
+        con = self._con()
+        for i in range(0, len(ids), 500):
+            tanda = ids[i:i + 500]
+            marcas = ", ".join("?" for _ in tanda)
+            for id_, texto in con.execute(f"SELECT id, texto FROM cuerpos WHERE id IN ({marcas})", tanda):
+                resultado[id_] = texto
+        return resultado
+
+    def iterar_cuerpos(self, tanda=200):
+        """Todos los cuerpos guardados, de a listas de (id, texto)."""
+        cursor = self._con().execute("SELECT id, texto FROM cuerpos")
+        while True:
+            filas = cursor.fetchmany(tanda)
+            if not filas:
+                break
+            yield filas
+
+    def guardar_cuerpos(self, textos):
+        if not textos:
+            return
+        con = self._con()
+        con.executemany("INSERT OR REPLACE INTO cuerpos (id, texto) VALUES (?, ?)", list(textos.items()))
+        con.commit()
+
+    def descartar_cuerpos(self, ids):
+        ids = [(i,) for i in ids]
+        if not ids:
+            return
+        con = self._con()
+        con.executemany("DELETE FROM cuerpos WHERE id = ?", ids)
+        con.commit()
+
+    # ---------- sincronización ----------
+    def sincronizar(self, cliente, nuevo_cargador, tabla="compendio", tamanio_lote=50):
+        """
+        Generador de eventos para el hilo de carga:
+
+        - ("filas", lista, avance): filas nuevas o modificadas (ya guardadas).
+        - ("borrados", ids, avance): ids que ya no están en el server.
+
+        nuevo_cargador(desde_id=..., columnas=...) devuelve un CargadorCompendio.
+        """
+        habia_cache = self.max_id() is not None
+        datos = TablaCompendio(cliente, tabla)
+        tiene_actualizacion = self._tiene_columna_actualizacion(datos)
+        columnas = ",".join(self.columnas)
+        if tiene_actualizacion:
+            columnas += "," + COLUMNA_ACTUALIZACION
+        marca_sync = self.meta("ultima_sync")
+        marca_nueva = marca_sync
+
+        def registrar_marca(filas):
+            nonlocal marca_nueva
+            for f in filas:
+                valor = f.get(COLUMNA_ACTUALIZACION)
+                if valor is not None and (marca_nueva is None or str(valor) > marca_nueva):
+                    marca_nueva = str(valor)
+
+        # 1) filas nuevas (o todo, si la cache está vacía)
+        cargador = nuevo_cargador(desde_id=self.max_id(), columnas=columnas)
+        for lote in cargador.iterar_lotes():
+            registrar_marca(lote)
+            self.guardar_filas(lote)
+            yield ("filas", lote, cargador.rangos_terminados / max(1, cargador.rangos_totales))
+
+        if habia_cache:
+            # 2) filas modificadas desde la última sincronización
+            if tiene_actualizacion and marca_sync is not None:
+                for lote in self._modificadas(datos, columnas, marca_sync, tamanio_lote):
+                    registrar_marca(lote)
+                    self.guardar_filas(lote)
+                    self.descartar_cuerpos([f.get("id") for f in lote])
+                    yield ("filas", lote, 1.0)
+                borrados = self._borrados(datos)
+            else:
+                # sin updated_at: sumas por tramo y solo los tramos distintos
+                borrados = yield from self._pasada_por_sumas(datos, columnas, tamanio_lote)
+                if borrados is None:
+                    # el server no tiene la función de sumas: pasada liviana comparando
+                    borrados = yield from self._pasada_comparando(nuevo_cargador, columnas)
+
+            # 3) borrados
+            if borrados:
+                self.borrar_filas(borrados)
+                yield ("borrados", sorted(borrados), 1.0)
+
+        if marca_nueva is not None:
+            self.poner_meta("ultima_sync", marca_nueva)
+
+    def _tiene_columna_actualizacion(self, datos):
+        guardado = self.meta("tiene_actualizacion")
+        if guardado is not None:
+            return guardado == "1"
+        try:
+            datos.ejecutar(lambda c: c.select(f"id,{COLUMNA_ACTUALIZACION}").limit(1), "columna de actualización")
+        except Exception as e:
+            if not _columna_inexistente(e.__cause__ or e):
+                # error pasajero: esta vez sin updated_at, pero no se recuerda
+                print("ERROR consultando columna de actualización -> ", repr(e))
+                return False
+            self.poner_meta("tiene_actualizacion", "0")
+            return False
+        self.poner_meta("tiene_actualizacion", "1")
+        return True
+
+    def _modificadas(self, datos, columnas, marca, tamanio_lote):
+        last_id = 0
+        while True:
+            data = datos.datos(
+                lambda c: c.select(columnas)
+                .gt(COLUMNA_ACTUALIZACION, marca)
+                .order("id", desc=False)
+                .gt("id", last_id)
+                .limit(tamanio_lote),
+                "filas modificadas",
+            )
+            if not data:
+                break
+            yield data
+            last_id = data[-1].get("id")
+            if last_id is None or len(data) < tamanio_lote:
+                break
+
+    def _borrados(self, datos):
+        """Ids locales que ya no están en el server (solo si los counts no coinciden)."""
+        resp = datos.ejecutar(lambda c: c.select("id", count="exact").limit(1), "contar filas")
+        total = getattr(resp, "count", None)
+        if total is not None and total == self.cantidad():
+            return set()
+
+        en_server = set()
+        last_id = 0
+        while True:
+            data = datos.datos(
+                lambda c: c.select("id").order("id", desc=False).gt("id", last_id).limit(LOTE_IDS),
+                "ids del server",
+            )
+            if not data:
+                break
+            en_server.update(f.get("id") for f in data)
+            last_id = data[-1].get("id")
+            if last_id is None:
+                break
+        return self.ids() - en_server
+
+    # ---------- sumas por tramo (tablas sin updated_at) ----------
+    def sumas_locales(self):
+        """{tramo: (filas, suma)} de lo guardado, con el mismo cálculo que el server."""
+        cols = ", ".join(f'"{c}"' for c in self.columnas)
+        cursor = self._con().execute(f"SELECT {cols} FROM filas ORDER BY id")
+        sumas = {}
+        tramo_actual, filas = None, []
+        for fila in cursor:
+            f = dict(zip(self.columnas, fila))
+            tramo = f["id"] // TRAMO_SUMAS
+            if tramo != tramo_actual and filas:
+                sumas[tramo_actual] = (len(filas), suma_tramo(filas, self.columnas))
+                filas = []
+            tramo_actual = tramo
+            filas.append(f)
+        if filas:
+            sumas[tramo_actual] = (len(filas), suma_tramo(filas, self.columnas))
+        return sumas
+
+    def _sumas_server(self, datos):
+        try:
+            resp = datos.funcion(FUNCION_SUMAS, {"tamanio": TRAMO_SUMAS}, "sumas por tramo")
+        except Exception as e:
+            print("ERROR pidiendo sumas por tramo (se compara todo el listado) -> ", repr(e))
+            return None
+        return {
+            int(f["tramo"]): (int(f["filas"]), f["suma"])
+            for f in (getattr(resp, "data", None) or [])
+        }
+
+    def _filas_locales_tramo(self, tramo):
+        cols = ", ".join(f'"{c}"' for c in self.columnas)
+        cursor = self._con().execute(
+            f"SELECT {cols} FROM filas WHERE id >= ? AND id < ?",
+            (tramo * TRAMO_SUMAS, (tramo + 1) * TRAMO_SUMAS),
+        )
+        return {fila[0]: dict(zip(self.columnas, fila)) for fila in cursor}
+
+    def _filas_server_tramo(self, datos, columnas, tramo, tamanio_lote):
+        filas = []
+        last_id = tramo * TRAMO_SUMAS - 1
+        hasta = (tramo + 1) * TRAMO_SUMAS
+        while True:
+            data = datos.datos(
+                lambda c: c.select(columnas)
+                .order("id", desc=False)
+                .gt("id", last_id)
+                .lt("id", hasta)
+                .limit(tamanio_lote),
+                f"tramo {tramo}",
+            )
+            filas.extend(data)
+            if len(data) < tamanio_lote:
+                return filas
+            last_id = data[-1].get("id")
+
+    def _pasada_por_sumas(self, datos, columnas, tamanio_lote):
+        """
+        Compara las sumas del server con las locales y trae solo los tramos
+        distintos. Devuelve los ids borrados, o None si no hay sumas del server.
+        """
+        remotas = self._sumas_server(datos)
+        if remotas is None:
+            return None
+        locales = self.sumas_locales()
+        distintos = sorted(t for t in set(remotas) | set(locales) if remotas.get(t) != locales.get(t))
+        borrados = set()
+        for n, tramo in enumerate(distintos, 1):
+            guardadas = self._filas_locales_tramo(tramo)
+            if tramo not in remotas:
+                borrados.update(guardadas)
+                continue
+            cambiadas = []
+            vistos = set()
+            for fila in self._filas_server_tramo(datos, columnas, tramo, tamanio_lote):
+                vistos.add(fila.get("id"))
+                previa = guardadas.get(fila.get("id"))
+                if previa is None or any(previa.get(c) != fila.get(c) for c in self.columnas):
+                    cambiadas.append(fila)
+            borrados.update(set(guardadas) - vistos)
+            if cambiadas:
+                self.guardar_filas(cambiadas)
+                self.descartar_cuerpos([f.get("id") for f in cambiadas])
+                yield ("filas", cambiadas, n / len(distintos))
+        return borrados
+
+    def _pasada_comparando(self, nuevo_cargador, columnas):
+        """Trae el listado completo (sin cuerpos) y emite solo lo que cambió."""
+        guardadas = {f["id"]: f for f in self.filas()}
+        vistos = set()
+        cargador = nuevo_cargador(desde_id=None, columnas=columnas)
+        for lote in cargador.iterar_lotes():
+            cambiadas = []
+            for fila in lote:
+                vistos.add(fila.get("id"))
+                previa = guardadas.get(fila.get("id"))
+                if previa is None or any(previa.get(c) != fila.get(c) for c in self.columnas):
+                    cambiadas.append(fila)
+            if cambiadas:
+                self.guardar_filas(cambiadas)
+                self.descartar_cuerpos([f.get("id") for f in cambiadas])
+                yield ("filas", cambiadas, cargador.rangos_terminados / max(1, cargador.rangos_totales))
+        return set(guardadas) - vistos
+
+
+if __name__ == "__main__":
+    # python cache_local.py  -> SQL de la función de sumas para pegar en el SQL editor de Supabase
+    from carga import COLUMNAS_LISTA
+    print(sql_funcion_sumas(COLUMNAS_LISTA.split(",")))
@@ -0,0 +1,340 @@
+"""
+Motor de carga del compendio y cache de cuerpos de jurisprudencia.
+
+En vez de recorrer la tabla de a una tanda por vez (cada pedido espera al
+anterior), primero averigua el id mínimo y máximo, parte ese espacio en
+rangos y trae los rangos en paralelo con un pool de hilos acotado. Dentro
+de cada rango se sigue usando keyset pagination por id, así que el
+resultado combinado es el mismo que el recorrido secuencial.
+
+El listado se pide solo con las columnas del encabezado (COLUMNAS_LISTA);
+el texto de jurisprudencia se trae aparte, por tandas, y queda en un LRU.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import medicion
+from acceso_datos import ErrorDeDatos, TablaCompendio, es_transitorio
+
+# Columnas que necesitan el encabezado de la tarjeta y el agrupado.
+# El cuerpo (jurisprudencia) es lejos la columna más pesada y se pide aparte.
+COLUMNAS_LISTA = "id,tema,subtema,autos,jurisdiccion,fecha,resultado,voces,link_fallo"
+# Tope de rangos por hilo: más rangos que hilos solo sirve para repartir mejor la carga;
+# con ids muy dispersos (huecos grandes) un tope chico evita miles de pedidos vacíos
+RANGOS_POR_HILO = 4
+# Tandas que pueden esperar en la cola por hilo: si el que consume (la ventana,
+# un export a gzip) es más lento que los pedidos, los hilos esperan en vez de
+# juntar toda la tabla en memoria
+TANDAS_EN_COLA_POR_HILO = 2
+
+
+class CargadorCompendio:
+    """
+    Trae una tabla por rangos de id en paralelo.
+
+    - tamanio_lote: filas por pedido (el server puede capear menos).
+    - concurrencia: pedidos simultáneos como máximo.
+    - reintentos: veces que se reintenta un rango que falló por un error
+      transitorio (red, 5xx); retoma desde el último id recibido, así no se
+      duplican filas.
+    - desde_id: si se indica, solo trae filas con id mayor (sincronización
+      incremental contra la cache local).
+    """
+
+    def __init__(self, cliente, tabla="compendio", columnas="*",
+                 tamanio_lote=50, concurrencia=4, reintentos=3,
+                 espera_reintento=0.5, lotes_por_rango=4, desde_id=None):
+        self.cliente = cliente
+        self.desde_id = desde_id
+        self.tabla = tabla
+        self.columnas = columnas
+        self.tamanio_lote = max(1, int(tamanio_lote))
+        self.concurrencia = max(1, int(concurrencia))
+        self.reintentos = max(0, int(reintentos))
+        self.espera_reintento = espera_reintento
+        self.lotes_por_rango = max(1, int(lotes_por_rango))
+        # pedidos sueltos (límites, conteo): mismos reintentos que los rangos
+        self._tabla = TablaCompendio(cliente, tabla, reintentos=self.reintentos,
+                                     espera_reintento=espera_reintento)
+
+        # progreso (se lee desde otro hilo; ints => lectura atómica)
+        self.rangos_totales = 0
+        self.rangos_terminados = 0
+
+    # ---------- pedidos básicos ----------
+    def _consulta(self, columnas):
+        return self.cliente.table(self.tabla).select(columnas)
+
+    def limites_id(self):
+        """(id mínimo, id máximo) o None si la tabla está vacía."""
+        def extremo(desc):
+            def armar(c):
+                consulta = c.select("id")
+                if self.desde_id is not None:
+                    consulta = consulta.gt("id", self.desde_id)
+                return consulta.order("id", desc=desc).limit(1)
+
+            data = self._tabla.datos(armar, "id máximo" if desc else "id mínimo")
+            return data[0].get("id") if data else None
+
+        minimo = extremo(False)
+        if minimo is None:
+            return None
+        maximo = extremo(True)
+        return minimo, (maximo if maximo is not None else minimo)
+
+    def contar_filas(self):
+        """
+        Cantidad exacta de filas a traer (un pedido), o None si el server no
+        la da. El conteo solo sirve para repartir los rangos: si falla aun
+        con los reintentos, se reparte por ids en vez de cortar la carga.
+        """
+        def armar(c):
+            consulta = c.select("id", count="exact")
+            if self.desde_id is not None:
+                consulta = consulta.gt("id", self.desde_id)
+            return consulta.limit(1)
+
+        try:
+            resp = self._tabla.ejecutar(armar, "contar filas")
+        except ErrorDeDatos:
+            medicion.contar("carga.sin_conteo")
+            return None
+        return getattr(resp, "count", None)
+
+    def rangos(self, minimo, maximo, filas=None):
+        """
+        Parte [minimo, maximo] en rangos cerrados (desde, hasta). La cantidad
+        sale de las filas (si se sabe cuántas hay) y no pasa de
+        concurrencia * RANGOS_POR_HILO: dentro de un rango se avanza por
+        keyset, así que un rango con huecos cuesta lo mismo que uno lleno.
+        """
+        span = maximo - minimo + 1
+        por_rango = self.tamanio_lote * self.lotes_por_rango
+        necesarios = -(-(span if filas is None else filas) // por_rango)
+        cantidad = min(necesarios, self.concurrencia * RANGOS_POR_HILO, span)
+        cantidad = max(1, cantidad)
+        paso = -(-span // cantidad)
+        return [
+            (desde, min(desde + paso - 1, maximo))
+            for desde in range(minimo, maximo + 1, paso)
+        ]
+
+    def _lote(self, desde_excl, hasta):
+        with medicion.tramo("carga.lote"):
+            resp = (
+                self._consulta(self.columnas)
+                .order("id", desc=False)
+                .gt("id", desde_excl)
+                .lte("id", hasta)
+                .limit(self.tamanio_lote)
+                .execute()
+            )
+        data = getattr(resp, "data", None) or []
+        medicion.contar("carga.filas", len(data))
+        medicion.contar_bytes("bytes.lista", data)
+        return data
+
+    # ---------- recorrido de un rango ----------
+    def _recorrer_rango(self, desde, hasta, entregar, cancelado):
+        """Keyset dentro del rango; reintenta retomando desde el último id."""
+        last_id = desde - 1
+        fallos = 0
+        while not cancelado.is_set():
+            try:
+                data = self._lote(last_id, hasta)
+            except Exception as e:
+                fallos += 1
+                if fallos > self.reintentos or not es_transitorio(e):
+                    raise
+                time.sleep(self.espera_reintento * (2 ** (fallos - 1)))
+                continue
+
+            fallos = 0
+            if not data:
+                break
+            entregar(data)
+
+            nuevo = data[-1].get("id")
+            if nuevo is None or nuevo >= hasta or len(data) < self.tamanio_lote:
+                break
+            last_id = nuevo
+
+    # ---------- API ----------
+    def iterar_lotes(self):
+        """
+        Entrega cada tanda apenas llega (el orden entre rangos no está
+        garantizado; con concurrencia=1 sale ordenado por id). La cola es
+        acotada: los hilos esperan mientras el que consume no saca. Si un rango
+        agota sus reintentos, se cancela el resto y se relanza el error.
+        """
+        limites = self.limites_id()
+        if limites is None:
+            return
+        rangos = self.rangos(*limites, filas=self.contar_filas())
+        self.rangos_totales = len(rangos)
+        self.rangos_terminados = 0
+
+        cola = queue.Queue(maxsize=self.concurrencia * TANDAS_EN_COLA_POR_HILO)
+        cancelado = threading.Event()
+
+        def poner(item):
+            # con la cola llena se espera, pero sin quedar colgado si ya nadie consume
+            while not cancelado.is_set():
+                try:
+                    cola.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def tarea(desde, hasta):
+            try:
+                self._recorrer_rango(desde, hasta, lambda d: poner(("lote", d)), cancelado)
+                poner(("fin", None))
+            except Exception as e:
+                poner(("error", e))
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrencia, thread_name_prefix="carga")
+        try:
+            for desde, hasta in rangos:
+                pool.submit(tarea, desde, hasta)
+
+            pendientes = len(rangos)
+            while pendientes:
+                tipo, payload = cola.get()
+                if tipo == "lote":
+                    yield payload
+                elif tipo == "fin":
+                    pendientes -= 1
+                    self.rangos_terminados += 1
+                else:
+                    raise payload
+        finally:
+            cancelado.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def obtener_todo(self):
+        """Todas las filas ordenadas por id (igual que el recorrido secuencial)."""
+        todos = []
+        for data in self.iterar_lotes():
+            todos.extend(data)
+        todos.sort(key=lambda r: r.get("id") or 0)
+        return todos
+
+
+class CacheJurisprudencia:
+    """
+    Cuerpos de jurisprudencia bajo demanda, con un LRU acotado por la
+    cantidad total de caracteres guardados.
+
+    Se usa desde el hilo de Tk y desde hilos de trabajo: todo pasa por un lock.
+    Si se le pasa un almacen (CacheLocal), antes de ir al server busca ahí y
+    guarda ahí lo que trae.
+    """
+
+    def __init__(self, cliente, tabla="compendio", max_caracteres=4_000_000, tamanio_lote=50,
+                 almacen=None):
+        self.cliente = cliente
+        self.almacen = almacen
+        self.tabla = tabla
+        self._tabla = TablaCompendio(cliente, tabla)
+        self.max_caracteres = max_caracteres
+        self.tamanio_lote = max(1, int(tamanio_lote))
+        self._textos = OrderedDict()
+        self._caracteres = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, id_):
+        with self._lock:
+            return id_ in self._textos
+
+    def get(self, id_):
+        """Texto en cache (o None) y lo marca como usado recientemente."""
+        with self._lock:
+            texto = self._textos.get(id_)
+            if texto is not None:
+                self._textos.move_to_end(id_)
+            return texto
+
+    def poner(self, id_, texto):
+        texto = texto if isinstance(texto, str) else ("" if texto is None else str(texto))
+        with self._lock:
+            viejo = self._textos.pop(id_, None)
+            if viejo is not None:
+                self._caracteres -= len(viejo)
+            if len(texto) > self.max_caracteres:
+                return  # no entra: se vuelve a pedir si hace falta
+            self._textos[id_] = texto
+            self._caracteres += len(texto)
+            while self._caracteres > self.max_caracteres and self._textos:
+                _, sale = self._textos.popitem(last=False)
+                self._caracteres -= len(sale)
+
+    def descartar(self, id_):
+        with self._lock:
+            viejo = self._textos.pop(id_, None)
+            if viejo is not None:
+                self._caracteres -= len(viejo)
+
+    def faltantes(self, ids):
+        with self._lock:
+            return [i for i in ids if i is not None and i not in self._textos]
+
+    def traer(self, ids, recordar=True):
+        """
+        Pide al server (por tandas con in_, en paralelo) los ids que no estén en cache.
+        Devuelve {id: texto} para todos los ids pedidos que se pudieron obtener.
+        Con recordar=False no se guardan en el LRU (recorridos masivos que no
+        deben desplazar lo que se está viendo); sí en el almacen.
+        """
+        ids = list(dict.fromkeys(i for i in ids if i is not None))
+        faltan = self.faltantes(ids)
+        traidos = {}
+        if faltan and self.almacen is not None:
+            try:
+                traidos.update(self.almacen.cuerpos(faltan))
+            except Exception:
+                pass
+            if recordar:
+                for id_, texto in traidos.items():
+                    self.poner(id_, texto)
+            faltan = [i for i in faltan if i not in traidos]
+
+        del_server = {}
+        if faltan:
+            # todas las tandas salen juntas; si alguna falla se lanza ErrorDeDatos
+            with medicion.tramo("cuerpos.lote", ids=len(faltan)):
+                data = self._tabla.traer_por_ids(faltan, "id,jurisprudencia", self.tamanio_lote)
+            medicion.contar_bytes("bytes.cuerpos", data)
+            for fila in data:
+                texto = fila.get("jurisprudencia")
+                texto = "" if texto is None else str(texto)
+                del_server[fila.get("id")] = texto
+                if recordar:
+                    self.poner(fila.get("id"), texto)
+
+        if del_server and self.almacen is not None:
+            try:
+                self.almacen.guardar_cuerpos(del_server)
+            except Exception:
+                pass
+        traidos.update(del_server)
+
+        resultado = {}
+        for i in ids:
+            texto = traidos.get(i)
+            if texto is None:
+                texto = self.get(i)
+            if texto is not None:
+                resultado[i] = texto
+        return resultado
+
+    def obtener(self, id_):
+        """Texto de un registro: de la cache o pidiéndolo (bloqueante)."""
+        texto = self.get(id_)
+        if texto is None:
+            texto = self.traer([id_]).get(id_)
+        return texto
@@ -0,0 +1,107 @@
+"""
+Configuración y cliente de Supabase, creados recién cuando se usan.
+
+Importar este módulo no importa supabase ni arma el cliente: eso pasa la
+primera vez que alguien llama a obtener_cliente() (o usa `cliente`, que lo
+hace solo), normalmente desde el hilo de carga, así la ventana aparece sin
+esperar ni la importación ni la construcción del cliente.
+
+El cliente usa una sesión HTTP propia (httpx) en vez de la que arma solo:
+conexiones keep-alive reutilizadas por todos los hilos, HTTP/2 si está
+instalado h2, respuestas comprimidas y timeouts explícitos.
+"""
+import os
+import threading
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_ANON_KEY")
+ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "")
+HTTP_TIMEOUT = float(os.environ.get("COMPENDIO_HTTP_TIMEOUT", "30"))
+HTTP_CONEXIONES = int(os.environ.get("COMPENDIO_HTTP_CONEXIONES", "10"))
+
+_cliente = None
+_lock = threading.Lock()
+
+
+def config_completa():
+    return bool(SUPABASE_URL and SUPABASE_KEY)
+
+
+def verificar_config():
+    """Avisa y corta la app si falta la configuración (llamar desde el hilo de Tk)."""
+    if config_completa():
+        return
+    try:
+        from tkinter import messagebox
+        messagebox.showerror(
+            "Config faltante",
+            "Definí SUPABASE_URL y SUPABASE_ANON_KEY en .env o variables de entorno."
+        )
+    except Exception:
+        print("Faltan SUPABASE_URL y/o SUPABASE_ANON_KEY en el entorno.")
+    raise SystemExit(1)
+
+
+def sesion_http():
+    """httpx.Client con pool de conexiones keep-alive, compresión y timeouts."""
+    import httpx
+    try:
+        import h2  # noqa: F401  (sin h2, httpx solo habla HTTP/1.1)
+        http2 = True
+    except ImportError:
+        http2 = False
+    codificaciones = "gzip, deflate"
+    try:
+        import brotli  # noqa: F401
+        codificaciones = "br, " + codificaciones
+    except ImportError:
+        pass
+    limites = httpx.Limits(
+        max_connections=HTTP_CONEXIONES,
+        max_keepalive_connections=HTTP_CONEXIONES,
+        keepalive_expiry=120,
+    )
+    return httpx.Client(
+        # retries: solo reintenta abrir la conexión; los pedidos se reintentan en acceso_datos
+        transport=httpx.HTTPTransport(http2=http2, limits=limites, retries=2),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=10.0),
+        headers={"Accept-Encoding": codificaciones},
+        follow_redirects=True,
+    )
+
+
+def obtener_cliente():
+    """Cliente de Supabase compartido; se crea (una sola vez) en el primer uso."""
+    global _cliente
+    if _cliente is None:
+        with _lock:
+            if _cliente is None:
+                if not config_completa():
+                    raise RuntimeError("Faltan SUPABASE_URL y/o SUPABASE_ANON_KEY en el entorno.")
+                from supabase import create_client
+                try:
+                    from supabase import ClientOptions
+                    opciones = ClientOptions(httpx_client=sesion_http())
+                except (ImportError, TypeError):
+                    opciones = None  # supabase viejo: sin sesión propia
+                if opciones is None:
+                    _cliente = create_client(SUPABASE_URL, SUPABASE_KEY)
+                else:
+                    _cliente = create_client(SUPABASE_URL, SUPABASE_KEY, options=opciones)
+    return _cliente
+
+
+class ClienteDiferido:
+    """Se usa igual que el cliente (cliente.table(...)); lo crea al primer acceso."""
+
+    def __getattr__(self, nombre):
+        return getattr(obtener_cliente(), nombre)
+
+
+cliente = ClienteDiferido()
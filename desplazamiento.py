@@ -0,0 +1,155 @@
+"""
+Rueda del mouse para la lista: junta los eventos y desplaza una vez por cuadro.
+
+Un trackpad o una rueda libre mandan decenas de eventos por segundo; mover el
+canvas en cada uno llena la cola de Tk (cada movimiento re-arma lo visible) y
+el scroll se traba. Acá cada evento solo suma su delta y, como mucho una vez
+cada FRAME_MS, se aplica lo acumulado en un solo yview_scroll.
+
+- Los bind_all se hacen una sola vez. Que la rueda mueva el canvas o el
+  recuadro de jurisprudencia que está bajo el mouse es solo cambiar a qué
+  apunta el motor (apuntar / soltar), sin volver a enlazar nada.
+- Inercia opcional (COMPENDIO_INERCIA, entre 0 y 1): en el canvas lo que se
+  movió en un cuadro sigue en los siguientes, multiplicado por ese factor,
+  hasta quedar en menos de un pixel. 0 = sin inercia.
+- estadisticas() devuelve cuánto tarda cada cuadro, cada cuánto hay uno y
+  cuántos eventos se juntaron en cada uno (para los benchmarks).
+"""
+import os
+import time
+
+import medicion
+from medicion import Estadistica
+
+FRAME_MS = 16            # ~60 cuadros por segundo
+PX_POR_PASO = 60         # en el canvas, un "notch" de rueda
+INERCIA = min(0.95, max(0.0, float(os.environ.get("COMPENDIO_INERCIA", "0"))))
+
+
+def pasos_de(event):
+    """Pasos de rueda del evento (positivo = hacia abajo), en Windows/Mac/Linux."""
+    num = getattr(event, "num", None)
+    if num in (4, 5):  # Linux
+        return -1 if num == 4 else 1
+    delta = getattr(event, "delta", 0) or 0
+    if not delta:
+        return 0
+    # Windows: múltiplos de 120; Mac/trackpad: valores chicos (cada uno cuenta como un paso)
+    sign = -1 if delta > 0 else 1
+    return sign * max(1, abs(delta) // 120)
+
+
+class MotorDesplazamiento:
+    def __init__(self, raiz, canvas, px_por_paso=PX_POR_PASO, inercia=INERCIA, frame_ms=FRAME_MS):
+        self.raiz = raiz
+        self.canvas = canvas
+        self.destino = canvas
+        self.px_por_paso = px_por_paso
+        self.inercia = inercia
+        self.frame_ms = frame_ms
+        self._pendiente = {}      # widget -> pasos acumulados desde el último cuadro
+        self._velocidad = 0.0     # px por cuadro que sigue moviendo la inercia (solo canvas)
+        self._resto_px = 0.0      # fracción de pixel que queda para el cuadro siguiente
+        self._cuadro = None       # after del próximo cuadro
+        self._ultimo_cuadro = 0.0
+        self.eventos = 0
+        self.cuadros = 0
+        self.duracion = Estadistica()     # ms que tarda aplicar un cuadro
+        self.intervalo = Estadistica()    # ms entre cuadros seguidos
+
+    def enlazar(self):
+        """Una sola vez: la rueda de toda la aplicación pasa por acá."""
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):  # Windows/Mac, Linux
+            self.raiz.bind_all(secuencia, self.al_girar)
+
+    # ---------- a quién mueve ----------
+    def apuntar(self, widget):
+        self.destino = widget
+
+    def soltar(self):
+        self.destino = self.canvas
+
+    # ---------- eventos ----------
+    def al_girar(self, event):
+        pasos = pasos_de(event)
+        destino = self.destino
+        if not pasos or destino is None:
+            return
+        self.eventos += 1
+        self._pendiente[destino] = self._pendiente.get(destino, 0) + pasos
+        self._programar()
+
+    def _programar(self):
+        if self._cuadro is not None:
+            return
+        falta = self.frame_ms - (time.perf_counter() - self._ultimo_cuadro) * 1000
+        if falta <= 0:
+            # quieto hace rato: apenas se vacíe la cola (se juntan los eventos que ya llegaron)
+            self._cuadro = self.raiz.after_idle(self._aplicar)
+        else:
+            self._cuadro = self.raiz.after(max(1, int(falta)), self._aplicar)
+
+    # ---------- un cuadro ----------
+    def _aplicar(self):
+        self._cuadro = None
+        inicio = time.perf_counter()
+        if self._ultimo_cuadro and (inicio - self._ultimo_cuadro) * 1000 < 4 * self.frame_ms:
+            self.intervalo.agregar((inicio - self._ultimo_cuadro) * 1000)
+        self._ultimo_cuadro = inicio
+
+        pendiente, self._pendiente = self._pendiente, {}
+        pasos_canvas = pendiente.pop(self.canvas, 0)
+        for widget, pasos in pendiente.items():
+            # Text/ScrolledText: "units" (líneas) es lo correcto
+            try:
+                widget.yview_scroll(pasos, "units")
+            except Exception:
+                pass  # el recuadro se destruyó entre el evento y el cuadro
+
+        px = pasos_canvas * self.px_por_paso
+        if self.inercia:
+            self._velocidad = self._velocidad * self.inercia + px
+            px = self._velocidad
+        px += self._resto_px
+        enteros = int(px)
+        self._resto_px = px - enteros
+        if enteros:
+            try:
+                # En Canvas, scrolleo en PIXELES para poder llegar exactamente al fondo.
+                self.canvas.yview_scroll(enteros, "pixels")
+            except Exception:
+                pass
+
+        ms = (time.perf_counter() - inicio) * 1000
+        self.cuadros += 1
+        self.duracion.agregar(ms)
+        if medicion.ACTIVO:
+            medicion.registrar("scroll.cuadro", ms)
+
+        if self.inercia and abs(self._velocidad * self.inercia) >= 1:
+            self._programar()  # la inercia sigue en el próximo cuadro
+        else:
+            self._velocidad = 0.0
+
+    def detener(self):
+        """Corta la inercia (p. ej. al cambiar de página)."""
+        self._velocidad = 0.0
+        self._resto_px = 0.0
+        self._pendiente.clear()
+
+    # ---------- estadísticas ----------
+    def estadisticas(self):
+        return {
+            "eventos": self.eventos,
+            "cuadros": self.cuadros,
+            "eventos_por_cuadro": round(self.eventos / self.cuadros, 2) if self.cuadros else 0.0,
+            "cuadro_p50_ms": round(self.duracion.percentil(0.5), 3),
+            "cuadro_p95_ms": round(self.duracion.percentil(0.95), 3),
+            "cuadro_max_ms": round(self.duracion.max_ms, 3),
+            "intervalo_p95_ms": round(self.intervalo.percentil(0.95), 2),
+        }
+
+    def reiniciar_estadisticas(self):
+        self.eventos = self.cuadros = 0
+        self.duracion = Estadistica()
+        self.intervalo = Estadistica()
@@ -0,0 +1,290 @@
+"""
+Exportación masiva del compendio.
+
+DOCX: en vez de armar un Document de python-docx en memoria (todo el árbol
+XML junto), se copia la plantilla por defecto de python-docx y se escribe
+word/document.xml en streaming adentro del zip. Los cuerpos de
+jurisprudencia se piden por tandas y se sueltan apenas se escriben, así que
+la memoria no crece con la cantidad de registros.
+
+CSV / JSONL: se escriben fila por fila a medida que llegan las tandas (del
+server con el mismo cargador por id que la carga de la ventana, o de los
+datos ya cargados), con gzip opcional. Memoria constante: la cola del
+cargador es acotada, si el archivo se escribe más lento que lo que llega los
+pedidos esperan. Del server, con varios pedidos a la vez las filas no salen
+ordenadas por id; --ordenado pide de a un rango.
+
+Todo corre fuera del hilo de Tk: avance(hechos, total) informa el progreso y
+cancelado (threading.Event) corta la exportación; el archivo parcial se borra.
+
+Uso sin ventana:
+
+    python exportar.py compendio.csv.gz [--formato csv|jsonl] [--cuerpos] [--desde-cache] [--ordenado]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+import medicion
+from carga import COLUMNAS_LISTA
+
+TANDA_CUERPOS = 50
+TANDA_LOCAL = 200
+
+# caracteres que XML 1.0 no admite (a veces vienen pegados en los textos)
+_INVALIDOS_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+class ExportacionCancelada(Exception):
+    pass
+
+
+def _plantilla_docx():
+    import docx
+    return os.path.join(os.path.dirname(docx.__file__), "templates", "default.docx")
+
+
+def _texto_xml(texto):
+    return escape(_INVALIDOS_XML.sub("", "" if texto is None else str(texto)))
+
+
+def _parrafo(texto, estilo=None, negrita=False):
+    """<w:p> con los saltos de línea como <w:br/> (igual que add_paragraph)."""
+    ppr = f'<w:pPr><w:pStyle w:val="{estilo}"/></w:pPr>' if estilo else ""
+    rpr = "<w:rPr><w:b/></w:rPr>" if negrita else ""
+    lineas = _texto_xml(texto).split("\n")
+    contenido = "<w:br/>".join(f'<w:t xml:space="preserve">{linea}</w:t>' for linea in lineas)
+    return f"<w:p>{ppr}<w:r>{rpr}{contenido}</w:r></w:p>"
+
+
+def _registro_docx(reg, cuerpo):
+    def v(campo, defecto="-"):
+        valor = reg.get(campo)
+        return defecto if valor is None or str(valor).strip() == "" else str(valor)
+
+    return "".join([
+        _parrafo(v("autos"), estilo="Heading3"),
+        _parrafo(f"JURISDICCIÓN/INSTANCIA:\n{v('jurisdiccion')}"),
+        _parrafo(f"FECHA DE SENTENCIA: {v('fecha')}   RESULTADO: {v('resultado')}"),
+        _parrafo(f"VOCES:\n{v('voces')}"),
+        _parrafo(f"LINK FALLO:\n{v('link_fallo')}"),
+        _parrafo("JURISPRUDENCIA:", negrita=True),
+        _parrafo(cuerpo if cuerpo not in (None, "") else "-"),
+    ])
+
+
+def exportar_docx(ruta, registros, traer_cuerpos, avance=None, cancelado=None,
+                  titulo=None, tanda=TANDA_CUERPOS):
+    """
+    Escribe los registros (en el orden dado) en un único .docx, con un
+    título por tema y por subtema cada vez que cambian.
+
+    - traer_cuerpos(ids) -> {id: texto}: se llama por tandas de 'tanda' ids.
+    - avance(hechos, total): opcional, se llama después de cada tanda.
+    - cancelado: threading.Event opcional; si se activa se lanza
+      ExportacionCancelada y no queda archivo.
+
+    Devuelve la cantidad de registros escritos.
+    """
+    total = len(registros)
+    parcial = ruta + ".parcial"
+    with medicion.tramo("exportar.docx", registros=total), zipfile.ZipFile(_plantilla_docx()) as plantilla:
+        documento = plantilla.read("word/document.xml").decode("utf-8")
+        cuerpo_ini = documento.index("<w:body>") + len("<w:body>")
+        cierre = documento.index("<w:sectPr")
+        cabecera, pie = documento[:cuerpo_ini], documento[cierre:]
+        try:
+            with zipfile.ZipFile(parcial, "w", zipfile.ZIP_DEFLATED) as salida:
+                for nombre in plantilla.namelist():
+                    if nombre != "word/document.xml":
+                        salida.writestr(plantilla.getinfo(nombre), plantilla.read(nombre))
+
+                with salida.open("word/document.xml", "w", force_zip64=True) as xml:
+                    def escribir(texto):
+                        xml.write(texto.encode("utf-8"))
+
+                    escribir(cabecera)
+                    if titulo:
+                        escribir(_parrafo(titulo, estilo="Title"))
+                    tema_previo = subtema_previo = None
+                    for inicio in range(0, total, tanda):
+                        if cancelado is not None and cancelado.is_set():
+                            raise ExportacionCancelada()
+                        lote = registros[inicio:inicio + tanda]
+                        cuerpos = traer_cuerpos([r.get("id") for r in lote])
+                        partes = []
+                        for reg in lote:
+                            tema = reg.get("tema") or "SIN TEMA"
+                            subtema = reg.get("subtema") or "SIN SUBTEMA"
+                            if tema != tema_previo:
+                                partes.append(_parrafo(tema, estilo="Heading1"))
+                                tema_previo, subtema_previo = tema, None
+                            if subtema != subtema_previo:
+                                if subtema != "SIN SUBTEMA":
+                                    partes.append(_parrafo(subtema, estilo="Heading2"))
+                                subtema_previo = subtema
+                            partes.append(_registro_docx(reg, cuerpos.get(reg.get("id"))))
+                        escribir("".join(partes))
+                        del cuerpos, partes
+                        if avance is not None:
+                            avance(min(inicio + tanda, total), total)
+                    escribir(pie)
+            os.replace(parcial, ruta)
+        except BaseException:
+            try:
+                os.remove(parcial)
+            except OSError:
+                pass
+            raise
+    return total
+
+
+# ======== CSV / JSONL ========
+def formato_de(ruta):
+    """'jsonl' o 'csv' según la extensión (ignorando un .gz final)."""
+    base = ruta[:-3] if ruta.lower().endswith(".gz") else ruta
+    return "jsonl" if base.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def lotes_del_server(cliente, columnas=COLUMNAS_LISTA, tamanio_lote=50, concurrencia=4, reintentos=3):
+    """
+    (filas, hechos, total) por cada tanda que llega del server, con el mismo
+    cargador por rangos de id que usa la ventana (el orden entre rangos no
+    está garantizado salvo con concurrencia=1).
+    """
+    from carga import CargadorCompendio
+    cargador = CargadorCompendio(
+        cliente, tabla="compendio", columnas=columnas, tamanio_lote=tamanio_lote,
+        concurrencia=concurrencia, reintentos=reintentos,
+    )
+    for lote in cargador.iterar_lotes():
+        yield lote, cargador.rangos_terminados, max(1, cargador.rangos_totales)
+
+
+def lotes_locales(registros, traer_cuerpos=None, tanda=TANDA_LOCAL):
+    """
+    (filas, hechos, total) sobre datos ya cargados; los cuerpos se piden por
+    tanda. Cada tanda se copia a dicts recién al escribirla (no se copia todo
+    de antemano).
+    """
+    total = len(registros)
+    for inicio in range(0, total, tanda):
+        lote = registros[inicio:inicio + tanda]
+        if traer_cuerpos is not None:
+            cuerpos = traer_cuerpos([r.get("id") for r in lote])
+            lote = [dict(r, jurisprudencia=cuerpos.get(r.get("id"))) for r in lote]
+        else:
+            lote = [dict(r) for r in lote]
+        yield lote, min(inicio + tanda, total), total
+
+
+def exportar_tabla(ruta, lotes, columnas, formato=None, comprimir=None, avance=None, cancelado=None):
+    """
+    Escribe las filas de 'lotes' (iterable de (filas, hechos, total)) en CSV
+    o JSONL, tanda por tanda. Con comprimir=None se comprime si la ruta
+    termina en .gz. Devuelve la cantidad de filas escritas.
+    """
+    formato = formato or formato_de(ruta)
+    if comprimir is None:
+        comprimir = ruta.lower().endswith(".gz")
+    columnas = list(columnas)
+    parcial = ruta + ".parcial"
+    escritas = 0
+    inicio = time.perf_counter()
+    try:
+        if comprimir:
+            salida = gzip.open(parcial, "wt", encoding="utf-8", newline="")
+        else:
+            salida = open(parcial, "w", encoding="utf-8", newline="")
+        with salida:
+            if formato == "csv":
+                escritor = csv.DictWriter(salida, fieldnames=columnas, extrasaction="ignore")
+                escritor.writeheader()
+            for filas, hechos, total in lotes:
+                if cancelado is not None and cancelado.is_set():
+                    raise ExportacionCancelada()
+                if formato == "csv":
+                    escritor.writerows(filas)
+                else:
+                    salida.writelines(
+                        json.dumps({c: f.get(c) for c in columnas}, ensure_ascii=False, default=str) + "\n"
+                        for f in filas
+                    )
+                escritas += len(filas)
+                if avance is not None:
+                    avance(hechos, total)
+        os.replace(parcial, ruta)
+        medicion.registrar("exportar.tabla", (time.perf_counter() - inicio) * 1000,
+                           registros=escritas, formato=formato)
+    except BaseException:
+        try:
+            os.remove(parcial)
+        except OSError:
+            pass
+        raise
+    finally:
+        cerrar = getattr(lotes, "close", None)  # un generador del server suelta su pool
+        if cerrar is not None:
+            cerrar()
+    return escritas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta el compendio a CSV o JSONL (opcionalmente .gz).")
+    parser.add_argument("salida", help="archivo de salida (.csv, .jsonl, con .gz para comprimir)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="por defecto, según la extensión")
+    parser.add_argument("--cuerpos", action="store_true", help="incluir el texto de jurisprudencia")
+    parser.add_argument("--desde-cache", action="store_true",
+                        help="usar la cache local en vez de recorrer el server")
+    parser.add_argument("--lote", type=int, default=int(os.environ.get("COMPENDIO_TAMANIO_LOTE", "50")))
+    parser.add_argument("--concurrencia", type=int, default=int(os.environ.get("COMPENDIO_CONCURRENCIA", "4")))
+    parser.add_argument("--ordenado", action="store_true",
+                        help="del server, filas ordenadas por id (un pedido a la vez, más lento)")
+    args = parser.parse_args(argv)
+
+    from conexion import cliente
+    columnas = COLUMNAS_LISTA.split(",") + (["jurisprudencia"] if args.cuerpos else [])
+
+    if args.desde_cache:
+        from cache_local import abrir_cache_local
+        from carga import CacheJurisprudencia
+        cache = abrir_cache_local(COLUMNAS_LISTA.split(","))
+        if cache is None:
+            print("No se pudo abrir la cache local.", file=sys.stderr)
+            return 1
+        registros = sorted(cache.filas(), key=lambda r: r.get("id") or 0)
+        traer = None
+        if args.cuerpos:
+            cuerpos = CacheJurisprudencia(cliente, tamanio_lote=args.lote, almacen=cache)
+            traer = lambda ids: cuerpos.traer(ids, recordar=False)
+        lotes = lotes_locales(registros, traer)
+    else:
+        lotes = lotes_del_server(
+            cliente, columnas=",".join(columnas),
+            tamanio_lote=args.lote, concurrencia=1 if args.ordenado else args.concurrencia,
+        )
+
+    def avance(hechos, total):
+        print(f"\r{100 * hechos / max(1, total):5.1f}%", end="", file=sys.stderr, flush=True)
+
+    try:
+        n = exportar_tabla(args.salida, lotes, columnas, formato=args.formato, avance=avance)
+    except KeyboardInterrupt:
+        print("\nCancelado.", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"\nERROR exportando -> {e!r}", file=sys.stderr)
+        return 1
+    print(f"\n{n} registros -> {args.salida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Índice invertido en memoria para buscar en el compendio sin ir al server.
+
+Indexa autos, voces y jurisdicción de cada fila y, a medida que llegan, los
+cuerpos de jurisprudencia. Consultas:
+
+- palabras sueltas: tienen que estar todas (AND; "AND"/"Y" se ignoran);
+- "entre comillas": frase exacta;
+- prefijo*: cualquier término que empiece así.
+
+Los resultados se ordenan por BM25 (con más peso para autos y voces).
+Texto y consulta se normalizan igual: minúsculas y sin tildes ni diéresis
+(la ñ queda como n), que es como se suele tipear al buscar.
+"""
+import bisect
+import math
+import queue
+import re
+import sys
+import threading
+import unicodedata
+
+# peso de cada campo de la fila (un término en autos/voces vale más que en el cuerpo)
+CAMPOS = {"autos": 2.0, "voces": 2.0, "jurisdiccion": 1.0}
+PESO_CUERPO = 1.0
+K1 = 1.2
+B = 0.75
+MAX_EXPANSION_PREFIJO = 200  # términos como máximo por cada prefijo*
+
+_PALABRA = re.compile(r"\w+")
+_CONSULTA = re.compile(r'"([^"]*)"|(\S+)')
+_OPERADORES = {"and", "y"}
+
+
+def normalizar(texto):
+    """Minúsculas y sin marcas diacríticas ('Cámara' -> 'camara', 'Nº' -> 'no')."""
+    if not texto:
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return texto.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def tokens(texto):
+    return _PALABRA.findall(normalizar(texto))
+
+
+def analizar(consulta):
+    """Cláusulas de la consulta: ("termino", t), ("prefijo", p) o ("frase", [t, ...])."""
+    clausulas = []
+    for frase, palabra in _CONSULTA.findall(consulta or ""):
+        if frase:
+            partes = tokens(frase)
+            if len(partes) > 1:
+                clausulas.append(("frase", partes))
+            elif partes:
+                clausulas.append(("termino", partes[0]))
+            continue
+        if palabra.lower() in _OPERADORES:
+            continue
+        es_prefijo = palabra.endswith("*")
+        partes = tokens(palabra.rstrip("*"))
+        for i, t in enumerate(partes):
+            ultimo = i == len(partes) - 1
+            clausulas.append(("prefijo" if es_prefijo and ultimo else "termino", t))
+    return clausulas
+
+
+class IndiceTexto:
+    """
+    Índice invertido término -> {id: tf ponderado}.
+
+    Cada registro tiene dos partes que se indexan por separado (la fila y el
+    cuerpo), así actualizar una no obliga a re-tokenizar la otra. Todo pasa
+    por un lock: se llena desde un hilo de fondo y se consulta desde el de Tk.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}   # término -> {id: tf ponderado}
+        self._partes = {}     # (id, parte) -> {término: tf ponderado} (para poder sacarla)
+        self._largo = {}      # id -> largo ponderado (suma de las partes)
+        self._largo_total = 0.0
+        self._vocabulario = None  # términos ordenados, para los prefijos (se arma a demanda)
+        self.version = 0          # sube con cada cambio: un resultado viejo no sirve para refinar
+
+    def __len__(self):
+        with self._lock:
+            return len(self._largo)
+
+    def tiene_cuerpo(self, id_):
+        with self._lock:
+            return (id_, "cuerpo") in self._partes
+
+    # ---------- carga ----------
+    def _poner_parte(self, id_, parte, textos):
+        tf = {}
+        for texto, peso in textos:
+            for t in tokens(texto):
+                tf[t] = tf.get(t, 0.0) + peso
+        with self._lock:
+            self._sacar_parte(id_, parte)
+            if not tf:
+                return
+            self.version += 1
+            postings = self._postings
+            for t, valor in tf.items():
+                lista = postings.get(t)
+                if lista is None:
+                    t = sys.intern(t)
+                    postings[t] = lista = {}
+                    self._vocabulario = None
+                lista[id_] = lista.get(id_, 0.0) + valor
+            largo = sum(tf.values())
+            self._partes[(id_, parte)] = tf
+            self._largo[id_] = self._largo.get(id_, 0.0) + largo
+            self._largo_total += largo
+
+    def _sacar_parte(self, id_, parte):
+        tf = self._partes.pop((id_, parte), None)
+        if tf is None:
+            return
+        self.version += 1
+        for t, valor in tf.items():
+            lista = self._postings.get(t)
+            if lista is None:
+                continue
+            resto = lista.get(id_, 0.0) - valor
+            if resto > 1e-9:
+                lista[id_] = resto
+            else:
+                lista.pop(id_, None)
+                if not lista:
+                    del self._postings[t]
+                    self._vocabulario = None
+        largo = sum(tf.values())
+        self._largo_total -= largo
+        restante = self._largo.get(id_, 0.0) - largo
+        if restante > 1e-9:
+            self._largo[id_] = restante
+        else:
+            self._largo.pop(id_, None)
+
+    def agregar_fila(self, fila):
+        self._poner_parte(fila.get("id"), "fila", [(fila.get(c), p) for c, p in CAMPOS.items()])
+
+    def agregar_cuerpo(self, id_, texto):
+        self._poner_parte(id_, "cuerpo", [(texto, PESO_CUERPO)])
+
+    def quitar(self, id_):
+        with self._lock:
+            self._sacar_parte(id_, "fila")
+            self._sacar_parte(id_, "cuerpo")
+
+    # ---------- consulta ----------
+    def _expandir(self, prefijo):
+        """(términos que empiezan con prefijo, si quedaron afuera por MAX_EXPANSION_PREFIJO)."""
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self._postings)
+        vocab = self._vocabulario
+        i = bisect.bisect_left(vocab, prefijo)
+        encontrados = []
+        while i < len(vocab) and vocab[i].startswith(prefijo) and len(encontrados) < MAX_EXPANSION_PREFIJO:
+            encontrados.append(vocab[i])
+            i += 1
+        return encontrados, i < len(vocab) and vocab[i].startswith(prefijo)
+
+    def buscar(self, consulta, verificar=None, dentro_de=None, estado=None):
+        """
+        Lista de (id, puntaje) ordenada por relevancia.
+
+        - verificar(ids) -> {id: texto}: textos para confirmar las frases
+          (el índice no guarda posiciones). Sin verificar, una frase se
+          trata como AND de sus palabras.
+        - dentro_de: si se indica, solo se consideran esos ids (refinar).
+        - estado: dict que se completa con "version" (la del índice que se
+          consultó) y "completa" (False si algún prefijo* se recortó o si la
+          consulta no tiene términos; ese resultado no contiene todo y no
+          sirve de base para refinar).
+        """
+        clausulas = analizar(consulta)
+        if estado is not None:
+            estado["version"] = self.version
+            # sin términos ("y ", "- ") no se buscó nada: no es base para refinar
+            estado["completa"] = bool(clausulas)
+        if not clausulas:
+            return []
+        with self._lock:
+            if estado is not None:
+                estado["version"] = self.version
+            puntuables = []
+            frases = []
+            grupos = []  # ids que tiene que cumplir cada término / prefijo
+            for tipo, valor in clausulas:
+                if tipo == "prefijo":
+                    terminos, recortado = self._expandir(valor)
+                    if recortado and estado is not None:
+                        estado["completa"] = False
+                    ids = set()
+                    for t in terminos:
+                        ids.update(self._postings[t])
+                    grupos.append(ids)
+                else:
+                    terminos = valor if tipo == "frase" else [valor]
+                    grupos.extend(self._postings.get(t, {}).keys() for t in terminos)
+                    if tipo == "frase":
+                        frases.append(valor)
+                puntuables.extend(terminos)
+
+            # intersección empezando por el grupo más chico
+            candidatos = None if dentro_de is None else set(dentro_de)
+            for ids in sorted(grupos, key=len):
+                candidatos = set(ids) if candidatos is None else candidatos.intersection(ids)
+                if not candidatos:
+                    return []
+
+            n = max(1, len(self._largo))
+            promedio = (self._largo_total / n) or 1.0
+            puntajes = dict.fromkeys(candidatos, 0.0)
+            for t in dict.fromkeys(puntuables):
+                lista = self._postings.get(t)
+                if not lista:
+                    continue
+                idf = math.log(1 + (n - len(lista) + 0.5) / (len(lista) + 0.5))
+                largo = self._largo
+                # se recorre lo más corto: la lista del término o los candidatos
+                if len(lista) < len(puntajes):
+                    pares = ((i, tf) for i, tf in lista.items() if i in puntajes)
+                else:
+                    pares = ((i, lista[i]) for i in puntajes if i in lista)
+                for id_, tf in pares:
+                    norma = K1 * (1 - B + B * largo.get(id_, 0.0) / promedio)
+                    puntajes[id_] += idf * tf * (K1 + 1) / (tf + norma)
+
+        if frases and verificar is not None:
+            textos = verificar(list(puntajes))
+            buscadas = [" " + " ".join(f) + " " for f in frases]
+            for id_ in list(puntajes):
+                normal = " " + " ".join(tokens(textos.get(id_, ""))) + " "
+                if not all(b in normal for b in buscadas):
+                    del puntajes[id_]
+
+        return sorted(puntajes.items(), key=lambda par: (-par[1], par[0]))
+
+
+class IndexadorEnSegundoPlano:
+    """
+    Un hilo que ejecuta, en orden, los trabajos de indexación que se le
+    encolan (tokenizar cuerpos largos no debe frenar el hilo de Tk).
+    """
+
+    def __init__(self):
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    @property
+    def ocupado(self):
+        return self._cola.unfinished_tasks > 0
+
+    def encolar(self, funcion, *args):
+        self._cola.put((funcion, args))
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._correr, name="indice", daemon=True)
+                self._hilo.start()
+
+    def _correr(self):
+        while True:
+            funcion, args = self._cola.get()
+            try:
+                funcion(*args)
+            except Exception as e:
+                print("ERROR indexando -> ", repr(e))
+            finally:
+                self._cola.task_done()
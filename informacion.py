@@ -1,38 +1,29 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from supabase import create_client, Client
-from docx import Document
+import tkinter.font as tkfont
 from tkinter import filedialog
-import webbrowser
-from edicion import EditaRegistro
-from busqueda import BusquedaAvanzada
-from PIL import Image, ImageTk
+from carga import CargadorCompendio, CacheJurisprudencia, COLUMNAS_LISTA
+from cache_local import abrir_cache_local, directorio_datos
+from conexion import ADMIN_PASSWORD, verificar_config, cliente as supabase
+from acceso_datos import TablaCompendio, ErrorDeDatos
+from indice import IndiceTexto, IndexadorEnSegundoPlano
+from registros import Registro, registros
+from desplazamiento import MotorDesplazamiento
+import medicion
 from tkinter.scrolledtext import ScrolledText  # <-- para la barra SOLO en Jurisprudencia
 import math
+import threading
+import queue
+import bisect
+import hashlib
+import time
 
 import sys, os
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except Exception:
-    pass
-
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_ANON_KEY")
-ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    try:
-        messagebox.showerror(
-            "Config faltante",
-            "Definí SUPABASE_URL y SUPABASE_ANON_KEY en .env o variables de entorno."
-        )
-    except Exception:
-        print("Faltan SUPABASE_URL y/o SUPABASE_ANON_KEY en el entorno.")
-    raise SystemExit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Lo pesado (supabase, docx, PIL, webbrowser, edición y búsqueda) se importa
+# recién cuando se usa: importar este módulo no arma el cliente ni toca la red.
+# Los import van dentro de las funciones (no por nombre en string) para que
+# PyInstaller los siga encontrando.
 # ─────────────────────────────────────────────────────────────────────────────
 
 def resource_path(rel):
@@ -60,34 +51,803 @@ ICON_BORRAR = "\U0001F5D1"  # 🗑 (queda definido aunque ahora usamos imagen)
 
 # Altura fija para que el área de Jurisprudencia quede alineada en todas las tarjetas
 JURIS_ALTURA_LINEAS = 18  # subí o bajá este número si querés más/menos alto
+# El cuerpo se carga de a poco: un adelanto (lo que entra en el recuadro) mientras la
+# tarjeta está fuera de pantalla, un tramo al verse y más tramos al bajar dentro del recuadro
+CUERPO_ADELANTO = 3000
+CUERPO_TRAMO = 20000
+
+# Lista virtual: cuánto se monta por encima/debajo del viewport y altos de arranque
+MARGEN_VIRTUAL_PX = 800
+POOL_LIBRES_MAX = 24  # tarjetas ocultas que se guardan para reusar (el resto se destruye)
+# Páginas vecinas: con la página quieta, en ratos libres se arman las filas de las
+# PREFETCH_PAGINAS siguientes/anteriores, se piden sus cuerpos y se dejan enlazadas
+# (ocultas) las tarjetas de su primera pantalla. PREFETCH_TARJETAS_MAX topea esas tarjetas.
+PREFETCH_PAGINAS = int(os.environ.get("COMPENDIO_PREFETCH_PAGINAS", "1"))
+PREFETCH_TARJETAS_MAX = int(os.environ.get("COMPENDIO_PREFETCH_TARJETAS", "40"))
+PREFETCH_ESPERA_MS = 250
+# Barra de paginación: cuántos números se muestran a cada lado de la página actual
+PAGINAS_VECINAS_BARRA = 2
+ALTO_FILA_ESTIMADO = {"tema": 62, "subtema": 26, "paginacion": 44}
+
+# Tarjetas: wraplength máximo de los textos y lo que se reserva a la derecha (botones)
+WRAP_TARJETA = 1220
+RESERVA_BOTONES_PX = 130
+# Las páginas se arman por alto (px estimados) en vez de por cantidad fija de tarjetas
+ALTO_PAGINA_PX = int(os.environ.get("COMPENDIO_ALTO_PAGINA", "24000"))
+
+# Carga en segundo plano: cada cuánto (ms) el hilo de Tk revisa la cola de lotes
+CARGA_POLL_MS = 40
+# Carga paralela por rangos de id (configurable por entorno)
+CARGA_TAMANIO_LOTE = int(os.environ.get("COMPENDIO_TAMANIO_LOTE", "50"))
+CARGA_CONCURRENCIA = int(os.environ.get("COMPENDIO_CONCURRENCIA", "4"))
+CARGA_REINTENTOS = int(os.environ.get("COMPENDIO_REINTENTOS", "3"))
+# Tope (en caracteres) del LRU de cuerpos de jurisprudencia
+CUERPOS_CACHE_CARACTERES = int(os.environ.get("COMPENDIO_CACHE_CUERPOS", "4000000"))
+# Búsqueda local: con COMPENDIO_INDEXAR_CUERPOS=1, al terminar la carga se traen en
+# segundo plano todos los cuerpos que falten (quedan en la cache local) para indexarlos
+INDEXAR_CUERPOS = os.environ.get("COMPENDIO_INDEXAR_CUERPOS", "0") == "1"
+LOTE_CUERPOS_INDICE = 200
+# Filtro del header: espera desde la última tecla y cuántas consultas recientes se recuerdan
+FILTRO_ESPERA_MS = 180
+FILTRO_RECIENTES = 16
+# HUD de medición (F2): cada cuánto se refresca
+HUD_REFRESCO_MS = 500
+# Acciones masivas: ids por pedido in_ (acota el largo de la URL) y campos que se pueden cambiar
+LOTE_MASIVO = int(os.environ.get("COMPENDIO_LOTE_MASIVO", "500"))
+CAMPOS_MASIVOS = [("TEMA", "tema"), ("SUBTEMA", "subtema"), ("RESULTADO", "resultado")]
+
+def clave_orden(reg):
+    """Clave de orden del listado: tema, subtema, id (vacíos como se muestran)."""
+    return ((reg.get("tema") or "SIN TEMA"), (reg.get("subtema") or "SIN SUBTEMA"), reg.get("id") or 0)
+
+def grupo_de(reg):
+    """(tema, subtema) como se muestran en los títulos."""
+    return (reg.get("tema") or "SIN TEMA"), (reg.get("subtema") or "SIN SUBTEMA")
+
+
+class IndiceGrupos:
+    """
+    Tramos contiguos de cada tema y de cada (tema, subtema) en self.datos
+    ordenado: clave -> [inicio, fin). Se arma en una pasada y las ediciones
+    lo corrigen corriendo los tramos (hay pocos grupos), sin recorrer los datos.
+    """
+
+    def __init__(self):
+        self.temas = {}      # tema -> [inicio, fin]
+        self.subtemas = {}   # (tema, subtema) -> [inicio, fin]
+        self.version = 0
+
+    def reconstruir(self, datos):
+        temas = {}
+        subtemas = {}
+        previo = None
+        for i, reg in enumerate(datos):
+            tema, subtema = grupo_de(reg)
+            if (tema, subtema) != previo:
+                previo = (tema, subtema)
+                subtemas.setdefault(previo, [i, i])
+                temas.setdefault(tema, [i, i])
+            subtemas[previo][1] = i + 1
+            temas[tema][1] = i + 1
+        self.temas = temas
+        self.subtemas = subtemas
+        self.version += 1
+
+    def rango(self, tema, subtema=None):
+        tramo = self.temas.get(tema) if subtema is None else self.subtemas.get((tema, subtema))
+        return tuple(tramo) if tramo else None
+
+    def cantidad(self, tema, subtema=None):
+        tramo = self.rango(tema, subtema)
+        return tramo[1] - tramo[0] if tramo else 0
+
+    def secciones(self):
+        """[(tema, cantidad, [(subtema, cantidad), ...]), ...] en el orden del listado."""
+        por_tema = {}
+        for (tema, subtema), (a, b) in sorted(self.subtemas.items(), key=lambda kv: kv[1][0]):
+            por_tema.setdefault(tema, []).append((subtema, b - a))
+        return [(t, self.cantidad(t), por_tema.get(t, [])) for t in sorted(self.temas, key=lambda t: self.temas[t][0])]
+
+    def quitar(self, pos, tema, subtema):
+        """El registro de la posición pos (del grupo indicado) salió de la lista."""
+        for tramos, clave in ((self.temas, tema), (self.subtemas, (tema, subtema))):
+            for k, tramo in tramos.items():
+                if k == clave:
+                    tramo[1] -= 1
+                elif tramo[0] > pos:
+                    tramo[0] -= 1
+                    tramo[1] -= 1
+            if clave in tramos and tramos[clave][1] <= tramos[clave][0]:
+                del tramos[clave]
+        self.version += 1
+
+    def insertar(self, pos, tema, subtema):
+        """Se insertó un registro del grupo indicado en la posición pos."""
+        for tramos, clave in ((self.temas, tema), (self.subtemas, (tema, subtema))):
+            for k, tramo in tramos.items():
+                if k == clave:
+                    tramo[1] += 1
+                elif tramo[0] >= pos:
+                    tramo[0] += 1
+                    tramo[1] += 1
+            if clave not in tramos:
+                tramos[clave] = [pos, pos + 1]
+        self.version += 1
 
 # --- NUEVO: función para recolorear PNG a un color ---
-def recolorear_icono(ruta_icono, color_hex, size=None):
+# Cache de iconos recoloreados para todo el proceso: (ruta, color, size) -> Image
+# (o la ruta del PNG ya guardado en disco, que Tk abre sin pasar por PIL).
+# Con persistir=True también quedan en disco (carpeta "iconos" de la cache local).
+_ICONOS = {}
+_ICONOS_LOCK = threading.Lock()
+
+def _ruta_icono_en_disco(ruta_icono, color_hex, size):
+    try:
+        st = os.stat(ruta_icono)
+    except OSError:
+        return None
+    firma = f"{os.path.abspath(ruta_icono)}|{st.st_mtime_ns}|{st.st_size}|{color_hex}|{size}"
+    nombre = hashlib.sha1(firma.encode("utf-8")).hexdigest() + ".png"
+    return os.path.join(directorio_datos(), "iconos", nombre)
+
+def _recolorear(ruta_icono, color_hex, size):
+    from PIL import Image
+    img = Image.open(ruta_icono).convert("RGBA")
+    if size:
+        img = img.resize(size, Image.LANCZOS)
+
+    # En bloque: los píxeles visibles (alfa > 0) toman el color; el alfa se conserva
+    alfa = img.getchannel("A")
+    visibles = alfa.point(lambda a: 255 if a > 0 else 0)
+    color = Image.new("RGB", img.size, color_hex)
+    rgb = Image.composite(color, img.convert("RGB"), visibles)
+    rgb.putalpha(alfa)
+    return rgb
+
+def recolorear_icono(ruta_icono, color_hex, size=None, persistir=True):
     """
     Convierte un PNG (negro o monocromo) al color indicado (hex) manteniendo alfa.
     Opcionalmente cambia el tamaño (width, height).
+    El resultado queda memorizado: la segunda vez no se procesa nada.
     """
-    img = Image.open(ruta_icono).convert("RGBA")
-    if size:
-        img = img.resize(size, Image.LANCZOS)
+    size = tuple(size) if size else None
+    clave = (ruta_icono, color_hex.lower(), size)
+    with _ICONOS_LOCK:
+        img = _ICONOS.get(clave)
+    if isinstance(img, str):
+        return tk.PhotoImage(file=img)
+    en_disco = None
+    if img is None and persistir:
+        en_disco = _ruta_icono_en_disco(ruta_icono, clave[1], size)
+        if en_disco and os.path.exists(en_disco):
+            # ya procesado en otra corrida: Tk lee el PNG directo, sin importar PIL
+            try:
+                foto = tk.PhotoImage(file=en_disco)
+                with _ICONOS_LOCK:
+                    _ICONOS[clave] = en_disco
+                return foto
+            except Exception:
+                pass
+    if img is None:
+        img = _recolorear(ruta_icono, color_hex, size)
+        if en_disco:
+            try:
+                os.makedirs(os.path.dirname(en_disco), exist_ok=True)
+                img.save(en_disco)
+            except Exception as e:
+                print("ERROR guardando icono en cache -> ", repr(e))
+        with _ICONOS_LOCK:
+            _ICONOS[clave] = img
+    from PIL import ImageTk
+    return ImageTk.PhotoImage(img)
 
-    datas = img.getdata()
-    r = int(color_hex[1:3], 16)
-    g = int(color_hex[3:5], 16)
-    b = int(color_hex[5:7], 16)
+def wrap_tarjeta(ancho_canvas):
+    """wraplength de los textos de la tarjeta para un ancho de canvas."""
+    return max(300, min(WRAP_TARJETA, ancho_canvas - 2 * 38 - RESERVA_BOTONES_PX))
 
-    nueva = []
-    for (pr, pg, pb, pa) in datas:
-        # Si hay alfa (pixel visible), pintamos al color elegido preservando alfa
-        if pa > 0:
-            nueva.append((r, g, b, pa))
+def texto_tarjeta(v):
+    """Valor seguro para mostrar en la tarjeta ('-' si viene vacío)."""
+    if v is None:
+        return "-"
+    try:
+        v = str(v)
+    except Exception:
+        v = "-"
+    return v if v.strip() != "" else "-"
+
+
+# ======== LISTA VIRTUAL ========
+class AlturasFilas:
+    """
+    Altos de las filas con sumas acumuladas en O(log n) (árbol de Fenwick).
+    Cambiar el alto de una fila no obliga a recalcular los offsets de todas
+    las que siguen: el fondo del contenido se mantiene al día de a un delta.
+    """
+
+    def __init__(self, alturas=()):
+        self._alt = list(alturas)
+        n = len(self._alt)
+        arbol = [0] * (n + 1)
+        for j in range(1, n + 1):
+            arbol[j] += self._alt[j - 1]
+            k = j + (j & -j)
+            if k <= n:
+                arbol[k] += arbol[j]
+        self._arbol = arbol
+        self._total = sum(self._alt)
+
+    def __len__(self):
+        return len(self._alt)
+
+    def __getitem__(self, i):
+        return self._alt[i]
+
+    def total(self):
+        return self._total
+
+    def actualizar(self, i, alto):
+        delta = alto - self._alt[i]
+        if delta:
+            self._alt[i] = alto
+            self._total += delta
+            arbol = self._arbol
+            j = i + 1
+            while j < len(arbol):
+                arbol[j] += delta
+                j += j & -j
+        return delta
+
+    def offset(self, i):
+        """y de la fila i (suma de los altos anteriores)."""
+        suma = 0
+        arbol = self._arbol
+        while i > 0:
+            suma += arbol[i]
+            i -= i & -i
+        return suma
+
+    def fila_en(self, y):
+        """Índice de la fila que contiene la coordenada y (acotado a las filas que hay)."""
+        n = len(self._alt)
+        if n == 0:
+            return 0
+        pos = 0
+        resto = y
+        paso = 1 << (n.bit_length() - 1)
+        arbol = self._arbol
+        while paso:
+            sig = pos + paso
+            if sig <= n and arbol[sig] <= resto:
+                pos = sig
+                resto -= arbol[sig]
+            paso >>= 1
+        return max(0, min(pos, n - 1))
+
+
+class CacheAlturas:
+    """
+    Alto de la fila de cada tarjeta por (id, wraplength).
+
+    Si la tarjeta ya se midió con ese wrap se usa la medida; si no, se estima
+    con las métricas de las fuentes (sin crear widgets) y se le suma el error
+    medio observado entre estimación y medida. Así el scrollregion, los saltos
+    a un registro y los cortes de página se calculan sin esperar al layout.
+    """
+
+    MUESTRA = "Jurisprudencia de la Cámara Nacional de Apelaciones, sala A (expte. 1234/2019): "
+
+    def __init__(self, widget):
+        info = tkfont.Font(root=widget, font=INFO_FONT)
+        etiqueta = tkfont.Font(root=widget, font=LABEL_FONT)
+        boton = tkfont.Font(root=widget, font=BTN_ICONO)
+        self._linea = info.metrics("linespace")
+        self._ancho_caracter = info.measure(self.MUESTRA) / len(self.MUESTRA)
+
+        linea_etiqueta = etiqueta.metrics("linespace")
+        secciones = len(TarjetaRegistro.SECCIONES)
+        # partes que no dependen del registro: pads, etiquetas y el área de jurisprudencia
+        self._fijo_info = (
+            4 + 4                                   # pady del bloque de info
+            + secciones * (1 + 4 + linea_etiqueta)  # pady + etiqueta de cada sección
+            + JURIS_ALTURA_LINEAS * self._linea + 6  # ScrolledText (bd, highlight, pady)
+        )
+        alto_boton = boton.metrics("linespace") + 8
+        self._alto_botones = 10 + 10 + 3 * (alto_boton + 14) + (34 + 4 + 14)
+        self._pads_fila = 18 + 18 + 2  # pad de la fila + borde de la tarjeta
+
+        # por id y adentro por wrap: olvidar un registro es un solo pop
+        self._medidas = {}     # id -> {wrap: alto medido}
+        self._estimadas = {}   # id -> {wrap: alto estimado sin corrección}
+        self._error = 0.0      # media de (medido - estimado)
+        self._muestras = 0
+
+    def _lineas(self, texto, wrap):
+        por_linea = max(1, int(wrap / self._ancho_caracter))
+        return sum(max(1, -(-len(parrafo) // por_linea)) for parrafo in texto.split("\n"))
+
+    def _base(self, reg, wrap):
+        por_wrap = self._estimadas.get(reg.get("id"))
+        if por_wrap is None:
+            por_wrap = self._estimadas[reg.get("id")] = {}
+        alto = por_wrap.get(wrap)
+        if alto is None:
+            lineas = sum(
+                self._lineas(texto_tarjeta(reg.get(campo)), wrap)
+                for _, campo in TarjetaRegistro.SECCIONES if campo is not None
+            )
+            info = self._fijo_info + lineas * self._linea
+            alto = max(info, self._alto_botones) + self._pads_fila
+            por_wrap[wrap] = alto
+        return alto
+
+    def alto(self, reg, wrap):
+        por_wrap = self._medidas.get(reg.get("id"))
+        if por_wrap is not None:
+            medido = por_wrap.get(wrap)
+            if medido is not None:
+                return medido
+        return self._base(reg, wrap) + int(round(self._error))
+
+    def medir(self, reg, wrap, alto):
+        por_wrap = self._medidas.get(reg.get("id"))
+        if por_wrap is None:
+            por_wrap = self._medidas[reg.get("id")] = {}
+        if wrap not in por_wrap:
+            # media móvil: se adapta si cambian las fuentes o el DPI
+            self._muestras = min(self._muestras + 1, 50)
+            self._error += (alto - self._base(reg, wrap) - self._error) / self._muestras
+        por_wrap[wrap] = alto
+
+    def olvidar(self, id_):
+        """El registro cambió de contenido: sus altos se vuelven a estimar/medir."""
+        self._medidas.pop(id_, None)
+        self._estimadas.pop(id_, None)
+
+
+# Las filas (barras de paginación, títulos de tema/subtema y tarjetas) son
+# ventanas del Canvas ubicadas por offset calculado. Solo existen widgets para
+# las filas cerca del viewport; al scrollear se re-enlazan a otros registros.
+class FilaMontable:
+    """Widget que vive en el Canvas como ventana y se reubica según la fila."""
+
+    def __init__(self, visor, widget, x=0, pad_arriba=0, pad_abajo=0, margen_x=None):
+        self.visor = visor
+        self.widget = widget
+        self.x = x
+        self.pad_arriba = pad_arriba
+        self.pad_abajo = pad_abajo
+        self.margen_x = margen_x  # None = ancho natural; si no, ancho del canvas menos márgenes
+        self.fila = None
+        self.item = visor.canvas.create_window(x, 0, window=widget, anchor="nw", state="hidden")
+        widget.bind("<Configure>", self._al_configurar, add="+")
+        if medicion.ACTIVO:
+            medicion.contar(f"widgets.{type(self).__name__}.creados")
+
+    def alto_fila(self, alto_widget):
+        return self.pad_arriba + alto_widget + self.pad_abajo
+
+    def ubicar(self, fila, y, ancho_canvas):
+        self.fila = fila
+        canvas = self.visor.canvas
+        canvas.coords(self.item, self.x, y + self.pad_arriba)
+        if self.margen_x is not None:
+            canvas.itemconfigure(self.item, width=max(1, ancho_canvas - 2 * self.margen_x))
+        canvas.itemconfigure(self.item, state="normal")
+
+    def ocultar(self):
+        self.fila = None
+        self.visor.canvas.itemconfigure(self.item, state="hidden")
+
+    def medir(self):
+        """Alto real de la fila si el widget ya tiene geometría (o None)."""
+        h = self.widget.winfo_height()
+        return self.alto_fila(h) if h > 1 else None
+
+    def destruir(self):
+        try:
+            self.visor.canvas.delete(self.item)
+            self.widget.destroy()
+        except Exception:
+            pass
+        if medicion.ACTIVO:
+            medicion.contar(f"widgets.{type(self).__name__}.destruidos")
+
+    def _al_configurar(self, event):
+        if self.fila is not None and event.height > 1:
+            self.visor._medir_fila(self.fila, self.alto_fila(event.height))
+
+
+class EncabezadoGrupo(FilaMontable):
+    """Título de tema o de subtema."""
+
+    def __init__(self, visor, tipo):
+        self.tipo = tipo
+        if tipo == "tema":
+            lbl = tk.Label(visor.canvas, font=TITULO_TEMA, bg=BG_COLOR, fg="#000")
+            super().__init__(visor, lbl, x=30, pad_arriba=28, pad_abajo=4)
         else:
-            nueva.append((pr, pg, pb, pa))
-    img.putdata(nueva)
-    return ImageTk.PhotoImage(img)
+            lbl = tk.Label(visor.canvas, font=TITULO_SUBTEMA, bg=BG_COLOR, fg="#000")
+            super().__init__(visor, lbl, x=52)
+
+    def mostrar(self, texto):
+        self.widget.config(text=texto if self.tipo == "tema" else f"» {texto}")
+
+
+class BarraPaginas:
+    """
+    « ‹ 1 … 6 7 [8] 9 10 … 250 › »   Ir a [   ] de 250
+
+    Cantidad fija de etiquetas (no depende del total de páginas): se crean una
+    vez y actualizar() solo cambia texto/estado de las que cambiaron. Los
+    huecos que sobran se sacan con grid_remove (conservan su lugar).
+    """
+
+    def __init__(self, parent, ir_a):
+        self.ir_a = ir_a
+        self.nav = tk.Frame(parent, bg=BG_COLOR)
+        self.nav.pack(anchor="center")
+        self._huecos = []    # [label, página a la que lleva (o None), estado mostrado]
+        lugares = ["«", "‹"] + ["n"] * (2 * PAGINAS_VECINAS_BARRA + 5) + ["›", "»"]
+        for col, txt in enumerate(lugares):
+            lbl = tk.Label(self.nav, bg=BG_COLOR, font=("Inter", 12))
+            lbl.grid(row=0, column=col, padx=6)
+            hueco = [lbl, None, None]
+            lbl.bind("<Button-1>", lambda e, h=hueco: h[1] is not None and self.ir_a(h[1]))
+            self._huecos.append(hueco)
+        col = len(lugares)
+        tk.Label(self.nav, text="Ir a", bg=BG_COLOR, fg="#555", font=("Inter", 11)).grid(
+            row=0, column=col, padx=(18, 4))
+        self.entrada = tk.Entry(self.nav, width=5, font=("Inter", 11), justify="center",
+                                relief="solid", bd=1)
+        self.entrada.grid(row=0, column=col + 1)
+        self.entrada.bind("<Return>", self._ir_a_tipeada)
+        self.lbl_total = tk.Label(self.nav, bg=BG_COLOR, fg="#555", font=("Inter", 11))
+        self.lbl_total.grid(row=0, column=col + 2, padx=(4, 0))
+        self._total = None
+
+    @staticmethod
+    def numeros(actual, total, vecinas=PAGINAS_VECINAS_BARRA):
+        """Páginas a mostrar (None = «…»): la primera, las vecinas de la actual y la última."""
+        if total <= 2 * vecinas + 5:
+            return list(range(1, total + 1))
+        desde = max(2, min(actual - vecinas, total - 2 * vecinas - 2))
+        hasta = min(total - 1, max(actual + vecinas, 2 * vecinas + 3))
+        numeros = [1]
+        if desde == 3:
+            numeros.append(2)        # un «…» que ocultaría una sola página no ahorra nada
+        elif desde > 3:
+            numeros.append(None)
+        numeros.extend(range(desde, hasta + 1))
+        if hasta == total - 2:
+            numeros.append(total - 1)
+        elif hasta < total - 2:
+            numeros.append(None)
+        numeros.append(total)
+        return numeros
+
+    def _poner(self, hueco, texto, destino, actual=False):
+        estado = (texto, destino, actual)
+        if hueco[2] == estado:
+            return
+        lbl = hueco[0]
+        if texto is None:
+            lbl.grid_remove()
+        else:
+            habilitado = destino is not None
+            lbl.config(
+                text=texto,
+                fg="#1746A2" if habilitado else "#999999",
+                font=("Inter", 12, "bold") if actual else ("Inter", 12),
+                cursor="hand2" if habilitado else "arrow",
+            )
+            if hueco[2] is None or hueco[2][0] is None:
+                lbl.grid()
+        hueco[1] = destino
+        hueco[2] = estado
+
+    def actualizar(self, actual, total):
+        total = max(1, int(total))
+        huecos = self._huecos
+        self._poner(huecos[0], "«", 1 if actual > 1 else None)
+        self._poner(huecos[1], "‹", actual - 1 if actual > 1 else None)
+        numeros = self.numeros(actual, total)
+        for hueco, i in zip(huecos[2:-2], range(len(huecos) - 4)):
+            if i >= len(numeros):
+                self._poner(hueco, None, None)
+            elif numeros[i] is None:
+                self._poner(hueco, "…", None)
+            else:
+                p = numeros[i]
+                self._poner(hueco, str(p), p if p != actual else None, actual=(p == actual))
+        self._poner(huecos[-2], "›", actual + 1 if actual < total else None)
+        self._poner(huecos[-1], "»", total if actual < total else None)
+        if total != self._total:
+            self._total = total
+            self.lbl_total.config(text=f"de {total}")
+
+    def _ir_a_tipeada(self, event=None):
+        texto = self.entrada.get().strip()
+        self.entrada.delete(0, "end")
+        try:
+            pagina = int(texto)
+        except ValueError:
+            self.nav.bell()
+            return "break"
+        self.ir_a(max(1, min(pagina, self._total or 1)))
+        return "break"
+
+
+class TarjetaRegistro(FilaMontable):
+    """
+    Tarjeta de un registro. Los widgets se crean una sola vez; mostrar()
+    los re-enlaza a otro registro (textos, cuerpo y a quién apuntan los botones).
+    """
+
+    SECCIONES = [
+        ("AUTOS CARATULADOS", "autos"),
+        ("JURISDICCIÓN/INSTANCIA", "jurisdiccion"),
+        ("FECHA DE SENTENCIA", "fecha"),
+        ("RESULTADO", "resultado"),
+        ("VOCES", "voces"),
+        ("LINK FALLO", "link_fallo"),
+        ("JURISPRUDENCIA", None),
+    ]
+
+    def __init__(self, visor):
+        self.reg = None
+        self.numero = None
+        self._url = None
+        self._textos = {}          # campo -> texto mostrado (evita config() que no cambian nada)
+        self._cuerpo_fuente = None     # texto completo del cuerpo enlazado
+        self._cuerpo_cargado = 0       # caracteres de ese texto ya insertados en el recuadro
+        self._cuerpo_expandido = False
+        self._tramo_pendiente = False
+        self._wrap = WRAP_TARJETA
+
+        card = tk.Frame(
+            visor.canvas,
+            bg=FRAME_COLOR,
+            bd=1,                 # borde físico parejo (sin highlight)
+            relief="solid",
+            highlightthickness=0  # evita la “rayita” por highlight recortado
+        )
+        super().__init__(visor, card, x=38, pad_arriba=18, pad_abajo=18, margen_x=38)
+
+        # mantener scroll de la vista
+        card.bind("<Enter>", lambda e: visor.rueda.soltar())
+        card.bind("<Leave>", lambda e: visor.rueda.soltar())
+
+        card.grid_columnconfigure(0, weight=9)
+        card.grid_columnconfigure(1, weight=1)
+
+        info_frame = tk.Frame(card, bg=FRAME_COLOR)
+        info_frame.grid(row=0, column=0, sticky="nw", padx=(0, 18), pady=(4, 4))
+
+        self.valores = {}
+        for label, campo in self.SECCIONES:
+            block = tk.Frame(info_frame, bg=FRAME_COLOR)
+            block.pack(anchor="w", pady=(1, 4), fill="x")
+            tk.Label(
+                block,
+                text=label + ":",
+                font=LABEL_FONT,
+                fg="#1746A2",
+                bg=FRAME_COLOR
+            ).pack(anchor="w")
+
+            if campo is None:
+                st = ScrolledText(
+                    block,
+                    font=INFO_FONT,
+                    wrap="word",
+                    height=JURIS_ALTURA_LINEAS,
+                    bd=1,
+                    relief="solid"
+                )
+                st.pack(fill="x", padx=0, pady=(0, 0))
+                st.configure(yscrollcommand=self._al_desplazar_cuerpo)
+                st.bind("<Enter>", lambda e, c=st: visor.rueda.apuntar(c))
+                st.bind("<Leave>", lambda e: visor.rueda.soltar())
+                self.st = st
+            else:
+                valor = tk.Label(
+                    block,
+                    font=INFO_FONT,
+                    fg="#222",
+                    bg=FRAME_COLOR,
+                    wraplength=WRAP_TARJETA,
+                    justify="left"
+                )
+                valor.pack(anchor="w")
+                self.valores[campo] = valor
+
+        # el link se abre según el registro enlazado al momento del click
+        self.valores["link_fallo"].bind("<Button-1>", self._abrir_link)
+
+        # Botones (los command leen self.reg al hacer click: no hay que rehacerlos)
+        btns_frame = tk.Frame(card, bg=FRAME_COLOR)
+        btns_frame.grid(row=0, column=1, sticky="ne", padx=(0, 8), pady=10)
+        btn_style = dict(
+            font=BTN_ICONO,
+            bg=BTN_COLOR,
+            fg=BTN_TEXT_COLOR,
+            activebackground=BTN_HOVER_BG,
+            activeforeground=BTN_HOVER_TEXT,
+            relief="flat",
+            borderwidth=0,
+            highlightthickness=2,
+            highlightbackground=BTN_BORDER_COLOR,
+            cursor="hand2",
+            width=3,
+            height=1,
+        )
+        btn_copiar = tk.Button(
+            btns_frame,
+            text=ICON_COPIAR,
+            command=lambda: visor.copiar_registro(self.reg),
+            **btn_style
+        )
+        btn_copiar.pack(pady=7)
+        btn_descargar = tk.Button(
+            btns_frame,
+            text=ICON_DESCARGAR,
+            command=lambda: visor.descargar_docx(self.reg),
+            **btn_style
+        )
+        btn_descargar.pack(pady=7)
+        btn_editar = tk.Button(
+            btns_frame,
+            text=ICON_EDITAR,
+            command=lambda: visor.editar_registro(self.reg),
+            **btn_style
+        )
+        btn_editar.pack(pady=7)
+
+        btn_borrar = tk.Button(
+            btns_frame,
+            image=visor.icono_tacho_azul,
+            command=lambda: visor.borrar_registro(self.reg),
+            bg=BTN_COLOR,
+            activebackground=BTN_HOVER_BG,
+            relief="flat",
+            borderwidth=0,
+            highlightthickness=2,
+            highlightbackground=BTN_BORDER_COLOR,
+            cursor="hand2",
+            width=34,
+            height=34
+        )
+        btn_borrar.pack(pady=7)
+
+        # selección para acciones masivas (shift+click marca el tramo desde la anterior)
+        self.marcada = tk.BooleanVar(card, value=False)
+        chk = tk.Checkbutton(
+            btns_frame,
+            variable=self.marcada,
+            bg=FRAME_COLOR,
+            activebackground=FRAME_COLOR,
+            highlightthickness=0,
+            cursor="hand2",
+            command=lambda: visor.marcar(self.reg, self.marcada.get())
+        )
+        chk.pack(pady=(2, 0))
+        chk.bind("<Shift-Button-1>", lambda e: visor.marcar_tramo(self.reg) or "break")
+
+        for btn in [btn_copiar, btn_descargar, btn_editar, btn_borrar]:
+            btn.bind("<Enter>", lambda e, b=btn: b.config(bg=BTN_HOVER_BG))
+            btn.bind("<Leave>", lambda e, b=btn: b.config(bg=BTN_COLOR))
+
+        # --- NÚMERO DE TARJETA (arriba derecha) ---
+        self.badge = tk.Label(
+            card,
+            bg=FRAME_COLOR,
+            fg="#1746A2",
+            font=("Inter", 10, "bold")
+        )
+        self.badge.place(relx=1.0, x=-12, y=6, anchor="ne")
+        self.badge.lift()  # trae al frente por si algo lo tapa
+
+    def ubicar(self, fila, y, ancho_canvas):
+        wrap = self.visor._wrap
+        if wrap != self._wrap:
+            self._wrap = wrap
+            for lbl in self.valores.values():
+                lbl.config(wraplength=wrap)
+        super().ubicar(fila, y, ancho_canvas)
+
+    def mostrar(self, reg, numero, cuerpo=None):
+        """Re-enlaza la tarjeta a 'reg'."""
+        self.reg = reg
+        for campo, lbl in self.valores.items():
+            if campo != "link_fallo":
+                self._poner_texto(campo, lbl, texto_tarjeta(reg.get(campo, "")))
+
+        # LINK FALLO: solo tratamos como link si es string no-vacío
+        valor = reg.get("link_fallo", "")
+        link = self.valores["link_fallo"]
+        url = valor.strip() if isinstance(valor, str) and valor.strip() not in ["", "-"] else None
+        texto = url if url else texto_tarjeta(valor)
+        if url != self._url or self._textos.get("link_fallo") != texto:
+            self._url = url
+            self._textos["link_fallo"] = texto
+            if url:
+                link.config(text=url, font=(INFO_FONT[0], INFO_FONT[1], "underline"),
+                            fg="#1662bb", cursor="hand2")
+            else:
+                link.config(text=texto, font=INFO_FONT, fg="#222", cursor="")
+
+        if numero != self.numero:
+            self.numero = numero
+            self.badge.config(text=str(numero))
+        self.poner_marca(reg.get("id") in self.visor._seleccion)
+        self.poner_cuerpo(cuerpo)
+
+    def poner_marca(self, marcada):
+        if self.marcada.get() != marcada:
+            self.marcada.set(marcada)
+
+    def _poner_texto(self, campo, lbl, texto):
+        if self._textos.get(campo) != texto:
+            self._textos[campo] = texto
+            lbl.config(text=texto)
+
+    def poner_cuerpo(self, texto):
+        """Enlaza el cuerpo; hasta que la tarjeta se ve solo se inserta el adelanto."""
+        texto = texto_tarjeta(texto) if texto is not None else "Cargando jurisprudencia…"
+        if texto != self._cuerpo_fuente:
+            self._cuerpo_fuente = texto
+            self._cuerpo_cargado = 0
+            self._cuerpo_expandido = False
+            self._cargar_cuerpo_hasta(CUERPO_ADELANTO)
+        self.st.yview_moveto(0.0)
+
+    def expandir_cuerpo(self):
+        """La tarjeta está en pantalla: se inserta el primer tramo entero."""
+        if not self._cuerpo_expandido:
+            self._cuerpo_expandido = True
+            self._cargar_cuerpo_hasta(CUERPO_TRAMO)
+
+    def _cargar_cuerpo_hasta(self, limite):
+        fuente = self._cuerpo_fuente or ""
+        desde = self._cuerpo_cargado
+        hasta = len(fuente)
+        if limite < hasta:
+            # cortar en un salto de línea o espacio para no partir palabras
+            corte = max(fuente.rfind("\n", desde, limite), fuente.rfind(" ", desde, limite))
+            hasta = corte + 1 if corte > desde else limite
+        if hasta <= desde and desde:
+            return
+        st = self.st
+        st.configure(state="normal")
+        if desde == 0:
+            st.delete("1.0", "end")
+        st.insert("end-1c", fuente[desde:hasta])
+        st.configure(state="disabled")
+        self._cuerpo_cargado = hasta
+
+    def _al_desplazar_cuerpo(self, primero, ultimo):
+        self.st.vbar.set(primero, ultimo)
+        # cerca del final de lo cargado: el tramo siguiente (fuera de este callback de Tk)
+        if (self._cuerpo_expandido and not self._tramo_pendiente and float(ultimo) > 0.85
+                and self._cuerpo_cargado < len(self._cuerpo_fuente or "")):
+            self._tramo_pendiente = True
+            self.widget.after_idle(self._siguiente_tramo)
+
+    def _siguiente_tramo(self):
+        self._tramo_pendiente = False
+        if self._cuerpo_expandido:
+            self._cargar_cuerpo_hasta(self._cuerpo_cargado + CUERPO_TRAMO)
+
+    def _abrir_link(self, event=None):
+        url = self._url
+        if url:
+            import webbrowser
+            webbrowser.open_new(url if url.startswith("http") else f"https://{url}")
+
 
 class VisualizadorBase(tk.Toplevel):
     def __init__(self, master=None):
+        verificar_config()
         super().__init__(master)
         self.title("Visualización Compendio")
         ancho = 1450
@@ -98,9 +858,10 @@ class VisualizadorBase(tk.Toplevel):
         self.configure(bg=BG_COLOR)
         self.resizable(True, True)
 
-        # --- DEBUG: bandera y toggle overlay ---
-        self._debug_overlay_on = True
-        self.bind("<F2>", lambda e: self._toggle_debug_overlay())
+        # --- F2: HUD de medición (tiempos y contadores en vivo) y líneas de referencia ---
+        self._hud = None
+        self._medicion_previa = medicion.ACTIVO
+        self.bind("<F2>", lambda e: self._alternar_hud())
 
         # --- Cargar y guardar el icono de tacho recoloreado (para que no lo borre el GC) ---
         self.icono_tacho_azul = recolorear_icono(
@@ -123,6 +884,34 @@ class VisualizadorBase(tk.Toplevel):
         )
         self.menu_popup.add_command(label="Menú principal", command=self.volver_menu)
         self.menu_popup.add_command(label="Búsqueda avanzada", command=self.busqueda_avanzada)
+        self.menu_popup.add_command(label="Filtrar / buscar…  (Ctrl+F)", command=self.pedir_busqueda)
+        # temas/subtemas con su cantidad; se re-arma solo si cambió el índice de grupos
+        self.menu_secciones = tk.Menu(self.menu_popup, tearoff=0, postcommand=self._armar_menu_secciones)
+        self.menu_popup.add_cascade(label="Ir a sección", menu=self.menu_secciones)
+        self._menu_secciones_version = None
+        self.menu_exportar = tk.Menu(self.menu_popup, tearoff=0, postcommand=self._armar_menu_exportar)
+        self.menu_exportar.add_command(label="Página actual", command=lambda: self.exportar_word("pagina"))
+        self.menu_exportar.add_command(label="Búsqueda / filtro actual", command=lambda: self.exportar_word("busqueda"))
+        self.menu_exportar_temas = tk.Menu(self.menu_exportar, tearoff=0)
+        self.menu_exportar.add_cascade(label="Un tema o subtema", menu=self.menu_exportar_temas)
+        self.menu_exportar.add_command(label="Todo el compendio", command=lambda: self.exportar_word("todo"))
+        self.menu_popup.add_cascade(label="Exportar a Word (.docx)", menu=self.menu_exportar)
+        self.menu_popup.add_command(label="Exportar tabla (CSV / JSONL)…", command=self.exportar_tabla)
+        self._menu_exportar_version = None
+        self.menu_popup.add_command(label="Quitar búsqueda", command=self.quitar_busqueda)
+        self.menu_popup.add_command(label="Seleccionar página actual", command=self.seleccionar_pagina)
+        self.menu_popup.add_command(label="Quitar selección", command=self.quitar_seleccion)
+        self.bind("<Control-f>", lambda e: self.pedir_busqueda())
+        self.bind("<Prior>", lambda e: self._pagina_por_teclado(e, lambda: self.current_page - 1))
+        self.bind("<Next>", lambda e: self._pagina_por_teclado(e, lambda: self.current_page + 1))
+        self.bind("<Home>", lambda e: self._pagina_por_teclado(e, lambda: 1))
+        self.bind("<End>", lambda e: self._pagina_por_teclado(e, self._total_paginas))
+        self.vista_continua = tk.BooleanVar(self, value=False)
+        self.menu_popup.add_checkbutton(
+            label="Vista continua (sin páginas)",
+            variable=self.vista_continua,
+            command=self._cambiar_vista_continua
+        )
 
         # --- Header ---
         header = tk.Frame(self, bg=BG_COLOR)
@@ -146,111 +935,446 @@ class VisualizadorBase(tk.Toplevel):
         )
         self.burger_btn.pack(side="right", padx=(0, 20), pady=4)
 
-        # --- Scroll general ---
-        self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0, borderwidth=0)
-        scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=BG_COLOR)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self._ajustar_scrollregion()
+        # --- Filtro: se busca mientras se escribe (con espera y sin encolar búsquedas) ---
+        self.filtro_var = tk.StringVar(self)
+        self.entry_filtro = tk.Entry(
+            header, textvariable=self.filtro_var, font=("Inter", 12), width=32,
+            relief="solid", bd=1, highlightthickness=0
         )
-        self._canvas_window_id = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.bind("<Configure>", lambda e: self.canvas.itemconfig(self._canvas_window_id, width=e.width))
-
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.entry_filtro.pack(side="right", padx=(0, 12), pady=4)
+        self.filtro_var.trace_add("write", lambda *args: self._al_tipear_filtro())
+        self.entry_filtro.bind("<Return>", lambda e: self._aplicar_filtro_ya())
+        self.entry_filtro.bind("<Escape>", lambda e: self.quitar_busqueda())
+
+        # resultado de la búsqueda local (oculto si no hay búsqueda); click = quitarla
+        self.lbl_busqueda = tk.Label(
+            header, font=("Inter", 11), fg="#1746A2", bg=BG_COLOR, cursor="hand2"
+        )
+        self.lbl_busqueda.bind("<Button-1>", lambda e: self.quitar_busqueda())
+
+        # acciones sobre los registros marcados (oculta si no hay selección)
+        self._seleccion = set()        # ids marcados (sobreviven al cambiar de página o de búsqueda)
+        self._ancla_seleccion = None   # id del último marcado, para shift+click
+        self.barra_seleccion = tk.Frame(header, bg=BG_COLOR)
+        self.lbl_seleccion = tk.Label(self.barra_seleccion, font=("Inter", 11), fg="#1746A2", bg=BG_COLOR)
+        self.lbl_seleccion.pack(side="left", padx=(0, 8))
+        for texto, comando in (
+            ("Cambiar…", self.editar_seleccion),
+            ("Borrar", self.borrar_seleccion),
+            ("✕", self.quitar_seleccion),
+        ):
+            tk.Button(
+                self.barra_seleccion, text=texto, font=("Inter", 10), bg=BTN_COLOR, fg=BTN_TEXT_COLOR,
+                relief="flat", highlightthickness=2, highlightbackground=BTN_BORDER_COLOR,
+                cursor="hand2", command=comando
+            ).pack(side="left", padx=2)
+
+        # --- Scroll general (lista virtual sobre el Canvas) ---
+        self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0, borderwidth=0)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._al_desplazar)
+        self.canvas.bind("<Configure>", self._al_redimensionar_canvas)
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
+
+        self._filas = []        # ("paginacion", lado) / ("tema", t) / ("subtema", s) / ("tarjeta", reg, n)
+        self._alturas = AlturasFilas()  # alto (estimado o medido) y offset de cada fila
+        self._medidas = {}      # fila -> alto real informado, se aplica una vez por ciclo idle
+        self._montadas = {}     # índice de fila -> FilaMontable en pantalla
+        self._pool_tarjetas = []   # tarjetas ocultas, la más vieja primero
+        self._libres_por_id = {}   # id del último registro enlazado -> tarjeta del pool
+        self._pool_encabezados = {"tema": [], "subtema": []}
+        self._alto_tipo = {}     # último alto medido por tipo de fila (títulos y barras)
+        self.alturas_cache = CacheAlturas(self)  # alto de cada tarjeta por (id, wrap)
+        self._wrap = wrap_tarjeta(ancho - 20)    # hasta que el canvas tenga su ancho real
+        self._wrap_cambiado = False
+        self._fila_de_id = {}    # id -> índice de su fila en la página dibujada
+        self._paginas_preparadas = {}    # página -> (limites con los que se armó, filas)
+        self._tarjetas_preparadas = {}   # id -> tarjeta oculta ya enlazada (página vecina)
+        self._prefetch_after = None
+        self._visibles_pendiente = False
+        self._montando = False
+        self._visibles_otra_vez = False
+        self._alto_sr = 1        # alto del scrollregion vigente
+        self._scrollregion = None
+
+        # barras de paginación: dos filas fijas, se reubican arriba y abajo
+        self.pagination_top = tk.Frame(self.canvas, bg=BG_COLOR)
+        self.pagination_bottom_outer = tk.Frame(
+            self.canvas,
+            bg=BG_COLOR,
+            bd=0,
+            highlightthickness=0
+        )
+        # barra centrada dentro del contenedor de ancho completo
+        self.pagination_bottom = tk.Frame(
+            self.pagination_bottom_outer,
+            bg=BG_COLOR,
+            bd=0,
+            highlightthickness=0
+        )
+        self.pagination_bottom.pack(side="top", anchor="center")
+        self._paginadores = [
+            BarraPaginas(self.pagination_top, self._go_to_page),
+            BarraPaginas(self.pagination_bottom, self._go_to_page),
+        ]
+        self._barras_paginacion = {
+            "arriba": FilaMontable(self, self.pagination_top, pad_arriba=6, pad_abajo=8, margen_x=0),
+            "abajo": FilaMontable(self, self.pagination_bottom_outer, pad_arriba=12, pad_abajo=16, margen_x=0),
+        }
 
         # --- Rueda global: que siempre mueva el Canvas, desde donde estés ---
-        self._wheel_target = self.canvas
-        self.bind_all("<MouseWheel>", self._on_mousewheel)     # Windows / Mac
-        self.bind_all("<Button-4>", self._on_mousewheel)       # Linux (scroll up)
-        self.bind_all("<Button-5>", self._on_mousewheel)       # Linux (scroll down)
-
-        # --- Cargar datos ---
-        self.datos = self.obtener_datos()
-        print("DEBUG total filas traídas:", len(self.datos))
-        self.update_idletasks()
-        
+        # (o el recuadro de jurisprudencia bajo el mouse); un desplazamiento por cuadro
+        self.rueda = MotorDesplazamiento(self, self.canvas)
+        self.rueda.enlazar()
+
         # --- paginación (solo config) ---
-        self.cards_per_page = 32  # <<<< clave: evitar superar ~32k px de alto por página
+        # Con la lista virtual no hay tope de alto de Tk: las páginas son solo navegación
+        # y se cortan por alto estimado (una página ≈ alto_pagina_px)
+        self.alto_pagina_px = ALTO_PAGINA_PX
+        self._limites_pagina = None  # índice en self.datos donde empieza cada página
         self.current_page = 1
 
-        # Render de la página actual
+        # --- Cargar datos en segundo plano ---
+        # El hilo de trabajo solo habla con Supabase; los lotes vuelven al hilo de Tk
+        # por una cola que se vacía con after(). Tk no es thread-safe.
+        self.datos = []
+        self._cerrando = False
+        self._cola_carga = queue.Queue()
+        self._carga_gen = 0
+        self._carga_activa = False
+        self._carga_avance = 0.0  # fracción de rangos de id ya completos
+        self._pagina_ids = []  # ids de la página que está dibujada
+
+        # Cache local en disco: la ventana abre con lo guardado y después sincroniza
+        self.cache_local = abrir_cache_local(COLUMNAS_LISTA.split(","))
+        if self.cache_local is not None:
+            try:
+                self.datos = self.cache_local.filas(fabrica=Registro)
+            except Exception as e:
+                print("ERROR leyendo cache local -> ", repr(e))
+                self.datos = []
+        self._por_id = {r.get("id"): r for r in self.datos}
+        self._pos_por_id = None    # id -> posición en self.datos (se arma a demanda)
+        self._ids_tocados = set()  # modificados/borrados durante la sincronización
+
+        # Escrituras (editar/borrar) con reintentos y errores que se informan
+        self.tabla = TablaCompendio(supabase, tabla="compendio")
+        # Cuerpos de jurisprudencia: se piden por página y quedan en un LRU
+        self.cuerpos = CacheJurisprudencia(
+            supabase,
+            tabla="compendio",
+            max_caracteres=CUERPOS_CACHE_CARACTERES,
+            tamanio_lote=CARGA_TAMANIO_LOTE,
+            almacen=self.cache_local,
+        )
+        self._tarjetas = {}       # id -> TarjetaRegistro montada
+        self._cuerpos_en_vuelo = set()
+        self._cola_tareas = queue.Queue()
+        self._tareas_pendientes = 0
+        self._datos_desordenados = bool(self.datos)
+        self.grupos = IndiceGrupos()    # tramos de cada tema/subtema en self.datos ordenado
+        self._grupos_al_dia = False
+
+        # Búsqueda local: índice invertido que se llena en un hilo aparte
+        self.indice = IndiceTexto()
+        self._indexador = IndexadorEnSegundoPlano()
+        self._consulta = None
+        self._resultado = None  # registros de la búsqueda (None = se ve todo el compendio)
+        self._filtro_after = None
+        self._busqueda_gen = 0          # sube con cada consulta: resultados viejos se descartan
+        self._busqueda_en_vuelo = False
+        self._busqueda_pendiente = None  # última consulta tipeada mientras había otra en vuelo
+        self._busquedas_recientes = {}   # texto -> (ids en orden de relevancia, completa), las últimas N
+        self._base_refinar = None        # (texto, ids) del último resultado completo, para refinar
+        self._version_recordada = 0      # versión del índice con la que valen esas dos
+        if self.datos:
+            self._indexador.encolar(self._indexar_filas, list(self.datos))
+        if self.cache_local is not None:
+            self._indexador.encolar(self._indexar_cuerpos_locales)
+
+        # Render inicial (vacío) para que la ventana aparezca enseguida
         self.mostrar_datos_agrupados()
+        self._iniciar_carga()
+
+    def destroy(self):
+        self._cerrando = True
+        super().destroy()
 
-        # --- DEBUG: cuántas tarjetas quedaron renderizadas ---
+    # =================== CARGA EN SEGUNDO PLANO ===================
+    def _iniciar_carga(self):
+        """Lanza el hilo que trae el compendio por tandas."""
+        if self._carga_activa:
+            return
+        self._carga_activa = True
+        self._carga_gen += 1
+        self._carga_avance = 0.0
+        self._mostrar_progreso_carga()
+        hilo = threading.Thread(
+            target=self._trabajador_carga,
+            args=(self._carga_gen,),
+            daemon=True
+        )
+        hilo.start()
+        self.after(CARGA_POLL_MS, self._procesar_cola_carga)
+
+    def _trabajador_carga(self, gen):
+        """Corre FUERA del hilo de Tk: no tocar widgets acá."""
         try:
-            total_cards = sum(
-                1 for w in self.scrollable_frame.winfo_children()
-                if isinstance(w, tk.Frame) and w is not None
-                and w.cget("bg") == FRAME_COLOR
-            )
-            print("DEBUG tarjetas renderizadas:", total_cards)
-        except Exception:
+            if self.cache_local is not None:
+                eventos = self.cache_local.sincronizar(
+                    supabase,
+                    self._nuevo_cargador,
+                    tabla="compendio",
+                    tamanio_lote=CARGA_TAMANIO_LOTE,
+                )
+            else:
+                eventos = self._eventos_sin_cache()
+            for tipo, filas, avance in eventos:
+                if self._cerrando or gen != self._carga_gen:
+                    return
+                if tipo == "filas":
+                    self._cola_carga.put(("lote", gen, (filas, avance)))
+                else:
+                    self._cola_carga.put(("borrados", gen, filas))
+            self._cola_carga.put(("fin", gen, None))
+        except Exception as e:
+            self._cola_carga.put(("error", gen, e))
+
+    def _eventos_sin_cache(self):
+        cargador = self._nuevo_cargador()
+        for lote in cargador.iterar_lotes():
+            yield ("filas", lote, cargador.rangos_terminados / max(1, cargador.rangos_totales))
+
+    def _incorporar_filas(self, filas):
+        """Filas nuevas se agregan (como Registro); las que ya estaban se actualizan en el mismo objeto."""
+        for fila in filas:
+            id_ = fila.get("id")
+            previa = self._por_id.get(id_)
+            if previa is None:
+                reg = Registro(fila)
+                self.datos.append(reg)
+                self._por_id[id_] = reg
+            else:
+                previa.clear()
+                previa.update(fila)
+                self.cuerpos.descartar(id_)
+                self.alturas_cache.olvidar(id_)
+                self._ids_tocados.add(id_)
+        self._indexador.encolar(self._indexar_filas, list(filas))
+        self._invalidar_busquedas()
+        self._invalidar_paginas()
+
+    def _quitar_filas(self, ids):
+        ids = set(ids)
+        self.datos = [r for r in self.datos if r.get("id") not in ids]
+        self._grupos_al_dia = False
+        for id_ in ids:
+            self._por_id.pop(id_, None)
+            self.cuerpos.descartar(id_)
+        if self._seleccion & ids:
+            self._seleccion -= ids
+            self._actualizar_barra_seleccion()
+        self._ids_tocados.update(ids)
+        self._indexador.encolar(self._desindexar, list(ids))
+        self._invalidar_busquedas()
+        self._invalidar_paginas()
+
+    def _procesar_cola_carga(self):
+        if self._cerrando:
+            return
+        llegaron = False
+        terminado = False
+        error = None
+        try:
+            while True:
+                tipo, gen, payload = self._cola_carga.get_nowait()
+                if gen != self._carga_gen:
+                    continue  # restos de una carga anterior
+                if tipo == "lote":
+                    lote, self._carga_avance = payload
+                    self._incorporar_filas(lote)
+                    llegaron = True
+                elif tipo == "borrados":
+                    self._quitar_filas(payload)
+                    llegaron = True
+                elif tipo == "fin":
+                    terminado = True
+                else:
+                    error = payload
+                    terminado = True
+        except queue.Empty:
             pass
 
-    # =================== DEBUG HELPERS ===================
-    def _toggle_debug_overlay(self):
-        self._debug_overlay_on = not self._debug_overlay_on
-        self._debug_dump("F2 toggle")
+        if llegaron:
+            self._datos_desordenados = True
 
-    def _contenido_ymax(self):
-        """y + alto del hijo más bajo (fondo real del contenido)."""
-        ymax = 0
-        for w in self.scrollable_frame.winfo_children():
-            try:
-                y = w.winfo_y()
-                h = w.winfo_height()
-                ymax = max(ymax, y + h)
-            except Exception:
-                pass
-        return ymax
+        if terminado:
+            self._finalizar_carga(error)
+            return
 
-    def _encontrar_ultimo_card(self):
-        """Encuentra el último frame de tarjeta (por estilo) y su fondo."""
-        last_w = None
-        last_bottom = 0
-        for w in self.scrollable_frame.winfo_children():
+        if llegaron:
+            self._al_crecer_datos()
+        self.after(CARGA_POLL_MS, self._procesar_cola_carga)
+
+    def _en_segundo_plano(self, trabajo, listo=None, fallo=None):
+        """Corre trabajo() en un hilo y entrega el resultado a listo/fallo en el hilo de Tk."""
+        def correr():
             try:
-                if isinstance(w, tk.Frame) and str(w.cget("bg")) == FRAME_COLOR:
-                    y = w.winfo_y()
-                    h = w.winfo_height()
-                    if y + h >= last_bottom:
-                        last_bottom = y + h
-                        last_w = w
-            except Exception:
-                pass
-        return last_w, last_bottom
+                self._cola_tareas.put((listo, trabajo()))
+            except Exception as e:
+                self._cola_tareas.put((fallo, e))
 
-    def _debug_dump(self, origen):
+        self._tareas_pendientes += 1
+        threading.Thread(target=correr, daemon=True).start()
+        if self._tareas_pendientes == 1:
+            self.after(CARGA_POLL_MS, self._procesar_tareas)
+
+    def _procesar_tareas(self):
+        if self._cerrando:
+            return
         try:
-            self.update_idletasks()
-            visible_h = self.canvas.winfo_height()
-            req_h = self.scrollable_frame.winfo_reqheight()
-            real_h = self.scrollable_frame.winfo_height()
-            ymax = self._contenido_ymax()
-            sr = self.canvas.cget("scrollregion") or "0 0 0 0"
-            try:
-                sr_parts = [int(float(x)) for x in sr.split()]
-                sr_h = sr_parts[3] if len(sr_parts) == 4 else 0
-            except Exception:
-                sr_h = 0
-            _, last_card_bottom = self._encontrar_ultimo_card()
+            while True:
+                callback, valor = self._cola_tareas.get_nowait()
+                self._tareas_pendientes -= 1
+                if callback is None:
+                    continue
+                try:
+                    callback(valor)
+                except Exception as ex:
+                    print("ERROR en tarea de fondo -> ", repr(ex))
+        except queue.Empty:
+            pass
+        if self._tareas_pendientes > 0:
+            self.after(CARGA_POLL_MS, self._procesar_tareas)
 
-            print(f"\n[DEBUG:{origen}] pag={self.current_page}  "
-                  f"visible_h={visible_h}  req={req_h} real={real_h}  "
-                  f"ymax={ymax}  last_card_bottom={last_card_bottom}  "
-                  f"scrollregion_h={sr_h}")
+    def _ordenar_datos(self):
+        """Ordena self.datos solo si llegaron filas nuevas desde el último orden."""
+        if not self._datos_desordenados:
+            return
+        # Timsort aprovecha los tramos ya ordenados: re-ordenar por tanda es barato
+        try:
+            with medicion.tramo("ordenar", filas=len(self.datos)):
+                self.datos.sort(key=clave_orden)
+        except Exception:
+            pass
+        self._datos_desordenados = False
+        self._grupos_al_dia = False
+        self._invalidar_paginas()
+
+    def _al_crecer_datos(self):
+        """Primera página apenas alcanza para llenarla; después solo paginación y progreso."""
+        self._mostrar_progreso_carga()
+        if not self._pagina_ids and self._primera_pagina_llena():
+            self.mostrar_datos_agrupados()
+        else:
+            self._actualizar_paginacion()
+
+    def _finalizar_carga(self, error=None):
+        self._carga_activa = False
+        self._ocultar_progreso_carga()
+        if error is not None:
+            messagebox.showerror("Error", f"No se pudo obtener la información: {str(error)}")
+        medicion.evento("carga.fin", filas=len(self.datos), error=repr(error) if error else None)
+
+        if INDEXAR_CUERPOS and error is None:
+            self._indexador.encolar(self._traer_cuerpos_para_indice, [r.get("id") for r in self.datos])
+
+        # Re-dibujar solo si la página visible cambió con las filas que llegaron tarde
+        self._grupos_actualizados()  # ordena si hace falta y deja listo el índice de secciones
+        if self._consulta is not None:
+            self._refrescar_busqueda()
+        total_pages = self._total_paginas()
+        pagina = max(1, min(self.current_page, total_pages))
+        start, end = self._rango_pagina(pagina)
+        ids = [r.get("id") for r in self._vista()[start:end]]
+        tocada = not self._ids_tocados.isdisjoint(ids)
+        self._ids_tocados.clear()
+        if ids != self._pagina_ids or pagina != self.current_page or tocada:
+            self.mostrar_datos_agrupados()
+        else:
+            self._actualizar_paginacion()
+            self._programar_prefetch()
+
+    def _mostrar_progreso_carga(self):
+        accion = "Sincronizando" if self.cache_local is not None and self._pagina_ids else "Cargando"
+        texto = f"{accion} compendio… {len(self.datos)} registros"
+        if not hasattr(self, "barra_carga"):
+            self.barra_carga = tk.Frame(self, bg=BG_COLOR)
+            self.lbl_carga = tk.Label(
+                self.barra_carga, text=texto, font=("Inter", 10),
+                fg="#1746A2", bg=BG_COLOR
+            )
+            self.lbl_carga.pack(side="left", padx=(30, 10))
+            self.progreso_carga = ttk.Progressbar(
+                self.barra_carga, mode="determinate", maximum=1.0, length=220
+            )
+            self.progreso_carga.pack(side="left")
+        self.lbl_carga.config(text=texto)
+        self.progreso_carga.config(value=self._carga_avance)
+        if not self.barra_carga.winfo_ismapped():
+            self.barra_carga.pack(fill="x", pady=(0, 6), before=self.canvas)
+
+    def _ocultar_progreso_carga(self):
+        if hasattr(self, "barra_carga"):
+            self.barra_carga.pack_forget()
+    # ==============================================================
+
+    # =================== MEDICIÓN (F2) ===================
+    def _alternar_hud(self):
+        """Muestra/oculta el HUD; mientras está visible la medición queda encendida."""
+        if self._hud is None:
+            self._medicion_previa = medicion.ACTIVO
+            medicion.activar()
+            self._hud = tk.Label(
+                self, font=("Courier", 9), justify="left", anchor="nw",
+                bg="#FFFFE0", fg="#000", bd=1, relief="solid", padx=6, pady=4
+            )
+            self._hud.place(relx=1.0, x=-24, y=70, anchor="ne")
+            self._refrescar_hud()
+        else:
+            self._hud.destroy()
+            self._hud = None
+            if not self._medicion_previa:
+                medicion.desactivar()
+        self._dibujar_overlay()
+
+    def _refrescar_hud(self):
+        if self._hud is None or self._cerrando:
+            return
+        vista = (f"pag={self.current_page}  filas={len(self._filas)}  montadas={len(self._montadas)}  "
+                 f"pool={len(self._pool_tarjetas)}  alto={self._alto_sr}")
+        rueda = self.rueda.estadisticas()
+        vista += (f"\nrueda: {rueda['eventos']} eventos / {rueda['cuadros']} cuadros  "
+                  f"cuadro p95={rueda['cuadro_p95_ms']:.2f} ms  intervalo p95={rueda['intervalo_p95_ms']:.1f} ms")
+        self._hud.config(text=medicion.texto_resumen() + "\n\n" + vista)
+        self.after(HUD_REFRESCO_MS, self._refrescar_hud)
+
+    def _contenido_ymax(self):
+        """Fondo del contenido según las filas (estimadas o medidas)."""
+        return self._alturas.total()
 
-            # Dibujar overlay (rojo=sr_h, verde=ymax, azul=última tarjeta)
+    def _encontrar_ultimo_card(self):
+        """Última fila de tarjeta: su widget (si está montada) y su fondo."""
+        for i in range(len(self._filas) - 1, -1, -1):
+            if self._filas[i][0] == "tarjeta":
+                fondo = self._alturas.offset(i) + self._alturas[i] - 18
+                return self._montadas.get(i), fondo
+        return None, 0
+
+    def _dibujar_overlay(self):
+        """Con el HUD: rojo=scrollregion, verde=ymax, azul=última tarjeta."""
+        try:
             self.canvas.delete("dbg_lines")
-            if self._debug_overlay_on:
-                w = max(1, self.canvas.winfo_width())
-                self.canvas.create_line(0, sr_h, w, sr_h, fill="red", width=2, tags="dbg_lines")
-                self.canvas.create_line(0, ymax, w, ymax, fill="green", width=2, tags="dbg_lines")
-                self.canvas.create_line(0, last_card_bottom, w, last_card_bottom, fill="blue", width=2, tags="dbg_lines")
+            if self._hud is None:
+                return
+            sr_h = self._alto_sr
+            ymax = self._contenido_ymax()
+            _, last_card_bottom = self._encontrar_ultimo_card()
+            w = max(1, self.canvas.winfo_width())
+            self.canvas.create_line(0, sr_h, w, sr_h, fill="red", width=2, tags="dbg_lines")
+            self.canvas.create_line(0, ymax, w, ymax, fill="green", width=2, tags="dbg_lines")
+            self.canvas.create_line(0, last_card_bottom, w, last_card_bottom, fill="blue", width=2, tags="dbg_lines")
         except Exception:
             pass
     # =====================================================
@@ -258,155 +1382,136 @@ class VisualizadorBase(tk.Toplevel):
     # --- NUEVO: ajuste del scrollregion/medidas finales ---
     def _ajustar_scrollregion(self):
         """
-        Fija el scrollregion usando el fondo real (ymax) del contenido.
-        Agrega un margen chico solo si hay scroll real.
+        Pide recalcular el scrollregion. Las ráfagas (Configure, render,
+        mediciones) se juntan en un único recálculo por ciclo idle.
         """
-        try:
-            self.update_idletasks()
-            try:
-                self.canvas.itemconfig(self._canvas_window_id, width=self.canvas.winfo_width())
-            except Exception:
-                pass
-
-            visible_h = self.canvas.winfo_height() or 1
-            req_h = self.scrollable_frame.winfo_reqheight()
-            real_h = self.scrollable_frame.winfo_height()
-            ymax = self._contenido_ymax()
-
-            content_h = max(ymax, real_h, req_h, 1)
-            extra = 24 if content_h > visible_h else 0
-            content_w = self.canvas.winfo_width() or 1
-            self.canvas.configure(scrollregion=(0, 0, content_w, content_h + extra))
-
-            self._debug_dump("_ajustar_scrollregion")
-        except Exception:
-            pass
-
-    def _build_pagination(self, parent, total_pages):
-        """Crea barra de paginación dentro de 'parent', centrada."""
-        # limpiar contenido previo
-        for w in parent.winfo_children():
-            w.destroy()
-
-        nav = tk.Frame(parent, bg=BG_COLOR)
-        nav.pack(anchor="center")
-
-        def add_label(txt, go_to=None, enabled=True, is_current=False):
-            fg = "#1746A2" if enabled else "#999999"
-            font = ("Inter", 12, "bold") if is_current else ("Inter", 12)
-            lbl = tk.Label(nav, text=txt, bg=BG_COLOR, fg=fg,
-                           font=font, cursor=("hand2" if enabled else "arrow"))
-            lbl.pack(side="left", padx=6)
-            if enabled and go_to is not None:
-                lbl.bind("<Button-1>", lambda e, p=go_to: self._go_to_page(p))
-
-        # total_pages mínimo 1
-        total_pages = max(1, int(total_pages))
+        self._programar_visibles()
 
-        # « primera, ‹ anterior
-        add_label("«", go_to=1, enabled=(self.current_page > 1))
-        add_label("‹", go_to=(self.current_page - 1), enabled=(self.current_page > 1))
-
-        # números
-        for p in range(1, total_pages + 1):
-            add_label(str(p), go_to=p, enabled=(p != self.current_page), is_current=(p == self.current_page))
+    def _fijar_scrollregion(self):
+        """
+        Fija el scrollregion con el fondo calculado de las filas (ymax).
+        Agrega un margen chico solo si hay scroll real. No fuerza layout y
+        no toca el canvas si no cambió nada.
+        """
+        visible_h = self.canvas.winfo_height() or 1
+        content_h = max(self._contenido_ymax(), 1)
+        extra = 24 if content_h > visible_h else 0
+        content_w = self.canvas.winfo_width() or 1
+        region = (0, 0, content_w, content_h + extra)
+        self._alto_sr = region[3]
+        if region != self._scrollregion:
+            self._scrollregion = region
+            with medicion.tramo("scrollregion"):
+                self.canvas.configure(scrollregion=region)
+            if self._hud is not None:
+                self._dibujar_overlay()
+
+    # --- cortes de página por alto ---
+    def _invalidar_paginas(self):
+        # cualquier cambio de orden o de cantidad pasa por acá
+        self._limites_pagina = None
+        self._pos_por_id = None
+        self._paginas_preparadas.clear()
+
+    def _vista(self):
+        """Registros que se paginan: el resultado de la búsqueda o todo el compendio."""
+        return self._resultado if self._resultado is not None else self.datos
+
+    def _limites(self):
+        """
+        Índice de inicio de cada página (en la vista). Se corta cuando la suma de altos
+        (medidos o estimados) pasaría alto_pagina_px. Se recalcula solo si
+        cambiaron los datos: medir tarjetas no mueve los cortes de la página
+        que se está viendo.
+        """
+        if self._limites_pagina is None:
+            inicios = [0]
+            if not self.vista_continua.get():
+                alto_de = self.alturas_cache.alto
+                wrap = self._wrap
+                presupuesto = self.alto_pagina_px
+                acumulado = 0
+                for i, reg in enumerate(self._vista()):
+                    alto = alto_de(reg, wrap)
+                    if acumulado and acumulado + alto > presupuesto:
+                        inicios.append(i)
+                        acumulado = 0
+                    acumulado += alto
+            self._limites_pagina = inicios
+        return self._limites_pagina
+
+    def _rango_pagina(self, pagina):
+        """(start, end) de la página en la vista."""
+        inicios = self._limites()
+        pagina = max(1, min(pagina, len(inicios)))
+        start = inicios[pagina - 1]
+        end = inicios[pagina] if pagina < len(inicios) else len(self._vista())
+        return start, end
+
+    def _pagina_de(self, pos):
+        """Número de página que contiene la posición pos de la vista."""
+        return max(1, bisect.bisect_right(self._limites(), pos))
+
+    def _primera_pagina_llena(self):
+        acumulado = 0
+        for reg in self.datos:
+            acumulado += self.alturas_cache.alto(reg, self._wrap)
+            if acumulado >= self.alto_pagina_px:
+                return True
+        return False
+
+    def _total_paginas(self):
+        return max(1, len(self._limites()))
+
+    def _actualizar_paginacion(self):
+        """Pone al día las barras de paginación (el total crece mientras carga)."""
+        total_pages = self._total_paginas()
+        for barra in getattr(self, "_paginadores", ()):
+            try:
+                barra.actualizar(self.current_page, total_pages)
+            except Exception as e:
+                print("ERROR actualizando paginación -> ", repr(e))
 
-        # › siguiente, » última
-        add_label("›", go_to=(self.current_page + 1), enabled=(self.current_page < total_pages))
-        add_label("»", go_to=total_pages, enabled=(self.current_page < total_pages))
+    def _pagina_por_teclado(self, event, destino):
+        """PgUp/PgDn/Inicio/Fin cambian de página, salvo escribiendo en un campo de texto."""
+        if event.widget.winfo_class() in ("Entry", "TEntry", "TCombobox", "Spinbox", "Text"):
+            return None
+        pagina = max(1, min(destino(), self._total_paginas()))
+        if pagina != self.current_page:
+            self._go_to_page(pagina)
+        return "break"
 
     def _go_to_page(self, page_num):
         """Cambiar página y re-renderizar."""
         self.current_page = max(1, int(page_num))
-        self.mostrar_datos_agrupados()
-        # ir al tope de la nueva página
+        self.rueda.detener()  # que la inercia no siga en la página nueva
+        # ir al tope ANTES de montar: así solo se enlazan las filas de arriba
         try:
             self.canvas.yview_moveto(0.0)
         except Exception:
             pass
-        # recalcular scrollregion (inmediato + after_idle + pequeño delay)
-        self._ajustar_scrollregion()
-        self.after_idle(self._ajustar_scrollregion)
-        self.after(60, self._ajustar_scrollregion)
-
-    # Manejo universal de rueda (Windows/Mac/Linux)
-    def _bind_wheel_to(self, widget):
-        self._wheel_target = widget
-        self.bind_all("<MouseWheel>", self._on_mousewheel)     # Windows / Mac
-        self.bind_all("<Button-4>", self._on_mousewheel)       # Linux up
-        self.bind_all("<Button-5>", self._on_mousewheel)       # Linux down)
-
-    def _unbind_wheel(self):
-        # Mantener la rueda siempre activa sobre el Canvas
-        self._wheel_target = self.canvas  # no deshacer los bind_all
-
-    def _on_mousewheel(self, event):
-        c = self._wheel_target
-        if not c:
-            return
-
-        # Normalizamos el "sentido" del scroll
-        if hasattr(event, "num") and event.num in (4, 5):  # Linux
-            steps = -1 if event.num == 4 else 1
-        else:  # Windows / Mac
-            # event.delta suele ser múltiplo de 120
-            sign = -1 if event.delta > 0 else 1
-            steps = sign * max(1, abs(event.delta) // 120)
+        with medicion.tramo("pagina.cambio", pagina=self.current_page):
+            self.mostrar_datos_agrupados()
 
-        try:
-            # En Canvas, scrolleo en PIXELES para poder llegar exactamente al fondo.
-            if isinstance(c, tk.Canvas):
-                c.yview_scroll(steps * 60, "pixels")   # ~60px por notch
-            else:
-                # En Text/ScrolledText, "units" (líneas) es lo correcto.
-                c.yview_scroll(steps, "units")
-        except Exception:
-            pass
+    def _nuevo_cargador(self, desde_id=None, columnas=COLUMNAS_LISTA):
+        return CargadorCompendio(
+            supabase,
+            tabla="compendio",
+            columnas=columnas,
+            tamanio_lote=CARGA_TAMANIO_LOTE,
+            concurrencia=CARGA_CONCURRENCIA,
+            reintentos=CARGA_REINTENTOS,
+            desde_id=desde_id,
+        )
 
     def obtener_datos(self):
+        """Trae todo el compendio de una vez (bloqueante) ya ordenado."""
         try:
-            page_size = 50  # si el server capea ~41 igual vamos pidiendo por tandas
-            todos = []
-            # usar keyset pagination con cursor por ID
-            last_id = 0  # trae id > 0
-
-            while True:
-                resp = (
-                    supabase
-                    .table("compendio")
-                    .select("*")
-                    .order("id", desc=False)
-                    .gt("id", last_id)
-                    .limit(page_size)
-                    .execute()
-                )
-                data = getattr(resp, "data", None) or []
-                if not data:
-                    break
-
-                todos.extend(data)
-
-                # debug del rango de IDs por tanda
-                try:
-                    print(f"DEBUG tanda ids: {data[0].get('id')} -> {data[-1].get('id')}")
-                except Exception:
-                    pass
-
-                # avanzar cursor al último id del lote
-                try:
-                    last_id = data[-1].get("id")
-                except Exception:
-                    last_id = None
-
-                if last_id is None:
-                    break
-
-                if len(data) < page_size:
-                    break
+            todos = registros(self._nuevo_cargador().obtener_todo())
 
             # orden final (como ya tenías)
             try:
-                todos.sort(key=lambda r: ((r.get("tema") or ""), (r.get("subtema") or ""), r.get("id") or 0))
+                todos.sort(key=clave_orden)
             except Exception:
                 pass
 
@@ -416,293 +1521,430 @@ class VisualizadorBase(tk.Toplevel):
             messagebox.showerror("Error", f"No se pudo obtener la información: {str(e)}")
             return []
 
-    # ======== RENDER PAGINADO ========
+    # ======== RENDER PAGINADO (lista virtual) ========
     def mostrar_datos_agrupados(self):
         self.limpiar_vista()
 
         # --- slicing por página ---
-        total_records = len(self.datos)
-        total_pages = max(1, (total_records + self.cards_per_page - 1) // self.cards_per_page)
+        self._ordenar_datos()
+        total_pages = self._total_paginas()
         self.current_page = max(1, min(self.current_page, total_pages))
-        start = (self.current_page - 1) * self.cards_per_page
-        end = start + self.cards_per_page
-        subset = self.datos[start:end]
+        filas = self._filas_de_pagina(self.current_page)
+        self._pagina_ids = [f[1].get("id") for f in filas if f[0] == "tarjeta"]
+
+        self._filas = filas
+        self._fila_de_id = {f[1].get("id"): i for i, f in enumerate(filas) if f[0] == "tarjeta"}
+        self._alturas = AlturasFilas(self._altura_estimada(f) for f in filas)
+        self._medidas.clear()
+
+        self._actualizar_paginacion()
+
+        # el alto sale de las filas: no hay que esperar a que Tk acomode todo
+        self._actualizar_visibles()
+        self._programar_prefetch()
+
+    def _filas_de_pagina(self, pagina):
+        """Filas de la página; si quedó preparada con los mismos cortes, no se re-arma."""
+        limites = self._limites()
+        previo = self._paginas_preparadas.get(pagina)
+        if previo is not None and previo[0] is limites:
+            return previo[1]
+        filas = self._armar_filas(pagina)
+        self._paginas_preparadas[pagina] = (limites, filas)
+        return filas
+
+    def _armar_filas(self, pagina):
+        start, end = self._rango_pagina(pagina)
+        subset = self._vista()[start:end]
 
         # --- barra de paginación ARRIBA (debajo del título, antes de la 1ra tarjeta) ---
-        self.pagination_top = tk.Frame(self.scrollable_frame, bg=BG_COLOR)
-        self.pagination_top.pack(fill="x", pady=(6, 8))
-        self._build_pagination(self.pagination_top, total_pages)
+        filas = [("paginacion", "arriba")]
 
-        # --- agrupar SOLO lo de esta página ---
-        agrupado = {}
-        for reg in subset:
+        # La vista ya viene en orden (tema/subtema/id, o por relevancia si hay
+        # búsqueda): se recorre una vez y se pone un título cada vez que cambia el grupo
+        tema_previo = subtema_previo = None
+        for idx_global, reg in enumerate(subset, start + 1):  # contador global visible en cada tarjeta
             tema = reg.get("tema") or "SIN TEMA"
             subtema = reg.get("subtema") or "SIN SUBTEMA"
-            agrupado.setdefault(tema, {})
-            agrupado[tema].setdefault(subtema, [])
-            agrupado[tema][subtema].append(reg)
-
-        # contador global visible en cada tarjeta
-        idx_global = start + 1
-
-        for tema in sorted(agrupado):
-            tk.Label(
-                self.scrollable_frame,
-                text=tema,
-                font=TITULO_TEMA,
-                bg=BG_COLOR,
-                fg="#000"
-            ).pack(anchor="w", pady=(28, 4), padx=30)
-
-            for subtema in sorted(agrupado[tema]):
-                if subtema and subtema != "SIN SUBTEMA":
-                    tk.Label(
-                        self.scrollable_frame,
-                        text=f"» {subtema}",
-                        font=TITULO_SUBTEMA,
-                        bg=BG_COLOR,
-                        fg="#000"
-                    ).pack(anchor="w", padx=52)
-
-                for reg in agrupado[tema][subtema]:
-                    self.visualizar_registro(reg, idx_global)  # << numeración
-                    idx_global += 1
+            if tema != tema_previo:
+                filas.append(("tema", tema))
+                tema_previo, subtema_previo = tema, None
+            if subtema != subtema_previo:
+                if subtema != "SIN SUBTEMA":
+                    filas.append(("subtema", subtema))
+                subtema_previo = subtema
+            filas.append(("tarjeta", reg, idx_global))  # << numeración
 
         # --- barra de paginación ABAJO (debajo de la última tarjeta) ---
-        # contenedor de ancho completo para que el canvas lo mida bien
-        self.pagination_bottom_outer = tk.Frame(
-            self.scrollable_frame,
-            bg=BG_COLOR,
-            bd=0,
-            highlightthickness=0
-        )
-        self.pagination_bottom_outer.pack(side="top", fill="x")
-
-        # barra centrada dentro del contenedor
-        self.pagination_bottom = tk.Frame(
-            self.pagination_bottom_outer,
-            bg=BG_COLOR,
-            bd=0,
-            highlightthickness=0
-        )
-        self.pagination_bottom.pack(side="top", pady=(12, 16), anchor="center")
+        filas.append(("paginacion", "abajo"))
+        return filas
+
+    # --- páginas vecinas (prefetch) ---
+    def _programar_prefetch(self):
+        """Con la página quieta un rato (sin clicks ni carga) se preparan las vecinas."""
+        if self._prefetch_after is not None:
+            self.after_cancel(self._prefetch_after)
+            self._prefetch_after = None
+        if PREFETCH_PAGINAS > 0 and not self._cerrando:
+            self._prefetch_after = self.after(PREFETCH_ESPERA_MS, self._preparar_vecinas)
+
+    def _paginas_vecinas(self):
+        """Siguiente, anterior, la que sigue a la siguiente... hasta PREFETCH_PAGINAS de cada lado."""
+        total = self._total_paginas()
+        vecinas = []
+        for d in range(1, PREFETCH_PAGINAS + 1):
+            for p in (self.current_page + d, self.current_page - d):
+                if 1 <= p <= total:
+                    vecinas.append(p)
+        return vecinas
+
+    def _preparar_vecinas(self):
+        self._prefetch_after = None
+        if self._cerrando or self._carga_activa or not self._filas:
+            return  # al terminar la carga se vuelve a programar
+        vecinas = self._paginas_vecinas()
+        # fuera del tope: modelos y tarjetas de páginas que ya no son vecinas
+        conservar = set(vecinas) | {self.current_page}
+        for p in [p for p in self._paginas_preparadas if p not in conservar]:
+            del self._paginas_preparadas[p]
+        ids_vecinos = set()
+        for p in vecinas:
+            with medicion.tramo("prefetch", pagina=p):
+                ids_vecinos.update(self._preparar_pagina(p, len(ids_vecinos)))
+        for id_ in [i for i in self._tarjetas_preparadas if i not in ids_vecinos]:
+            self._soltar_preparada(id_)
+        self._recortar_pool()
+
+    def _preparar_pagina(self, pagina, ya_preparadas):
+        """Arma el modelo de la página, pide sus cuerpos y enlaza las tarjetas de arriba."""
+        filas = self._filas_de_pagina(pagina)
+        self._pedir_cuerpos([f[1].get("id") for f in filas if f[0] == "tarjeta"])
+
+        # al cambiar de página se arranca arriba: se montan las filas hasta alto + margen
+        alcance = max(self.canvas.winfo_height(), 1) + MARGEN_VIRTUAL_PX
+        ids = []
+        y = 0
+        for fila in filas:
+            if y > alcance or ya_preparadas + len(ids) >= PREFETCH_TARJETAS_MAX:
+                break
+            y += self._altura_estimada(fila)
+            if fila[0] != "tarjeta":
+                continue
+            reg, numero = fila[1], fila[2]
+            id_ = reg.get("id")
+            ids.append(id_)
+            if id_ in self._tarjetas or id_ in self._tarjetas_preparadas:
+                continue  # ya montada en la página actual o preparada antes
+            try:
+                tarjeta = self._tomar_tarjeta(reg)
+                tarjeta.mostrar(reg, numero, self.cuerpos.get(id_))
+            except Exception as ex:
+                print("ERROR preparando id=", id_, " -> ", repr(ex))
+                continue
+            self._tarjetas_preparadas[id_] = tarjeta
+        return ids
+
+    def _soltar_preparada(self, id_):
+        """Una tarjeta preparada que ya no hace falta vuelve al pool (sigue enlazada)."""
+        tarjeta = self._tarjetas_preparadas.pop(id_)
+        self._pool_tarjetas.append(tarjeta)
+        self._libres_por_id[id_] = tarjeta
+
+    # --- secciones (tema/subtema) ---
+    def _grupos_actualizados(self):
+        """Índice de grupos al día (se rearma en una pasada solo si cambiaron los datos)."""
+        self._ordenar_datos()
+        if not self._grupos_al_dia:
+            with medicion.tramo("grupos", filas=len(self.datos)):
+                self.grupos.reconstruir(self.datos)
+            self._grupos_al_dia = True
+        return self.grupos
+
+    def ir_a_seccion(self, tema, subtema=None):
+        """Salta al primer registro del tema (o subtema) en el listado completo."""
+        if self._resultado is not None:
+            self.quitar_busqueda()
+        tramo = self._grupos_actualizados().rango(tema, subtema)
+        if tramo is None:
+            return False
+        return self.ir_a_registro(self.datos[tramo[0]].get("id"), con_titulos=True)
+
+    def _armar_menu_secciones(self):
+        grupos = self._grupos_actualizados()
+        if self._menu_secciones_version == grupos.version:
+            return
+        self._menu_secciones_version = grupos.version
+        self._llenar_menu_grupos(self.menu_secciones, self.ir_a_seccion)
+
+    def _llenar_menu_grupos(self, menu, comando):
+        """Un item por tema (cascada con sus subtemas si tiene) que llama comando(tema, subtema)."""
+        for sub in menu.winfo_children():
+            sub.destroy()
+        menu.delete(0, "end")
+        estilo = dict(tearoff=0, bg="#FFF", fg="#000", activebackground="#1746A2", activeforeground="#FFF")
+        for tema, cantidad, subtemas in self.grupos.secciones():
+            nombres = [s for s, _ in subtemas if s != "SIN SUBTEMA"]
+            if not nombres:
+                menu.add_command(label=f"{tema}  ({cantidad})",
+                                 command=lambda t=tema: comando(t))
+                continue
+            submenu = tk.Menu(menu, **estilo)
+            submenu.add_command(label=f"Todo el tema  ({cantidad})",
+                                command=lambda t=tema: comando(t))
+            submenu.add_separator()
+            for subtema, n in subtemas:
+                etiqueta = "(sin subtema)" if subtema == "SIN SUBTEMA" else subtema
+                submenu.add_command(label=f"{etiqueta}  ({n})",
+                                    command=lambda t=tema, s=subtema: comando(t, s))
+            menu.add_cascade(label=f"{tema}  ({cantidad})", menu=submenu)
+
+    def _cambiar_vista_continua(self):
+        self._invalidar_paginas()
+        self._go_to_page(1)
+
+    def ir_a_registro(self, id_, con_titulos=False):
+        """
+        Deja el registro arriba de todo (cambiando de página si hace falta).
+        El offset sale de los altos cacheados: no hay que esperar al layout.
+        Con con_titulos, arriba quedan también los títulos de tema/subtema que
+        lo preceden.
+        """
+        reg = self._por_id.get(id_)
+        if reg is None:
+            return False
+        self._ordenar_datos()
+        pos = self._posicion_en_vista(reg)
+        if pos is None:
+            return False
+        pagina = self._pagina_de(pos)
+        if pagina != self.current_page or id_ not in self._fila_de_id:
+            self.current_page = pagina
+            self.mostrar_datos_agrupados()
+        fila = self._fila_de_id.get(id_)
+        if fila is None:
+            return False
+        while con_titulos and fila > 0 and self._filas[fila - 1][0] in ("tema", "subtema"):
+            fila -= 1
+        self._fijar_scrollregion()
+        self.canvas.yview_moveto(self._alturas.offset(fila) / self._alto_sr)
+        self._programar_visibles()
+        return True
+
+    # --- geometría de filas ---
+    def _altura_estimada(self, fila):
+        tipo = fila[0]
+        if tipo == "tarjeta":
+            return self.alturas_cache.alto(fila[1], self._wrap)
+        return self._alto_tipo.get(fila[0] if tipo != "paginacion" else fila[1], ALTO_FILA_ESTIMADO[tipo])
+
+    def _medir_fila(self, fila, alto):
+        """
+        Una fila montada informó su alto real. Se llama desde <Configure>:
+        solo se anota y se agenda; el recálculo es uno por ciclo idle.
+        """
+        if fila >= len(self._alturas) or self._alturas[fila] == alto:
+            self._medidas.pop(fila, None)
+            return
+        self._medidas[fila] = alto
+        self._programar_visibles()
+
+    def _aplicar_medidas(self):
+        """Vuelca las mediciones pendientes; devuelve cuánto cambió el alto total."""
+        cambio = 0
+        for fila, alto in self._medidas.items():
+            if fila >= len(self._alturas):
+                continue
+            cambio += self._alturas.actualizar(fila, alto)
+            datos_fila = self._filas[fila]
+            if datos_fila[0] == "tarjeta":
+                self.alturas_cache.medir(datos_fila[1], self._wrap, alto)
+            elif datos_fila[0] == "paginacion":
+                self._alto_tipo[datos_fila[1]] = alto
+            else:
+                self._alto_tipo[datos_fila[0]] = alto
+        self._medidas.clear()
+        return cambio
 
-        # construir la barra de paginación
-        self._build_pagination(self.pagination_bottom, total_pages)
+    def _medir_montadas(self):
+        for i, m in list(self._montadas.items()):
+            try:
+                alto = m.medir()
+            except Exception:
+                alto = None
+            if alto is not None:
+                self._medir_fila(i, alto)
+
+    # --- ventana visible ---
+    def _al_desplazar(self, primero, ultimo):
+        """yscrollcommand del canvas: mueve la barra y re-arma lo visible."""
+        self.scrollbar.set(primero, ultimo)
+        self._programar_visibles()
+
+    def _al_redimensionar_canvas(self, event):
+        wrap = wrap_tarjeta(event.width)
+        if wrap != self._wrap:
+            # otro wraplength: las tarjetas cambian de alto, se re-estiman en el próximo ciclo
+            self._wrap = wrap
+            self._wrap_cambiado = True
+        for m in self._montadas.values():
+            if m.margen_x is not None:
+                self.canvas.itemconfigure(m.item, width=max(1, event.width - 2 * m.margen_x))
+        self._programar_visibles()
+
+    def _programar_visibles(self):
+        if self._visibles_pendiente:
+            return
+        self._visibles_pendiente = True
+        self.after_idle(self._actualizar_visibles)
 
-        # --- ESPACIADOR FINAL (colchón grande y dinámico) ---
-        if hasattr(self, "_end_spacer") and self._end_spacer.winfo_exists():
-            self._end_spacer.destroy()
+    def _fila_en(self, y):
+        return self._alturas.fila_en(y)
 
-        self.update_idletasks()
+    def _actualizar_visibles(self):
+        """Monta las filas del viewport (+ margen) y libera el resto al pool."""
+        self._visibles_pendiente = False
+        if self._cerrando or not self._filas:
+            return
+        if self._montando:
+            # llamada anidada (p.ej. desde un update_idletasks): se repite al terminar
+            self._visibles_otra_vez = True
+            return
+        self._montando = True
         try:
-            visible_h = self.canvas.winfo_height()
-        except Exception:
-            visible_h = 600  # fallback
-
-        spacer_h = max(visible_h // 2, 160)
-
-        self._end_spacer = tk.Frame(
-            self.scrollable_frame,
-            height=spacer_h,
-            bg=BG_COLOR,
-            bd=0,
-            highlightthickness=0
-        )
-        self._end_spacer.pack(side="top", fill="x")
-
-        # Recalcular scrollregion cuando TODO ya está colocado y estabilizado
-        self._ajustar_scrollregion()
-        self.after_idle(self._ajustar_scrollregion)
-        self.after(60, self._ajustar_scrollregion)
-
-        # DEBUG: volcar métricas al final del render
-        self._debug_dump("render_end")
-
-    def visualizar_registro(self, reg, numero):
+            with medicion.tramo("visibles"):
+                self._montar_visibles()
+        finally:
+            self._montando = False
+        if self._visibles_otra_vez:
+            self._visibles_otra_vez = False
+            self._programar_visibles()
+
+    def _montar_visibles(self):
+        if self._medidas or self._wrap_cambiado:
+            # mantener quieta la fila de arriba aunque cambien altos por encima
+            top = self.canvas.canvasy(0)
+            ancla = self._fila_en(top)
+            dentro = top - self._alturas.offset(ancla)
+            if self._wrap_cambiado:
+                self._wrap_cambiado = False
+                self._medidas.clear()  # medidas con el wrap anterior
+                self._alturas = AlturasFilas(self._altura_estimada(f) for f in self._filas)
+            self._aplicar_medidas()
+            self._fijar_scrollregion()
+            nuevo_top = self._alturas.offset(ancla) + dentro
+            if abs(nuevo_top - top) >= 1:
+                self.canvas.yview_moveto(max(0.0, nuevo_top / self._alto_sr))
+        else:
+            self._fijar_scrollregion()
+
+        top = self.canvas.canvasy(0)
+        alto = max(self.canvas.winfo_height(), 1)
+        primera = self._fila_en(top - MARGEN_VIRTUAL_PX)
+        ultima = self._fila_en(top + alto + MARGEN_VIRTUAL_PX)
+        necesarias = range(primera, ultima + 1)
+
+        for i in [i for i in self._montadas if i not in necesarias]:
+            self._desmontar_fila(i)
+
+        ancho = self.canvas.winfo_width() or 1
+        sin_cuerpo = []
+        for i in necesarias:
+            m = self._montadas.get(i)
+            if m is None:
+                m = self._montar_fila(i)
+                if m is None:
+                    continue
+                if isinstance(m, TarjetaRegistro) and m.reg.get("id") not in self.cuerpos:
+                    sin_cuerpo.append(m.reg.get("id"))
+            y = self._alturas.offset(i)
+            m.ubicar(i, y, ancho)
+            # el cuerpo entero solo en las tarjetas que se ven; las del margen quedan con el adelanto
+            if isinstance(m, TarjetaRegistro) and y < top + alto and y + self._alturas[i] > top:
+                m.expandir_cuerpo()
+
+        self._pedir_cuerpos(sin_cuerpo)
+        self._recortar_pool()
+        self.after_idle(self._medir_montadas)
+
+    def _tomar_tarjeta(self, reg):
+        """Del pool: la que ya mostraba este registro (no hay que re-enlazar nada) o cualquiera."""
+        pool = self._pool_tarjetas
+        tarjeta = self._tarjetas_preparadas.pop(reg.get("id"), None)
+        if tarjeta is not None:
+            return tarjeta
+        tarjeta = self._libres_por_id.pop(reg.get("id"), None)
+        if tarjeta is not None:
+            pool.remove(tarjeta)
+            return tarjeta
+        if not pool:
+            return TarjetaRegistro(self)
+        tarjeta = pool.pop()
+        previo = tarjeta.reg.get("id") if tarjeta.reg else None
+        if self._libres_por_id.get(previo) is tarjeta:
+            del self._libres_por_id[previo]
+        return tarjeta
+
+    def _recortar_pool(self):
+        """Solo se destruyen tarjetas si sobran más de POOL_LIBRES_MAX ocultas."""
+        pool = self._pool_tarjetas
+        while len(pool) > POOL_LIBRES_MAX:
+            tarjeta = pool.pop(0)
+            previo = tarjeta.reg.get("id") if tarjeta.reg else None
+            if self._libres_por_id.get(previo) is tarjeta:
+                del self._libres_por_id[previo]
+            tarjeta.destruir()
+
+    def _montar_fila(self, i):
+        fila = self._filas[i]
+        tipo = fila[0]
         try:
-            card = tk.Frame(
-                self.scrollable_frame,
-                bg=FRAME_COLOR,
-                bd=1,                 # borde físico parejo (sin highlight)
-                relief="solid",
-                highlightthickness=0  # evita la “rayita” por highlight recortado
-            )
-            # clave: no expand=True
-            card.pack(fill="x", padx=38, pady=18, anchor="center", expand=False)
-            
-            # mantener scroll de la vista
-            card.bind("<Enter>", lambda e: self._bind_wheel_to(self.canvas))
-            card.bind("<Leave>", lambda e: self._bind_wheel_to(self.canvas))
-
-            card.grid_columnconfigure(0, weight=9)
-            card.grid_columnconfigure(1, weight=1)
-
-            info_frame = tk.Frame(card, bg=FRAME_COLOR)
-            info_frame.grid(row=0, column=0, sticky="nw", padx=(0, 18), pady=(4, 4))
-
-            # SANEAMOS: todo a string seguro
-            def s(v):
-                if v is None:
-                    return "-"
-                try:
-                    v = str(v)
-                except Exception:
-                    v = "-"
-                return v if v.strip() != "" else "-"
-
-            sections = [
-                ("AUTOS CARATULADOS", s(reg.get("autos", ""))),
-                ("JURISDICCIÓN/INSTANCIA", s(reg.get("jurisdiccion", ""))),
-                ("FECHA DE SENTENCIA", s(reg.get("fecha", ""))),
-                ("RESULTADO", s(reg.get("resultado", ""))),
-                ("VOCES", s(reg.get("voces", ""))),
-                ("LINK FALLO", reg.get("link_fallo", "")),  # tratamos aparte
-                ("JURISPRUDENCIA", s(reg.get("jurisprudencia", ""))),
-            ]
-
-            for label, valor in sections:
-                block = tk.Frame(info_frame, bg=FRAME_COLOR)
-                block.pack(anchor="w", pady=(1,4), fill="x")
-                tk.Label(
-                    block,
-                    text=label + ":",
-                    font=LABEL_FONT,
-                    fg="#1746A2",
-                    bg=FRAME_COLOR
-                ).pack(anchor="w")
-
-                if label == "LINK FALLO":
-                    # solo tratamos como link si es string no-vacío
-                    if isinstance(valor, str) and valor.strip() not in ["", "-"]:
-                        enlace_texto = valor.strip()
-                        enlace = tk.Label(
-                            block,
-                            text=enlace_texto,
-                            font=(INFO_FONT[0], INFO_FONT[1], "underline"),
-                            fg="#1662bb",
-                            bg=FRAME_COLOR,
-                            cursor="hand2",
-                            wraplength=1220,
-                            justify="left"
-                        )
-                        enlace.pack(anchor="w")
-                        enlace.bind(
-                            "<Button-1>",
-                            lambda e, url=enlace_texto: webbrowser.open_new(url if isinstance(url, str) and url.startswith("http") else f"https://{url}")
-                        )
-                    else:
-                        tk.Label(
-                            block,
-                            text=s(valor),
-                            font=INFO_FONT,
-                            fg="#222",
-                            bg=FRAME_COLOR,
-                            wraplength=1220,
-                            justify="left"
-                        ).pack(anchor="w")
-                elif label == "JURISPRUDENCIA":
-                    st = ScrolledText(
-                        block,
-                        font=INFO_FONT,
-                        wrap="word",
-                        height=JURIS_ALTURA_LINEAS,
-                        bd=1,
-                        relief="solid"
-                    )
-                    st.insert("1.0", s(valor))
-                    st.configure(state="disabled")
-                    st.pack(fill="x", padx=0, pady=(0, 0))
-                    st.bind("<Enter>", lambda e, c=st: self._bind_wheel_to(c))
-                    st.bind("<Leave>", lambda e: self._bind_wheel_to(self.canvas))
-                else:
-                    tk.Label(
-                        block,
-                        text=s(valor),
-                        font=INFO_FONT,
-                        fg="#222",
-                        bg=FRAME_COLOR,
-                        wraplength=1220,
-                        justify="left"
-                    ).pack(anchor="w")
-
-            # Botones
-            btns_frame = tk.Frame(card, bg=FRAME_COLOR)
-            btns_frame.grid(row=0, column=1, sticky="ne", padx=(0, 8), pady=10)
-            btn_style = dict(
-                font=BTN_ICONO,
-                bg=BTN_COLOR,
-                fg=BTN_TEXT_COLOR,
-                activebackground=BTN_HOVER_BG,
-                activeforeground=BTN_HOVER_TEXT,
-                relief="flat",
-                borderwidth=0,
-                highlightthickness=2,
-                highlightbackground=BTN_BORDER_COLOR,
-                cursor="hand2",
-                width=3,
-                height=1,
-            )
-            btn_copiar = tk.Button(
-                btns_frame,
-                text=ICON_COPIAR,
-                command=lambda t=self.armar_texto_copiar(reg): self.copiar_a_clipboard(t),
-                **btn_style
-            )
-            btn_copiar.pack(pady=7)
-            btn_descargar = tk.Button(
-                btns_frame,
-                text=ICON_DESCARGAR,
-                command=lambda d=reg: self.descargar_docx(d),
-                **btn_style
-            )
-            btn_descargar.pack(pady=7)
-            btn_editar = tk.Button(
-                btns_frame,
-                text=ICON_EDITAR,
-                command=lambda r=reg: self.editar_registro(r),
-                **btn_style
-            )
-            btn_editar.pack(pady=7)
-
-            btn_borrar = tk.Button(
-                btns_frame,
-                image=self.icono_tacho_azul,
-                command=lambda r=reg: self.borrar_registro(r),
-                bg=BTN_COLOR,
-                activebackground=BTN_HOVER_BG,
-                relief="flat",
-                borderwidth=0,
-                highlightthickness=2,
-                highlightbackground=BTN_BORDER_COLOR,
-                cursor="hand2",
-                width=34,
-                height=34
-            )
-            btn_borrar.pack(pady=7)
-
-            for btn in [btn_copiar, btn_descargar, btn_editar, btn_borrar]:
-                btn.bind("<Enter>", lambda e, b=btn: b.config(bg=BTN_HOVER_BG))
-                btn.bind("<Leave>", lambda e, b=btn: b.config(bg=BTN_COLOR))
-
-            # --- NÚMERO DE TARJETA (arriba derecha) ---
-            card.update_idletasks()  # asegura tamaño final del card
-            badge = tk.Label(
-                card,
-                text=str(numero),
-                bg=FRAME_COLOR,
-                fg="#1746A2",
-                font=("Inter", 10, "bold")
-            )
-            badge.place(relx=1.0, x=-12, y=6, anchor="ne")
-            badge.lift()  # trae al frente por si algo lo tapa
-
+            if tipo == "tarjeta":
+                m = self.visualizar_registro(fila[1], fila[2])
+            elif tipo == "paginacion":
+                m = self._barras_paginacion[fila[1]]
+            else:
+                pool = self._pool_encabezados[tipo]
+                m = pool.pop() if pool else EncabezadoGrupo(self, tipo)
+                m.mostrar(fila[1])
+        except Exception as ex:
+            print("ERROR al montar fila", i, " -> ", repr(ex))
+            return None
+        if m is not None:
+            self._montadas[i] = m
+        return m
+
+    def _desmontar_fila(self, i):
+        m = self._montadas.pop(i)
+        m.ocultar()
+        if isinstance(m, TarjetaRegistro):
+            id_ = m.reg.get("id") if m.reg else None
+            if self._tarjetas.get(id_) is m:
+                del self._tarjetas[id_]
+            self._pool_tarjetas.append(m)
+            self._libres_por_id[id_] = m
+        elif isinstance(m, EncabezadoGrupo):
+            self._pool_encabezados[m.tipo].append(m)
+
+    def visualizar_registro(self, reg, numero, tarjeta=None):
+        """Enlaza 'reg' a una tarjeta (del pool si no se indica) y la devuelve."""
+        try:
+            with medicion.tramo("tarjeta.render"):
+                if tarjeta is None:
+                    tarjeta = self._tomar_tarjeta(reg)
+                tarjeta.mostrar(reg, numero, self.cuerpos.get(reg.get("id")))
+            self._tarjetas[reg.get("id")] = tarjeta
+            return tarjeta
         except Exception as ex:
             # No frenamos el render del resto
             print("ERROR al renderizar id=", reg.get("id"), " -> ", repr(ex))
             # seguimos (no re-lanzamos)
+            return None
+
+    def copiar_registro(self, reg):
+        """Copia el registro con su jurisprudencia (si no está en cache, se pide sin frenar la ventana)."""
+        self._con_cuerpo(reg, lambda cuerpo: self.copiar_a_clipboard(self.armar_texto_copiar(reg, cuerpo)))
 
-    def armar_texto_copiar(self, reg):
+    def armar_texto_copiar(self, reg, cuerpo):
         def s(v):
             if v is None:
                 return "-"
@@ -719,7 +1961,7 @@ class VisualizadorBase(tk.Toplevel):
             ("RESULTADO", s(reg.get("resultado", ""))),
             ("VOCES", s(reg.get("voces", ""))),
             ("LINK FALLO", s(reg.get("link_fallo", ""))),
-            ("JURISPRUDENCIA", s(reg.get("jurisprudencia", ""))),
+            ("JURISPRUDENCIA", s(cuerpo)),
         ]
         return "\n".join(f"{k}: {v}" for k, v in campos if v is not None)
 
@@ -736,6 +1978,18 @@ class VisualizadorBase(tk.Toplevel):
         self.menu_popup.grab_release()
 
     def descargar_docx(self, datos):
+        archivo_path = filedialog.asksaveasfilename(
+            defaultextension=".docx",
+            filetypes=[("Documentos Word", "*.docx")],
+            title="Guardar documento"  # opcional, solo cambia el título del diálogo
+            # sin initialfile -> no sugiere ningún nombre
+        )
+        if archivo_path:
+            # el cuerpo puede no estar en cache: se pide en segundo plano y se guarda al llegar
+            self._con_cuerpo(datos, lambda cuerpo: self._guardar_docx(archivo_path, datos, cuerpo))
+
+    def _guardar_docx(self, archivo_path, datos, cuerpo):
+        from docx import Document
         doc = Document()
         doc.add_heading(f'Tema: {datos.get("tema","-")}  -  Subtema: {datos.get("subtema","-")}', level=1)
         doc.add_paragraph(f'AUTOS CARATULADOS:\n{datos.get("autos", "")}')
@@ -744,20 +1998,234 @@ class VisualizadorBase(tk.Toplevel):
         doc.add_paragraph(f'VOCES:\n{datos.get("voces", "-")}')
         doc.add_paragraph(f'LINK FALLO:\n{datos.get("link_fallo", "-")}')
         doc.add_paragraph("\nJURISPRUDENCIA:")
-        doc.add_paragraph(datos.get("jurisprudencia", "-"))
+        doc.add_paragraph(cuerpo or "-")
+        try:
+            doc.save(archivo_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo guardar el documento: {str(e)}")
+
+    # --- exportación masiva (en segundo plano, con progreso y cancelar) ---
+    def _armar_menu_exportar(self):
+        self.menu_exportar.entryconfigure(
+            1, state=("normal" if self._resultado is not None else "disabled")
+        )
+        grupos = self._grupos_actualizados()
+        if self._menu_exportar_version != grupos.version:
+            self._menu_exportar_version = grupos.version
+            self._llenar_menu_grupos(
+                self.menu_exportar_temas,
+                lambda tema, subtema=None: self.exportar_word("tema", tema, subtema),
+            )
 
+    def _seleccion_exportar(self, alcance, tema=None, subtema=None):
+        """(registros, título del documento) según lo elegido en el menú."""
+        self._ordenar_datos()
+        if alcance == "pagina":
+            start, end = self._rango_pagina(self.current_page)
+            return self._vista()[start:end], f"Compendio – página {self.current_page}"
+        if alcance == "busqueda":
+            return list(self._resultado or []), f"Búsqueda: {self._consulta}"
+        if alcance == "tema":
+            tramo = self._grupos_actualizados().rango(tema, subtema)
+            registros = self.datos[tramo[0]:tramo[1]] if tramo else []
+            return registros, (tema if subtema is None else f"{tema} – {subtema}")
+        return list(self.datos), "Compendio"
+
+    def exportar_word(self, alcance, tema=None, subtema=None):
+        """Exporta la selección a un único .docx sin frenar la ventana."""
+        registros, titulo = self._seleccion_exportar(alcance, tema, subtema)
+        if not registros:
+            messagebox.showinfo("Exportar", "No hay registros para exportar.")
+            return
         archivo_path = filedialog.asksaveasfilename(
             defaultextension=".docx",
             filetypes=[("Documentos Word", "*.docx")],
-            title="Guardar documento"  # opcional, solo cambia el título del diálogo
-            # sin initialfile -> no sugiere ningún nombre
+            title="Guardar documento"
         )
-        if archivo_path:
-            doc.save(archivo_path)
+        if not archivo_path:
+            return
+
+        from exportar import exportar_docx, ExportacionCancelada
+        registros = [dict(r) for r in registros]  # foto: la lista puede cambiar mientras se exporta
+
+        def trabajo(avance, cancelado):
+            return exportar_docx(
+                archivo_path, registros,
+                lambda ids: self.cuerpos.traer(ids, recordar=False),
+                avance=avance, cancelado=cancelado, titulo=titulo,
+            )
+
+        def al_terminar(cantidad, error):
+            if isinstance(error, ExportacionCancelada):
+                return
+            if error is not None:
+                messagebox.showerror("Error", f"No se pudo exportar: {str(error)}")
+                return
+            messagebox.showinfo("Éxito", f"Se exportaron {cantidad} registros.")
+
+        self._tarea_con_progreso(f"Exportando {len(registros)} registros…", trabajo, al_terminar)
+
+    def exportar_tabla(self):
+        """
+        Exporta todo el compendio a CSV o JSONL (con .gz se comprime). Si los
+        datos ya están cargados se usan esos; si no, se recorre el server.
+        """
+        archivo_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV", "*.csv"), ("CSV comprimido", "*.csv.gz"),
+                ("JSON Lines", "*.jsonl"), ("JSON Lines comprimido", "*.jsonl.gz"),
+            ],
+            title="Exportar tabla"
+        )
+        if not archivo_path:
+            return
+        con_cuerpos = messagebox.askyesno(
+            "Exportar tabla", "¿Incluir el texto de jurisprudencia?\n(tarda más y el archivo pesa mucho más)"
+        )
+
+        import exportar
+        columnas = COLUMNAS_LISTA.split(",") + (["jurisprudencia"] if con_cuerpos else [])
+        locales = None
+        if self.datos and not self._carga_activa:
+            locales = list(self.datos)  # foto de la lista (solo referencias): puede cambiar mientras se exporta
+        traer = (lambda ids: self.cuerpos.traer(ids, recordar=False)) if con_cuerpos else None
+
+        def trabajo(avance, cancelado):
+            if locales is not None:
+                # ordenar por id y pasar a dict tanda por tanda, fuera del hilo de Tk
+                locales.sort(key=lambda r: r.get("id") or 0)
+                lotes = exportar.lotes_locales(locales, traer)
+            else:
+                lotes = exportar.lotes_del_server(
+                    supabase, columnas=",".join(columnas), tamanio_lote=CARGA_TAMANIO_LOTE,
+                    concurrencia=CARGA_CONCURRENCIA, reintentos=CARGA_REINTENTOS,
+                )
+            return exportar.exportar_tabla(archivo_path, lotes, columnas, avance=avance, cancelado=cancelado)
+
+        def al_terminar(cantidad, error):
+            if isinstance(error, exportar.ExportacionCancelada):
+                return
+            if error is not None:
+                messagebox.showerror("Error", f"No se pudo exportar: {str(error)}")
+                return
+            messagebox.showinfo("Éxito", f"Se exportaron {cantidad} registros.")
+
+        self._tarea_con_progreso("Exportando tabla…", trabajo, al_terminar)
+
+    def _tarea_con_progreso(self, titulo, trabajo, al_terminar):
+        """
+        Corre trabajo(avance, cancelado) en un hilo, con una ventanita de
+        progreso y botón Cancelar. al_terminar(resultado, error) corre en el
+        hilo de Tk.
+        """
+        cancelado = threading.Event()
+        estado = {"hechos": 0, "total": 0}
+
+        ventana = tk.Toplevel(self)
+        ventana.title("Exportar")
+        ventana.configure(bg=BG_COLOR)
+        ventana.resizable(False, False)
+        ventana.transient(self)
+        tk.Label(ventana, text=titulo, font=("Inter", 12), bg=BG_COLOR, fg="#000").pack(padx=24, pady=(18, 8))
+        barra = ttk.Progressbar(ventana, mode="determinate", maximum=1.0, length=320)
+        barra.pack(padx=24)
+        detalle = tk.Label(ventana, text="", font=("Inter", 10), bg=BG_COLOR, fg="#1746A2")
+        detalle.pack(pady=(6, 6))
+        tk.Button(
+            ventana, text="Cancelar", font=("Inter", 11), bg=BTN_COLOR, fg=BTN_TEXT_COLOR,
+            relief="flat", highlightthickness=2, highlightbackground=BTN_BORDER_COLOR,
+            cursor="hand2", command=cancelado.set
+        ).pack(pady=(0, 16))
+        ventana.protocol("WM_DELETE_WINDOW", cancelado.set)
+
+        def avance(hechos, total):  # desde el hilo de trabajo: solo anota
+            estado["hechos"], estado["total"] = hechos, total
+
+        def refrescar():
+            if self._cerrando or not ventana.winfo_exists():
+                return
+            hechos, total = estado["hechos"], estado["total"]
+            barra.config(value=(hechos / total) if total else 0.0)
+            detalle.config(text=("Cancelando…" if cancelado.is_set() else f"{hechos} / {total}"))
+            ventana.after(100, refrescar)
+
+        def terminar(resultado, error):
+            try:
+                ventana.destroy()
+            except Exception:
+                pass
+            al_terminar(resultado, error)
+
+        self._en_segundo_plano(
+            lambda: trabajo(avance, cancelado),
+            listo=lambda r: terminar(r, None),
+            fallo=lambda e: terminar(None, e),
+        )
+        refrescar()
+
+    # --- cuerpos de jurisprudencia (carga diferida) ---
+    def _con_cuerpo(self, reg, listo):
+        """
+        Llama listo(texto) con la jurisprudencia del registro. Si está a mano
+        es enseguida; si no, se pide en segundo plano y listo corre al llegar
+        (en el hilo de Tk). Si falla, se avisa y listo no se llama.
+        """
+        if "jurisprudencia" in reg:
+            listo(reg.get("jurisprudencia"))
+            return
+        id_ = reg.get("id")
+        texto = self.cuerpos.get(id_)
+        if texto is not None:
+            listo(texto)
+            return
+
+        def fallo(e):
+            messagebox.showerror("Error", f"No se pudo obtener la jurisprudencia: {str(e)}")
+
+        self._en_segundo_plano(lambda: self.cuerpos.obtener(id_), listo=listo, fallo=fallo)
+
+    def _pedir_cuerpos(self, ids):
+        """Trae en segundo plano (una tanda) los cuerpos de las tarjetas recién montadas."""
+        ids = [i for i in self.cuerpos.faltantes(ids) if i not in self._cuerpos_en_vuelo]
+        if not ids:
+            return
+        self._cuerpos_en_vuelo.update(ids)
+
+        def listo(textos):
+            self._cuerpos_en_vuelo.difference_update(ids)
+            self._llenar_cuerpos(textos)
+
+        def fallo(e):
+            self._cuerpos_en_vuelo.difference_update(ids)
+            print("ERROR trayendo jurisprudencia -> ", repr(e))
+            # que se vea en la tarjeta (al volver a mostrarla se pide de nuevo)
+            for id_ in ids:
+                tarjeta = self._tarjetas.get(id_)
+                if tarjeta is not None:
+                    tarjeta.poner_cuerpo(f"⚠ No se pudo traer la jurisprudencia ({e}).")
+
+        self._en_segundo_plano(lambda: self.cuerpos.traer(ids), listo=listo, fallo=fallo)
+
+    def _llenar_cuerpos(self, textos):
+        self._indexador.encolar(self._indexar_cuerpos, dict(textos))
+        self._invalidar_busquedas()
+        for id_, texto in textos.items():
+            tarjeta = self._tarjetas.get(id_) or self._tarjetas_preparadas.get(id_)
+            try:
+                if tarjeta is not None and tarjeta.reg.get("id") == id_:
+                    tarjeta.poner_cuerpo(texto)
+            except Exception:
+                pass
+        self._programar_visibles()  # las que están en pantalla pasan del adelanto al texto entero
 
     def limpiar_vista(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Saca todas las filas: los widgets quedan ocultos en el pool para la próxima página."""
+        for i in list(self._montadas):
+            self._desmontar_fila(i)
+        self._filas = []
+        self._alturas = AlturasFilas()
+        self._medidas.clear()
         # asegurar que el canvas se entere del “vacío/lleno”
         self._ajustar_scrollregion()
 
@@ -768,18 +2236,33 @@ class VisualizadorBase(tk.Toplevel):
             return
 
         def guardar_edicion(datos_editados):
-            try:
-                supabase.table("compendio").update(datos_editados).eq("id", reg["id"]).execute()
+            # el update (con sus reintentos) va en segundo plano; se aplica al volver
+            def trabajo():
+                resp = self.tabla.ejecutar(
+                    lambda c: c.update(datos_editados).eq("id", reg["id"]), "actualizar registro"
+                )
+                # la respuesta trae la fila actualizada; si no, usamos lo que se mandó
+                data = getattr(resp, "data", None) or []
+                return dict(data[0]) if data else dict(reg, **datos_editados)
+
+            def listo(fila):
                 messagebox.showinfo("Éxito", "Registro actualizado correctamente.")
-                self.datos = self.obtener_datos()
-                self.limpiar_vista()
-                self.mostrar_datos_agrupados()
-            except Exception as e:
+                self._aplicar_edicion(reg, fila)
+
+            def fallo(e):
                 messagebox.showerror("Error", f"No se pudo actualizar: {str(e)}")
 
-        # --- PASA el callback para restaurar menú principal ---
-        menu_callback = self.master.deiconify if hasattr(self.master, "deiconify") else None
-        EditaRegistro(self, reg, guardar_edicion, volver_menu_callback=menu_callback)
+            self._en_segundo_plano(trabajo, listo=listo, fallo=fallo)
+
+        def abrir_editor(cuerpo):
+            from edicion import EditaRegistro
+            # --- PASA el callback para restaurar menú principal ---
+            menu_callback = self.master.deiconify if hasattr(self.master, "deiconify") else None
+            completo = dict(reg, jurisprudencia=cuerpo or "")
+            EditaRegistro(self, completo, guardar_edicion, volver_menu_callback=menu_callback)
+
+        # el editor necesita el cuerpo completo (el listado no lo trae)
+        self._con_cuerpo(reg, abrir_editor)
 
     # --- NUEVO: borrar registro individual con contraseña ---
     def borrar_registro(self, reg):
@@ -789,16 +2272,528 @@ class VisualizadorBase(tk.Toplevel):
             return
         if not messagebox.askyesno("Confirmar borrado", "¿Seguro que desea borrar este registro? Esta acción no se puede deshacer."):
             return
-        try:
-            supabase.table("compendio").delete().eq("id", reg["id"]).execute()
+
+        def listo(_):
             messagebox.showinfo("Éxito", "Registro borrado correctamente.")
-            self.datos = self.obtener_datos()
-            self.limpiar_vista()
-            self.mostrar_datos_agrupados()
-        except Exception as e:
+            self._aplicar_borrado([reg["id"]])
+
+        def fallo(e):
             messagebox.showerror("Error", f"No se pudo borrar: {str(e)}")
 
+        self._en_segundo_plano(
+            lambda: self.tabla.ejecutar(lambda c: c.delete(returning="minimal").eq("id", reg["id"]), "borrar registro"),
+            listo=listo, fallo=fallo,
+        )
+
+    # ======== MUTACIONES EN SITIO ========
+    # Editar o borrar no vuelve a traer la tabla: se parchea self.datos
+    # (manteniendo el orden tema/subtema/id) y se re-dibuja lo mínimo.
+    def _posicion(self, reg):
+        """Índice de reg (por identidad) en self.datos ya ordenado."""
+        if self._pos_por_id is None:
+            self._pos_por_id = {r.get("id"): i for i, r in enumerate(self.datos)}
+        i = self._pos_por_id.get(reg.get("id"))
+        if i is not None and i < len(self.datos) and self.datos[i] is reg:
+            return i
+        return None
+
+    def _aplicar_edicion(self, reg, fila):
+        self._ordenar_datos()
+        id_ = reg.get("id")
+        actual = self._por_id.get(id_, reg)
+        clave_vieja = clave_orden(actual)
+        grupo_vieja = grupo_de(actual)
+        pos = self._posicion(actual)
+
+        # el cuerpo va a su cache; en el listado quedan solo las columnas livianas
+        cuerpo = None
+        if "jurisprudencia" in fila:
+            cuerpo = fila.pop("jurisprudencia")
+            self.cuerpos.poner(id_, cuerpo)
+            if self.cache_local is not None:
+                self.cache_local.guardar_cuerpos({id_: "" if cuerpo is None else str(cuerpo)})
+        actual.update(fila)
+        self._por_id[id_] = actual
+        self.alturas_cache.olvidar(id_)
+        self._indexador.encolar(self._indexar_filas, [dict(actual)])
+        self._invalidar_busquedas()
+        if cuerpo is not None:
+            self._indexador.encolar(self._indexar_cuerpos, {id_: cuerpo})
+        if self.cache_local is not None:
+            self.cache_local.guardar_filas([actual])
+
+        if pos is None:
+            if clave_orden(actual) != clave_vieja:
+                # no se encontró en su lugar: re-ordenar todo (_ordenar_datos también
+                # descarta el índice de grupos y los cortes de página)
+                self._datos_desordenados = True
+                self._ordenar_datos()
+                if self._resultado is None:
+                    self._redibujar_pagina()
+                    return
+            self._redibujar_tarjeta(actual)
+            return
+        if clave_orden(actual) == clave_vieja:
+            # mismo tema/subtema: alcanza con la tarjeta
+            self._redibujar_tarjeta(actual)
+            return
+
+        # cambió el grupo: se mueve a su lugar y se re-arma la página sin perder el scroll
+        del self.datos[pos]
+        nueva = bisect.bisect_left(self.datos, clave_orden(actual), key=clave_orden)
+        self.datos.insert(nueva, actual)
+        self._pos_por_id = None
+        if self._grupos_al_dia:
+            self.grupos.quitar(pos, *grupo_vieja)
+            self.grupos.insertar(nueva, *grupo_de(actual))
+        if self._resultado is not None:
+            # con búsqueda, la posición en la vista no cambia por el grupo; lo preparado
+            # para la vista sin filtro sí (se usa al quitar la búsqueda)
+            self._invalidar_paginas()
+            self._redibujar_tarjeta(actual)
+            return
+        start, end = self._rango_pagina(self.current_page)
+        self._invalidar_paginas()
+        # si la página queda entre la posición vieja y la nueva, todo lo suyo se corrió uno
+        if min(pos, nueva) < end and max(pos, nueva) >= start:
+            self._redibujar_pagina()
+
+    def _aplicar_borrado(self, ids):
+        self._ordenar_datos()
+        ids = set(ids)
+        posiciones = [i for i, r in enumerate(self._vista()) if r.get("id") in ids]
+        if not posiciones and not any(i in self._por_id for i in ids):
+            return
+        end = self._rango_pagina(self.current_page)[1]
+        if self._grupos_al_dia:
+            # de atrás para adelante: cada quitar no corre las posiciones que faltan
+            borrados = [(i, r) for i, r in enumerate(self.datos) if r.get("id") in ids]
+            for i, r in reversed(borrados):
+                self.grupos.quitar(i, *grupo_de(r))
+        self.datos = [r for r in self.datos if r.get("id") not in ids]
+        if self._resultado is not None:
+            self._resultado = [r for r in self._resultado if r.get("id") not in ids]
+        self._indexador.encolar(self._desindexar, list(ids))
+        self._invalidar_busquedas()
+        self._invalidar_paginas()
+        for id_ in ids:
+            self._por_id.pop(id_, None)
+            self.cuerpos.descartar(id_)
+        if self._seleccion & ids:
+            self._seleccion -= ids
+            self._actualizar_barra_seleccion()
+        if self.cache_local is not None:
+            self.cache_local.borrar_filas(ids)
+
+        # si se borró algo en esta página o antes, la página se corre
+        if posiciones and min(posiciones) < end:
+            self._redibujar_pagina()
+        else:
+            self._actualizar_paginacion()
+
+    def _aplicar_ediciones(self, ids, cambios):
+        """
+        Los mismos cambios sobre muchos registros: se parchean en sitio y se
+        re-ordena y re-dibuja una sola vez (no una por registro).
+        """
+        self._ordenar_datos()
+        editados = []
+        for id_ in ids:
+            actual = self._por_id.get(id_)
+            if actual is None:
+                continue
+            actual.update(cambios)
+            self.alturas_cache.olvidar(id_)
+            editados.append(actual)
+        if not editados:
+            return
+        self._indexador.encolar(self._indexar_filas, [dict(r) for r in editados])
+        self._invalidar_busquedas()
+        if self.cache_local is not None:
+            self.cache_local.guardar_filas(editados)
+        if "tema" in cambios or "subtema" in cambios:
+            # Timsort: un solo re-orden con los movidos (y el índice de grupos se rearma a demanda)
+            self._datos_desordenados = True
+            self._ordenar_datos()
+        self._redibujar_pagina()
+
+    def _redibujar_tarjeta(self, reg):
+        tarjeta = self._tarjetas.get(reg.get("id"))
+        if tarjeta is None:
+            return  # no está montada: se enlaza con los datos nuevos al aparecer
+        if self.visualizar_registro(reg, tarjeta.numero, tarjeta=tarjeta) is None:
+            self._redibujar_pagina()
+
+    def _redibujar_pagina(self):
+        """Re-arma la página actual conservando la posición del scroll."""
+        try:
+            arriba = self.canvas.canvasy(0)
+        except Exception:
+            arriba = 0.0
+        self.mostrar_datos_agrupados()
+        try:
+            self.canvas.yview_moveto(arriba / self._alto_sr)
+        except Exception:
+            pass
+
+    # ======== SELECCIÓN Y ACCIONES MASIVAS ========
+    def marcar(self, reg, marcada):
+        id_ = reg.get("id")
+        if marcada:
+            self._seleccion.add(id_)
+        else:
+            self._seleccion.discard(id_)
+        self._ancla_seleccion = id_
+        self._actualizar_barra_seleccion()
+
+    def marcar_tramo(self, reg):
+        """Shift+click: marca todo lo que hay en la vista entre el último marcado y reg."""
+        hasta = self._posicion_en_vista(reg)
+        if hasta is None:
+            return
+        ancla = self._por_id.get(self._ancla_seleccion)
+        desde = self._posicion_en_vista(ancla) if ancla is not None else None
+        if desde is None:
+            desde = hasta
+        a, b = sorted((desde, hasta))
+        self._seleccion.update(r.get("id") for r in self._vista()[a:b + 1])
+        self._ancla_seleccion = reg.get("id")
+        self._refrescar_marcas()
+
+    def seleccionar_pagina(self):
+        start, end = self._rango_pagina(self.current_page)
+        self._seleccion.update(r.get("id") for r in self._vista()[start:end])
+        self._refrescar_marcas()
+
+    def quitar_seleccion(self):
+        self._seleccion.clear()
+        self._ancla_seleccion = None
+        self._refrescar_marcas()
+
+    def _refrescar_marcas(self):
+        for id_, tarjeta in self._tarjetas.items():
+            tarjeta.poner_marca(id_ in self._seleccion)
+        self._actualizar_barra_seleccion()
+
+    def _actualizar_barra_seleccion(self):
+        n = len(self._seleccion)
+        if not n:
+            self.barra_seleccion.pack_forget()
+            return
+        self.lbl_seleccion.config(text=f"{n} seleccionado{'s' if n != 1 else ''}")
+        if not self.barra_seleccion.winfo_ismapped():
+            self.barra_seleccion.pack(side="right", padx=(0, 12), before=self.entry_filtro)
+
+    def _pedir_password(self, titulo, accion):
+        password = simpledialog.askstring(titulo, f"Ingrese la contraseña para {accion}:", show="*")
+        if password != ADMIN_PASSWORD:
+            messagebox.showerror("Error", "Contraseña incorrecta.")
+            return False
+        return True
+
+    @staticmethod
+    def _hechos_y_error(escritura):
+        """(ids hechos, error) de una escritura por tandas: si una falla, lo anterior ya quedó hecho."""
+        try:
+            return escritura(), None
+        except ErrorDeDatos as e:
+            return e.hechos, e
+
+    def borrar_seleccion(self):
+        ids = sorted(i for i in self._seleccion if i in self._por_id)
+        if not ids:
+            return
+        if not self._pedir_password("Borrar registros", "borrar"):
+            return
+        if not messagebox.askyesno(
+            "Confirmar borrado",
+            f"¿Seguro que desea borrar {len(ids)} registros? Esta acción no se puede deshacer."
+        ):
+            return
+
+        def listo(resultado):
+            hechos, error = resultado
+            self._aplicar_borrado(hechos)
+            if error is not None:
+                messagebox.showerror("Error", f"Se borraron {len(hechos)} de {len(ids)} registros: {str(error)}")
+            else:
+                messagebox.showinfo("Éxito", f"Se borraron {len(hechos)} registros.")
+
+        self._en_segundo_plano(
+            lambda: self._hechos_y_error(lambda: self.tabla.borrar(ids, lote=LOTE_MASIVO)), listo=listo
+        )
+
+    def editar_seleccion(self):
+        ids = sorted(i for i in self._seleccion if i in self._por_id)
+        if not ids:
+            return
+        if not self._pedir_password("Editar registros", "editar"):
+            return
+        self._dialogo_cambios(ids, lambda cambios: self._guardar_cambios(ids, cambios))
+
+    def _guardar_cambios(self, ids, cambios):
+        # mismos valores para todos: un update con in_ por tanda (sin devolver las filas)
+        def listo(resultado):
+            hechos, error = resultado
+            self._aplicar_ediciones(hechos, cambios)
+            if error is not None:
+                messagebox.showerror("Error", f"Se actualizaron {len(hechos)} de {len(ids)} registros: {str(error)}")
+            else:
+                messagebox.showinfo("Éxito", f"Se actualizaron {len(hechos)} registros.")
+
+        self._en_segundo_plano(
+            lambda: self._hechos_y_error(lambda: self.tabla.actualizar(ids, cambios, lote=LOTE_MASIVO)),
+            listo=listo,
+        )
+
+    def _dialogo_cambios(self, ids, aceptar):
+        """Ventanita con tema/subtema/resultado; lo que se deja vacío no se toca."""
+        valores = {campo: set() for _, campo in CAMPOS_MASIVOS}
+        for reg in self.datos:
+            for campo, vistos in valores.items():
+                if reg.get(campo):
+                    vistos.add(reg.get(campo))
+
+        ventana = tk.Toplevel(self)
+        ventana.title("Cambiar registros seleccionados")
+        ventana.configure(bg=BG_COLOR)
+        ventana.resizable(False, False)
+        ventana.transient(self)
+        tk.Label(
+            ventana, text=f"{len(ids)} registros · lo que quede vacío no se cambia",
+            font=("Inter", 11), bg=BG_COLOR, fg="#1746A2"
+        ).grid(row=0, column=0, columnspan=2, padx=18, pady=(14, 8))
+        entradas = {}
+        for fila, (etiqueta, campo) in enumerate(CAMPOS_MASIVOS, start=1):
+            tk.Label(ventana, text=etiqueta + ":", font=LABEL_FONT, bg=BG_COLOR, fg="#000").grid(
+                row=fila, column=0, sticky="e", padx=(18, 6), pady=4
+            )
+            combo = ttk.Combobox(ventana, values=sorted(valores[campo]), width=40)
+            combo.grid(row=fila, column=1, sticky="w", padx=(0, 18), pady=4)
+            entradas[campo] = combo
+
+        def confirmar():
+            cambios = {c: e.get().strip() for c, e in entradas.items() if e.get().strip()}
+            if not cambios:
+                messagebox.showinfo("Cambiar", "No se indicó ningún cambio.", parent=ventana)
+                return
+            ventana.destroy()
+            aceptar(cambios)
+
+        tk.Button(
+            ventana, text="Aplicar", font=("Inter", 11), bg=BTN_COLOR, fg=BTN_TEXT_COLOR,
+            relief="flat", highlightthickness=2, highlightbackground=BTN_BORDER_COLOR,
+            cursor="hand2", command=confirmar
+        ).grid(row=len(CAMPOS_MASIVOS) + 1, column=0, columnspan=2, pady=(8, 14))
+        return ventana
+
+    # ======== BÚSQUEDA LOCAL (índice invertido en memoria) ========
+    def _posicion_en_vista(self, reg):
+        if self._resultado is None:
+            return self._posicion(reg)
+        for i, r in enumerate(self._resultado):
+            if r is reg:
+                return i
+        return None
+
+    def pedir_busqueda(self):
+        self.entry_filtro.focus_set()
+        self.entry_filtro.select_range(0, "end")
+
+    # --- filtro mientras se escribe ---
+    def _al_tipear_filtro(self):
+        """Cada tecla solo reprograma el filtro: acá no se busca ni se dibuja nada."""
+        if self._filtro_after is not None:
+            self.after_cancel(self._filtro_after)
+        self._filtro_after = self.after(FILTRO_ESPERA_MS, self._aplicar_filtro_ya)
+
+    def _aplicar_filtro_ya(self):
+        if self._filtro_after is not None:
+            self.after_cancel(self._filtro_after)
+            self._filtro_after = None
+        texto = self.filtro_var.get().lstrip()  # el espacio final cierra la última palabra
+        if texto != (self._consulta or ""):
+            self.buscar_local(texto)
+
+    @staticmethod
+    def _consulta_para_indice(texto):
+        """Mientras se escribe, la última palabra cuenta como prefijo."""
+        if texto and texto[-1] not in ' "*':
+            return texto + "*"
+        return texto
+
+    def buscar_local(self, consulta):
+        """
+        Busca en el índice local (en un hilo) y pagina los resultados por relevancia.
+        Si hay una búsqueda en vuelo, esta queda pendiente y se corre al terminar
+        aquella (solo la última): tipear rápido no encola búsquedas.
+        """
+        consulta = (consulta or "").lstrip()
+        self._busqueda_gen += 1
+        if not consulta.strip():
+            self.quitar_busqueda()
+            return
+        if self.indice.version != self._version_recordada:
+            self._invalidar_busquedas()  # se indexó algo desde que se recordaron
+        recordada = self._busquedas_recientes.get(consulta)
+        if recordada is not None:
+            self._busqueda_pendiente = None
+            ids, completa = recordada
+            if completa:
+                self._base_refinar = (consulta, ids)
+            self._aplicar_busqueda(consulta, ids, 0.0)
+            return
+        if self._busqueda_en_vuelo:
+            self._busqueda_pendiente = consulta
+            return
+
+        # si la consulta extiende la anterior (AND + prefijo), alcanza con refinar aquel
+        # resultado; solo si estaba completo y el índice no cambia mientras se busca
+        dentro_de = None
+        base = self._base_refinar
+        if base is not None and consulta.startswith(base[0]) and not self._indexador.ocupado:
+            dentro_de = base[1]
+
+        gen = self._busqueda_gen
+        inicio = time.perf_counter()
+        texto_indice = self._consulta_para_indice(consulta)
+
+        estado = {}
+
+        def trabajo():
+            return self.indice.buscar(texto_indice, verificar=self._textos_para_frase,
+                                      dentro_de=dentro_de, estado=estado)
+
+        def terminar():
+            self._busqueda_en_vuelo = False
+            pendiente, self._busqueda_pendiente = self._busqueda_pendiente, None
+            if pendiente is not None:
+                self.buscar_local(pendiente)
+
+        def listo(encontrados):
+            if gen == self._busqueda_gen:
+                ids = [i for i, _ in encontrados]
+                self._recordar_busqueda(consulta, ids, estado)
+                self._aplicar_busqueda(consulta, ids, (time.perf_counter() - inicio) * 1000)
+            terminar()
+
+        def fallo(e):
+            print("ERROR buscando -> ", repr(e))
+            terminar()
+
+        self._busqueda_en_vuelo = True
+        self._en_segundo_plano(trabajo, listo=listo, fallo=fallo)
+
+    def _recordar_busqueda(self, consulta, ids, estado):
+        if estado.get("version") != self.indice.version:
+            return  # el índice cambió mientras se buscaba: no sirve para la próxima
+        if estado["version"] != self._version_recordada:
+            self._invalidar_busquedas()
+        recientes = self._busquedas_recientes
+        recientes.pop(consulta, None)
+        recientes[consulta] = (ids, estado["completa"])
+        if estado["completa"]:
+            self._base_refinar = (consulta, ids)
+        while len(recientes) > FILTRO_RECIENTES:
+            del recientes[next(iter(recientes))]
+
+    def _aplicar_busqueda(self, consulta, ids, ms):
+        medicion.registrar("busqueda", ms, resultados=len(ids))
+        self._consulta = consulta
+        por_id = self._por_id
+        self._resultado = [por_id[i] for i in ids if i in por_id]
+        self._invalidar_paginas()
+        self._mostrar_estado_busqueda(ms)
+        self._go_to_page(1)
+
+    def quitar_busqueda(self):
+        self._busqueda_gen += 1
+        self._busqueda_pendiente = None
+        if self.filtro_var.get():
+            self.filtro_var.set("")
+        if self._consulta is None:
+            return
+        self._consulta = None
+        self._resultado = None
+        self._base_refinar = None
+        self._invalidar_paginas()
+        self.lbl_busqueda.pack_forget()
+        self._go_to_page(1)
+
+    def _invalidar_busquedas(self):
+        """Cambiaron los datos o el índice: lo recordado ya no sirve para responder ni refinar."""
+        self._busquedas_recientes.clear()
+        self._base_refinar = None
+        self._version_recordada = self.indice.version
+
+    def _refrescar_busqueda(self):
+        """Vuelve a correr la consulta vigente (p. ej. al terminar de cargar)."""
+        self._invalidar_busquedas()
+        texto_indice = self._consulta_para_indice(self._consulta)
+        estado = {}
+        encontrados = self.indice.buscar(texto_indice, verificar=self._textos_para_frase, estado=estado)
+        ids = [i for i, _ in encontrados]
+        self._recordar_busqueda(self._consulta, ids, estado)
+        por_id = self._por_id
+        self._resultado = [por_id[i] for i in ids if i in por_id]
+        self._invalidar_paginas()
+
+    def _mostrar_estado_busqueda(self, ms):
+        n = len(self._resultado or [])
+        texto = f"{n} resultado{'s' if n != 1 else ''} para “{self._consulta}” ({ms:.0f} ms)"
+        if self._indexador.ocupado:
+            texto += " · indexando…"
+        self.lbl_busqueda.config(text=texto + "   ✕")
+        if not self.lbl_busqueda.winfo_ismapped():
+            self.lbl_busqueda.pack(side="right", padx=(0, 12), before=self.entry_filtro)
+
+    def _textos_para_frase(self, ids):
+        """Texto completo (fila + cuerpo si se tiene) para confirmar frases exactas."""
+        cuerpos = {i: self.cuerpos.get(i) for i in ids}
+        faltan = [i for i, t in cuerpos.items() if t is None]
+        if faltan and self.cache_local is not None:
+            try:
+                cuerpos.update(self.cache_local.cuerpos(faltan))
+            except Exception as e:
+                print("ERROR leyendo cuerpos para la búsqueda -> ", repr(e))
+        textos = {}
+        for i in ids:
+            reg = self._por_id.get(i) or {}
+            partes = [reg.get(c) or "" for c in ("autos", "voces", "jurisdiccion")]
+            partes.append(cuerpos.get(i) or "")
+            textos[i] = "\n".join(str(p) for p in partes)
+        return textos
+
+    # --- trabajos del hilo del índice (no tocar widgets acá) ---
+    def _indexar_filas(self, filas):
+        for fila in filas:
+            self.indice.agregar_fila(fila)
+
+    def _indexar_cuerpos(self, textos):
+        for id_, texto in textos.items():
+            self.indice.agregar_cuerpo(id_, texto)
+
+    def _desindexar(self, ids):
+        for id_ in ids:
+            self.indice.quitar(id_)
+
+    def _indexar_cuerpos_locales(self):
+        for tanda in self.cache_local.iterar_cuerpos():
+            if self._cerrando:
+                return
+            for id_, texto in tanda:
+                self.indice.agregar_cuerpo(id_, texto)
+
+    def _traer_cuerpos_para_indice(self, ids):
+        """Trae del server los cuerpos que el índice no tiene (sin pasar por el LRU)."""
+        faltan = [i for i in ids if not self.indice.tiene_cuerpo(i)]
+        for i in range(0, len(faltan), LOTE_CUERPOS_INDICE):
+            if self._cerrando:
+                return
+            self._indexar_cuerpos(self.cuerpos.traer(faltan[i:i + LOTE_CUERPOS_INDICE], recordar=False))
+
     def busqueda_avanzada(self):
+        from busqueda import BusquedaAvanzada
         self.iconify()  # Minimiza la ventana de información
         buscador = BusquedaAvanzada(self, volver_callback=self.deiconify)
         buscador.protocol("WM_DELETE_WINDOW", lambda: [buscador.destroy(), self.deiconify()])
@@ -0,0 +1,208 @@
+"""
+Medición de rendimiento: tramos con nombre (cuánto tardan) y contadores.
+
+Apagada por defecto y casi gratis en ese estado: tramo() devuelve siempre el
+mismo context manager vacío y contar() vuelve enseguida. Se enciende con
+
+    COMPENDIO_MEDIR=1                    junta estadísticas en memoria
+    COMPENDIO_MEDIR_ARCHIVO=medidas.jsonl además escribe una línea JSON por tramo
+
+o desde la ventana con F2 (HUD con las estadísticas en vivo).
+
+Uso:
+
+    with medicion.tramo("carga.lote", filas=50):
+        ...
+    medicion.contar("widgets.tarjeta.creados")
+
+Se puede usar desde cualquier hilo.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+MUESTRAS = 256  # duraciones recientes que se guardan por tramo (para mediana y p95)
+
+ACTIVO = False
+_lock = threading.Lock()
+_tramos = {}       # nombre -> Estadistica
+_contadores = {}   # nombre -> total
+_archivo = None
+
+
+class Estadistica:
+    __slots__ = ("n", "total_ms", "max_ms", "ultimo_ms", "recientes")
+
+    def __init__(self):
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.ultimo_ms = 0.0
+        self.recientes = deque(maxlen=MUESTRAS)
+
+    def agregar(self, ms):
+        self.n += 1
+        self.total_ms += ms
+        self.ultimo_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+        self.recientes.append(ms)
+
+    def percentil(self, p):
+        if not self.recientes:
+            return 0.0
+        orden = sorted(self.recientes)
+        return orden[min(len(orden) - 1, int(p * len(orden)))]
+
+
+class _Nulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _Nulo()
+
+
+class _Tramo:
+    __slots__ = ("nombre", "datos", "inicio")
+
+    def __init__(self, nombre, datos):
+        self.nombre = nombre
+        self.datos = datos
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nombre, (time.perf_counter() - self.inicio) * 1000, **self.datos)
+        return False
+
+
+def tramo(nombre, **datos):
+    """Context manager que mide lo que encierra (no hace nada si está apagada)."""
+    if not ACTIVO:
+        return _NULO
+    return _Tramo(nombre, datos)
+
+
+def registrar(nombre, ms, **datos):
+    """Anota una duración ya medida."""
+    if not ACTIVO:
+        return
+    with _lock:
+        est = _tramos.get(nombre)
+        if est is None:
+            est = _tramos[nombre] = Estadistica()
+        est.agregar(ms)
+        if _archivo is not None:
+            _escribir(dict(datos, tipo="tramo", nombre=nombre, ms=round(ms, 3)))
+
+
+def contar(nombre, n=1):
+    if not ACTIVO:
+        return
+    with _lock:
+        _contadores[nombre] = _contadores.get(nombre, 0) + n
+
+
+def contar_bytes(nombre, filas):
+    """Suma el tamaño aproximado (JSON) de lo que devolvió el server."""
+    if not ACTIVO or not filas:
+        return
+    contar(nombre, len(json.dumps(filas, ensure_ascii=False, default=str).encode("utf-8")))
+
+
+def evento(nombre, **datos):
+    """Algo puntual que vale la pena dejar en el archivo (fin de carga, etc.)."""
+    if not ACTIVO or _archivo is None:
+        return
+    with _lock:
+        _escribir(dict(datos, tipo="evento", nombre=nombre))
+
+
+def _escribir(linea):
+    linea["t"] = round(time.time(), 3)
+    try:
+        _archivo.write(json.dumps(linea, ensure_ascii=False, default=str) + "\n")
+    except Exception:
+        pass
+
+
+def activar(ruta=None):
+    """Enciende la medición; con ruta, también escribe JSON lines ahí (se agrega al final)."""
+    global ACTIVO, _archivo
+    with _lock:
+        if ruta and _archivo is None:
+            try:
+                _archivo = open(ruta, "a", encoding="utf-8", buffering=1)
+            except Exception as e:
+                print("ERROR abriendo archivo de medición -> ", repr(e))
+        ACTIVO = True
+
+
+def desactivar():
+    global ACTIVO
+    volcar()
+    ACTIVO = False
+
+
+def volcar():
+    """Escribe los contadores acumulados en el archivo (si hay archivo)."""
+    if _archivo is None:
+        return
+    with _lock:
+        if _contadores:
+            _escribir({"tipo": "contadores", **_contadores})
+        try:
+            _archivo.flush()
+        except Exception:
+            pass
+
+
+def reiniciar():
+    with _lock:
+        _tramos.clear()
+        _contadores.clear()
+
+
+def resumen():
+    """({nombre: Estadistica copiada}, {contador: total}) para mostrar."""
+    with _lock:
+        tramos = {}
+        for nombre, est in _tramos.items():
+            copia = Estadistica()
+            copia.n, copia.total_ms, copia.max_ms, copia.ultimo_ms = est.n, est.total_ms, est.max_ms, est.ultimo_ms
+            copia.recientes.extend(est.recientes)
+            tramos[nombre] = copia
+        return tramos, dict(_contadores)
+
+
+def texto_resumen():
+    """Tabla de texto para el HUD."""
+    tramos, contadores = resumen()
+    lineas = [f"{'tramo':<22}{'n':>6}{'últ':>8}{'p50':>8}{'p95':>8}{'máx':>8}"]
+    for nombre in sorted(tramos):
+        est = tramos[nombre]
+        lineas.append(
+            f"{nombre[:22]:<22}{est.n:>6}{est.ultimo_ms:>8.1f}{est.percentil(0.5):>8.1f}"
+            f"{est.percentil(0.95):>8.1f}{est.max_ms:>8.1f}"
+        )
+    if contadores:
+        lineas.append("")
+        for nombre in sorted(contadores):
+            lineas.append(f"{nombre[:30]:<30}{contadores[nombre]:>14,}")
+    return "\n".join(lineas)
+
+
+if os.environ.get("COMPENDIO_MEDIR", "0") == "1" or os.environ.get("COMPENDIO_MEDIR_ARCHIVO"):
+    activar(os.environ.get("COMPENDIO_MEDIR_ARCHIVO"))
+atexit.register(volcar)
@@ -0,0 +1,119 @@
+"""
+Filas del listado en formato compacto.
+
+Cada fila del server llega como un dict con sus propios strings: 10k filas
+son 10k dicts (con su tabla de hash) y 10k copias de "DAÑOS Y PERJUICIOS".
+Registro guarda las columnas del listado en __slots__ (sin dict por fila) y
+los campos que se repiten (tema, subtema, jurisdicción, resultado) se
+internan, así todas las filas comparten el mismo string. El cuerpo de
+jurisprudencia no vive acá: está en CacheJurisprudencia / la cache local.
+
+Se usa como un dict (get, [], in, keys, items, update, dict(reg)...), así
+que el resto del código no necesita saber si tiene un dict o un Registro.
+Columnas que no son del listado (p. ej. updated_at) van a un dict aparte
+que solo existe si hace falta.
+"""
+import sys
+
+CAMPOS = ("id", "tema", "subtema", "autos", "jurisdiccion", "fecha", "resultado", "voces", "link_fallo")
+CATEGORICOS = frozenset(("tema", "subtema", "jurisdiccion", "resultado"))
+
+_EN_SLOTS = frozenset(CAMPOS)
+_intern = sys.intern
+
+
+class Registro:
+    __slots__ = CAMPOS + ("_extra",)
+
+    def __init__(self, fila=(), **campos):
+        self._extra = None
+        if fila:
+            self.update(fila)
+        if campos:
+            self.update(campos)
+
+    # ---------- lectura ----------
+    def get(self, clave, defecto=None):
+        if clave in _EN_SLOTS:
+            return getattr(self, clave, defecto)
+        extra = self._extra
+        return defecto if extra is None else extra.get(clave, defecto)
+
+    def __getitem__(self, clave):
+        if clave in _EN_SLOTS:
+            try:
+                return getattr(self, clave)
+            except AttributeError:
+                raise KeyError(clave) from None
+        extra = self._extra
+        if extra is None:
+            raise KeyError(clave)
+        return extra[clave]
+
+    def __contains__(self, clave):
+        if clave in _EN_SLOTS:
+            return hasattr(self, clave)
+        return self._extra is not None and clave in self._extra
+
+    def keys(self):
+        claves = [c for c in CAMPOS if hasattr(self, c)]
+        if self._extra:
+            claves.extend(self._extra)
+        return claves
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(c, self[c]) for c in self.keys()]
+
+    def values(self):
+        return [self[c] for c in self.keys()]
+
+    def __repr__(self):
+        return f"Registro({dict(self.items())!r})"
+
+    # ---------- escritura ----------
+    def __setitem__(self, clave, valor):
+        if clave in _EN_SLOTS:
+            if clave in CATEGORICOS and type(valor) is str:
+                valor = _intern(valor)
+            setattr(self, clave, valor)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[clave] = valor
+
+    def update(self, otro=(), **campos):
+        pares = otro.items() if hasattr(otro, "items") else otro
+        for clave, valor in pares:
+            self[clave] = valor
+        for clave, valor in campos.items():
+            self[clave] = valor
+
+    def pop(self, clave, *defecto):
+        try:
+            valor = self[clave]
+        except KeyError:
+            if defecto:
+                return defecto[0]
+            raise
+        if clave in _EN_SLOTS:
+            delattr(self, clave)
+        else:
+            del self._extra[clave]
+        return valor
+
+    def clear(self):
+        for c in CAMPOS:
+            if hasattr(self, c):
+                delattr(self, c)
+        self._extra = None
+
+
+def registros(filas):
+    """Lista de Registro a partir de dicts (o de pares clave/valor)."""
+    return [Registro(f) for f in filas]
@@ -0,0 +1,62 @@
+import json
+
+import httpx
+import pytest
+from postgrest import SyncPostgrestClient
+from postgrest.exceptions import APIError
+
+import acceso_datos
+from acceso_datos import ErrorDeDatos, TablaCompendio, es_transitorio
+
+
+def _cliente(responder):
+    """Cliente postgrest de verdad sobre un transporte de mentira: responder(pedido) -> httpx.Response."""
+    sesion = httpx.Client(base_url="http://pg.invalid", transport=httpx.MockTransport(responder))
+    return SyncPostgrestClient("http://pg.invalid", http_client=sesion)
+
+
+def _error_de(respuesta):
+    cliente = _cliente(lambda pedido: respuesta)
+    with pytest.raises(APIError) as info:
+        cliente.table("compendio").select("id").execute()
+    return info.value
+
+
+def _json(estado, codigo, mensaje="x"):
+    cuerpo = {"code": codigo, "message": mensaje, "details": None, "hint": None}
+    return httpx.Response(estado, content=json.dumps(cuerpo), headers={"Content-Type": "application/json"})
+
+
+def test_api_error_con_estado_http_del_gateway():
+    assert es_transitorio(_error_de(httpx.Response(502, text="<html>Bad gateway</html>")))
+    assert es_transitorio(_error_de(httpx.Response(429, json={"message": "API rate limit exceeded"})))
+    assert not es_transitorio(_error_de(httpx.Response(404, text="not found")))
+
+
+def test_api_error_con_codigo_de_postgrest():
+    assert es_transitorio(_error_de(_json(500, "57014", "canceling statement due to statement timeout")))
+    assert not es_transitorio(_error_de(_json(406, "PGRST116")))
+    assert not es_transitorio(_error_de(_json(400, "42703", "column compendio.x does not exist")))
+
+
+def test_errores_de_httpx():
+    pedido = httpx.Request("GET", "http://pg.invalid")
+    assert es_transitorio(httpx.ConnectError("sin red", request=pedido))
+    assert es_transitorio(httpx.ReadTimeout("lento", request=pedido))
+    assert es_transitorio(httpx.HTTPStatusError("x", request=pedido, response=httpx.Response(503)))
+    assert not es_transitorio(httpx.HTTPStatusError("x", request=pedido, response=httpx.Response(400)))
+    assert not es_transitorio(ValueError("mal armado"))
+
+
+def test_ejecutar_reintenta_solo_lo_transitorio(monkeypatch):
+    monkeypatch.setattr(acceso_datos.time, "sleep", lambda s: None)
+    respuestas = [httpx.Response(502, text="bad gateway"), httpx.Response(200, json=[{"id": 1}])]
+    cliente = _cliente(lambda pedido: respuestas.pop(0))
+    tabla = TablaCompendio(cliente, reintentos=2)
+    assert tabla.datos(lambda c: c.select("id")) == [{"id": 1}]
+
+    pedidos = []
+    cliente = _cliente(lambda pedido: pedidos.append(pedido) or _json(400, "PGRST100"))
+    with pytest.raises(ErrorDeDatos):
+        TablaCompendio(cliente, reintentos=3).datos(lambda c: c.select("id"), "leer")
+    assert len(pedidos) == 1
@@ -0,0 +1,177 @@
+import acceso_datos
+import cache_local
+from acceso_datos import TablaCompendio
+from cache_local import CacheLocal, suma_tramo
+from carga import CargadorCompendio
+
+COLUMNAS = ["id", "tema", "autos"]
+
+
+class _Resp:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Consulta:
+    def __init__(self, base):
+        self.base = base
+        self.columnas = None
+        self.filtros = []
+        self.desc = False
+        self.tope = None
+        self.contar = False
+        self.por_tramo = False
+
+    def select(self, columnas, count=None):
+        self.columnas = [c.strip() for c in columnas.split(",")]
+        self.contar = count is not None
+        for c in self.columnas:
+            if c not in COLUMNAS:
+                raise ValueError(f"column compendio.{c} does not exist")
+        return self
+
+    def _filtro(self, c, op):
+        self.filtros.append(lambda f: f[c] is not None and op(f[c]))
+        return self
+
+    def gt(self, c, v):
+        return self._filtro(c, lambda x: x > v)
+
+    def gte(self, c, v):
+        return self._filtro(c, lambda x: x >= v)
+
+    def lt(self, c, v):
+        self.por_tramo = True
+        return self._filtro(c, lambda x: x < v)
+
+    def lte(self, c, v):
+        return self._filtro(c, lambda x: x <= v)
+
+    def order(self, c, desc=False):
+        self.desc = desc
+        return self
+
+    def limit(self, n):
+        self.tope = n
+        return self
+
+    def execute(self):
+        self.base.pedidos += 1
+        if self.base.cortes and self.por_tramo:
+            self.base.cortes -= 1
+            raise ConnectionError("conexión cortada")
+        filas = [f for f in self.base.filas.values() if all(c(f) for c in self.filtros)]
+        filas.sort(key=lambda f: f["id"], reverse=self.desc)
+        total = len(filas) if self.contar else None
+        if self.tope is not None:
+            filas = filas[:self.tope]
+        return _Resp([{c: f[c] for c in self.columnas} for f in filas], total)
+
+
+class _Rpc:
+    def __init__(self, base, params):
+        self.base = base
+        self.params = params
+
+    def execute(self):
+        self.base.pedidos += 1
+        if not self.base.con_sumas:
+            raise RuntimeError("Could not find the function public.compendio_sumas")
+        tamanio = self.params["tamanio"]
+        tramos = {}
+        for id_ in sorted(self.base.filas):
+            tramos.setdefault(id_ // tamanio, []).append(self.base.filas[id_])
+        return _Resp([
+            {"tramo": t, "filas": len(fs), "suma": suma_tramo(fs, COLUMNAS)} for t, fs in tramos.items()
+        ])
+
+
+class _Cliente:
+    def __init__(self, n, con_sumas=True):
+        self.filas = {i: {"id": i, "tema": f"T{i % 7}", "autos": f"autos {i}"} for i in range(1, n + 1)}
+        self.pedidos = 0
+        self.con_sumas = con_sumas
+        self.caido = False
+        self.cortes = 0  # cuántos pedidos de un tramo fallan por la red antes de contestar
+
+    def table(self, nombre):
+        if self.caido:
+            raise ConnectionError("sin red")
+        return _Consulta(self)
+
+    def rpc(self, nombre, params):
+        return _Rpc(self, params)
+
+
+def _sincronizar(cache, cliente):
+    def nuevo_cargador(desde_id=None, columnas="*"):
+        return CargadorCompendio(cliente, columnas=columnas, tamanio_lote=50, concurrencia=2, desde_id=desde_id)
+    return list(cache.sincronizar(cliente, nuevo_cargador, tamanio_lote=50))
+
+
+def test_sin_cambios_pocos_pedidos(tmp_path):
+    cliente = _Cliente(5000)
+    cache = CacheLocal(str(tmp_path / "c.sqlite3"), COLUMNAS)
+    _sincronizar(cache, cliente)
+    assert cache.cantidad() == 5000
+
+    cliente.pedidos = 0
+    assert _sincronizar(cache, cliente) == []
+    assert cliente.pedidos <= 5
+
+
+def test_sumas_traen_solo_lo_cambiado_y_borrado(tmp_path):
+    cliente = _Cliente(3000)
+    cache = CacheLocal(str(tmp_path / "c.sqlite3"), COLUMNAS)
+    _sincronizar(cache, cliente)
+
+    cliente.filas[1500]["autos"] = "cambiado"
+    del cliente.filas[2500]
+    cliente.pedidos = 0
+    eventos = _sincronizar(cache, cliente)
+    cambiadas = [f["id"] for tipo, filas, _ in eventos if tipo == "filas" for f in filas]
+    borrados = [i for tipo, ids, _ in eventos if tipo == "borrados" for i in ids]
+    assert cambiadas == [1500]
+    assert borrados == [2500]
+    assert cliente.pedidos < 60  # dos tramos de 1000 ids, no las 3000 filas
+    assert cache.ids() == set(cliente.filas)
+
+
+def test_sin_funcion_de_sumas_compara_todo(tmp_path):
+    cliente = _Cliente(200, con_sumas=False)
+    cache = CacheLocal(str(tmp_path / "c.sqlite3"), COLUMNAS)
+    _sincronizar(cache, cliente)
+    cliente.filas[7]["tema"] = "NUEVO"
+    eventos = _sincronizar(cache, cliente)
+    assert [f["id"] for _, filas, _ in eventos for f in filas] == [7]
+
+
+def test_columna_actualizacion_no_se_recuerda_si_falla_la_red(tmp_path, monkeypatch):
+    monkeypatch.setattr(acceso_datos.time, "sleep", lambda s: None)
+    cliente = _Cliente(1)
+    cache = CacheLocal(str(tmp_path / "c.sqlite3"), COLUMNAS)
+    cliente.caido = True
+    assert cache._tiene_columna_actualizacion(TablaCompendio(cliente)) is False
+    assert cache.meta("tiene_actualizacion") is None
+
+    cliente.caido = False  # ahora sí contesta: la columna no existe
+    assert cache._tiene_columna_actualizacion(TablaCompendio(cliente)) is False
+    assert cache.meta("tiene_actualizacion") == "0"
+
+
+def test_un_corte_de_red_se_reintenta(tmp_path, monkeypatch):
+    monkeypatch.setattr(acceso_datos.time, "sleep", lambda s: None)
+    cliente = _Cliente(3000)
+    cache = CacheLocal(str(tmp_path / "c.sqlite3"), COLUMNAS)
+    _sincronizar(cache, cliente)
+
+    cliente.filas[1500]["autos"] = "cambiado"
+    cliente.cortes = 1  # el pedido del tramo distinto falla una vez
+    eventos = _sincronizar(cache, cliente)
+    assert [f["id"] for tipo, filas, _ in eventos if tipo == "filas" for f in filas] == [1500]
+
+
+def test_sql_funcion_sumas_usa_las_columnas():
+    sql = cache_local.sql_funcion_sumas(COLUMNAS)
+    assert "coalesce(tema::text, chr(2))" in sql and "group by id / tamanio" in sql
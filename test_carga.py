@@ -0,0 +1,111 @@
+import threading
+import time
+
+import carga
+from carga import CargadorCompendio
+
+
+class _Resp:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Consulta:
+    def __init__(self, base):
+        self.base = base
+        self.filtros = []
+        self.desc = False
+        self.tope = None
+        self.contar = False
+
+    def select(self, columnas, count=None):
+        self.contar = count is not None
+        return self
+
+    def gt(self, c, v):
+        self.filtros.append(lambda f: f[c] > v)
+        return self
+
+    def lte(self, c, v):
+        self.filtros.append(lambda f: f[c] <= v)
+        return self
+
+    def order(self, c, desc=False):
+        self.desc = desc
+        return self
+
+    def limit(self, n):
+        self.tope = n
+        return self
+
+    def execute(self):
+        self.base.pedidos += 1
+        if self.base.cortes:
+            self.base.cortes -= 1
+            raise ConnectionError("conexión cortada")
+        filas = [f for f in self.base.filas if all(c(f) for c in self.filtros)]
+        filas.sort(key=lambda f: f["id"], reverse=self.desc)
+        total = len(filas) if self.contar else None
+        if self.tope is not None:
+            filas = filas[:self.tope]
+        return _Resp([dict(f) for f in filas], total)
+
+
+class _Cliente:
+    def __init__(self, ids):
+        self.filas = [{"id": i} for i in ids]
+        self.pedidos = 0
+        self.cortes = 0  # cuántos de los próximos pedidos fallan por la red
+
+    def table(self, nombre):
+        return _Consulta(self)
+
+
+def test_ids_dispersos_no_multiplican_los_pedidos():
+    cliente = _Cliente(list(range(1, 100)) + [10_000_000])
+    cargador = CargadorCompendio(cliente, columnas="id", tamanio_lote=50, concurrencia=4)
+    filas = cargador.obtener_todo()
+    assert [f["id"] for f in filas] == list(range(1, 100)) + [10_000_000]
+    assert cargador.rangos_totales == 1
+    assert cliente.pedidos < 10
+
+
+def test_rangos_topeados_sin_cantidad_de_filas():
+    cargador = CargadorCompendio(_Cliente([]), tamanio_lote=50, concurrencia=4)
+    rangos = cargador.rangos(1, 10_000_000)
+    assert len(rangos) == 4 * carga.RANGOS_POR_HILO
+    assert rangos[0][0] == 1 and rangos[-1][1] == 10_000_000
+    # contiguos y sin superponerse
+    assert all(a[1] + 1 == b[0] for a, b in zip(rangos, rangos[1:]))
+
+
+def test_desde_id_trae_solo_lo_nuevo():
+    cliente = _Cliente(range(1, 501))
+    cargador = CargadorCompendio(cliente, columnas="id", tamanio_lote=50, concurrencia=3, desde_id=450)
+    assert [f["id"] for f in cargador.obtener_todo()] == list(range(451, 501))
+
+
+def test_cola_acotada_frena_los_pedidos():
+    cliente = _Cliente(range(1, 5001))
+    cargador = CargadorCompendio(cliente, columnas="id", tamanio_lote=10, concurrencia=4)
+    lotes = cargador.iterar_lotes()
+    next(lotes)
+    time.sleep(0.3)  # el que consume no saca: los hilos tienen que esperar
+    tope = 4 * carga.TANDAS_EN_COLA_POR_HILO + 4 + 4  # cola + uno en mano por hilo + pedidos previos
+    assert cliente.pedidos <= tope
+    antes = threading.active_count()
+    lotes.close()
+    time.sleep(0.5)
+    assert threading.active_count() < antes  # al cerrar, los hilos no quedan colgados en la cola
+
+
+def test_limites_y_conteo_reintentan():
+    cliente = _Cliente(range(1, 201))
+    cliente.cortes = 1  # falla el primer pedido (id mínimo)
+    cargador = CargadorCompendio(cliente, columnas="id", tamanio_lote=50, espera_reintento=0)
+    assert cargador.limites_id() == (1, 200)
+    cliente.cortes = 2
+    assert cargador.contar_filas() == 200
+    cliente.cortes = 10  # se agotan los reintentos: sin conteo, pero no corta la carga
+    assert cargador.contar_filas() is None
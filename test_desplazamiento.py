@@ -0,0 +1,107 @@
+from desplazamiento import MotorDesplazamiento, pasos_de
+
+
+class _Evento:
+    def __init__(self, num=None, delta=0):
+        self.num = num
+        self.delta = delta
+
+
+class _Raiz:
+    """after/after_idle que se corren a mano."""
+
+    def __init__(self):
+        self.programados = []
+        self.enlazados = []
+
+    def after(self, ms, funcion):
+        self.programados.append(funcion)
+        return len(self.programados)
+
+    def after_idle(self, funcion):
+        return self.after(0, funcion)
+
+    def bind_all(self, secuencia, funcion):
+        self.enlazados.append(secuencia)
+
+    def correr(self):
+        """Corre los cuadros programados (y los que estos programen) hasta que no quede ninguno."""
+        cuadros = 0
+        while self.programados:
+            self.programados.pop(0)()
+            cuadros += 1
+        return cuadros
+
+
+class _Desplazable:
+    def __init__(self):
+        self.movimientos = []
+
+    def yview_scroll(self, cantidad, unidad):
+        self.movimientos.append((cantidad, unidad))
+
+
+ABAJO = _Evento(num=5)
+ARRIBA = _Evento(num=4)
+
+
+def test_pasos_de():
+    assert pasos_de(ABAJO) == 1 and pasos_de(ARRIBA) == -1
+    assert pasos_de(_Evento(delta=-240)) == 2 and pasos_de(_Evento(delta=120)) == -1
+    assert pasos_de(_Evento(delta=3)) == -1  # trackpad: cada evento es un paso
+    assert pasos_de(_Evento(delta=0)) == 0
+
+
+def test_junta_los_eventos_en_un_cuadro():
+    raiz, canvas = _Raiz(), _Desplazable()
+    motor = MotorDesplazamiento(raiz, canvas, px_por_paso=60, inercia=0)
+    motor.enlazar()
+    assert sorted(raiz.enlazados) == ["<Button-4>", "<Button-5>", "<MouseWheel>"]
+    for _ in range(10):
+        motor.al_girar(ABAJO)
+    motor.al_girar(ARRIBA)
+    assert len(raiz.programados) == 1  # un solo cuadro para los 11 eventos
+    assert raiz.correr() == 1
+    assert canvas.movimientos == [(540, "pixels")]
+    assert motor.estadisticas()["eventos_por_cuadro"] == 11.0
+
+
+def test_recuadro_apuntado_se_mueve_por_lineas():
+    raiz, canvas, texto = _Raiz(), _Desplazable(), _Desplazable()
+    motor = MotorDesplazamiento(raiz, canvas, inercia=0)
+    motor.apuntar(texto)
+    motor.al_girar(ABAJO)
+    motor.al_girar(ABAJO)
+    motor.soltar()
+    motor.al_girar(ARRIBA)
+    raiz.correr()
+    assert texto.movimientos == [(2, "units")]
+    assert canvas.movimientos == [(-60, "pixels")]
+
+
+def test_inercia_arrastra_la_fraccion_de_pixel():
+    raiz, canvas = _Raiz(), _Desplazable()
+    motor = MotorDesplazamiento(raiz, canvas, px_por_paso=10, inercia=0.55)
+    motor.al_girar(ABAJO)
+    cuadros = raiz.correr()
+    movido = sum(px for px, _ in canvas.movimientos)
+    # 10 + 5.5 + 3.025 + ...: lo que no llega a un pixel pasa al cuadro siguiente
+    velocidades, v = [], 10.0
+    while True:
+        velocidades.append(v)
+        if abs(v * 0.55) < 1:
+            break
+        v *= 0.55
+    assert cuadros == len(velocidades)
+    assert movido == int(sum(velocidades))
+    assert all(unidad == "pixels" for _, unidad in canvas.movimientos)
+
+
+def test_detener_corta_la_inercia():
+    raiz, canvas = _Raiz(), _Desplazable()
+    motor = MotorDesplazamiento(raiz, canvas, px_por_paso=60, inercia=0.9)
+    motor.al_girar(ABAJO)
+    raiz.programados.pop(0)()  # primer cuadro
+    motor.detener()
+    raiz.correr()
+    assert canvas.movimientos == [(60, "pixels")]
@@ -0,0 +1,79 @@
+import csv
+import gzip
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+
+from exportar import ExportacionCancelada, exportar_docx, exportar_tabla, formato_de, lotes_locales
+from registros import Registro
+
+COLUMNAS = ["id", "tema", "autos"]
+
+
+def _registros(n):
+    return [Registro({"id": i, "tema": "DAÑOS" if i < 3 else "FAMILIA", "autos": f"Autos {i}, \"x\""})
+            for i in range(n)]
+
+
+def test_formato_de():
+    assert formato_de("a.csv") == "csv"
+    assert formato_de("a.CSV.gz") == "csv"
+    assert formato_de("a.jsonl.gz") == "jsonl"
+    assert formato_de("a.json") == "jsonl"
+
+
+def test_csv_con_cuerpos(tmp_path):
+    ruta = str(tmp_path / "c.csv")
+    avances = []
+    lotes = lotes_locales(_registros(5), lambda ids: {i: f"cuerpo {i}" for i in ids}, tanda=2)
+    n = exportar_tabla(ruta, lotes, COLUMNAS + ["jurisprudencia"], avance=lambda h, t: avances.append(h))
+    assert n == 5 and avances == [2, 4, 5]
+    with open(ruta, encoding="utf-8", newline="") as f:
+        filas = list(csv.DictReader(f))
+    assert [f["id"] for f in filas] == ["0", "1", "2", "3", "4"]
+    assert filas[1]["autos"] == 'Autos 1, "x"' and filas[1]["jurisprudencia"] == "cuerpo 1"
+
+
+def test_jsonl_comprimido(tmp_path):
+    ruta = str(tmp_path / "c.jsonl.gz")
+    exportar_tabla(ruta, lotes_locales(_registros(3)), COLUMNAS)
+    with gzip.open(ruta, "rt", encoding="utf-8") as f:
+        filas = [json.loads(linea) for linea in f]
+    assert filas[0] == {"id": 0, "tema": "DAÑOS", "autos": 'Autos 0, "x"'}
+    assert len(filas) == 3
+
+
+def test_cancelar_no_deja_archivo(tmp_path):
+    ruta = tmp_path / "c.csv"
+    cancelado = threading.Event()
+    cancelado.set()
+    with pytest.raises(ExportacionCancelada):
+        exportar_tabla(str(ruta), lotes_locales(_registros(3)), COLUMNAS, cancelado=cancelado)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_docx(tmp_path):
+    pytest.importorskip("docx")
+    ruta = str(tmp_path / "c.docx")
+    pedidos = []
+
+    def traer(ids):
+        pedidos.append(list(ids))
+        return {i: f"cuerpo {i}\nsegunda línea \x0b" for i in ids}
+
+    assert exportar_docx(ruta, _registros(5), traer, titulo="Compendio", tanda=2) == 5
+    assert pedidos == [[0, 1], [2, 3], [4]]
+    with zipfile.ZipFile(ruta) as z:
+        xml = z.read("word/document.xml").decode("utf-8")
+        assert "[Content_Types].xml" in z.namelist()
+    assert xml.count('w:val="Heading1"') == 2  # DAÑOS y FAMILIA
+    assert "Autos 4, &quot;x&quot;" in xml or 'Autos 4, "x"' in xml
+    assert "cuerpo 4</w:t><w:br/>" in xml and "\x0b" not in xml
+
+    import docx
+    documento = docx.Document(io.BytesIO(open(ruta, "rb").read()))
+    textos = [p.text for p in documento.paragraphs]
+    assert textos[0] == "Compendio" and "Autos 0, \"x\"" in textos
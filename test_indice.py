@@ -0,0 +1,96 @@
+import indice
+from indice import IndiceTexto, analizar, normalizar
+
+
+def _indice(filas):
+    idx = IndiceTexto()
+    for f in filas:
+        idx.agregar_fila(f)
+    return idx
+
+
+def test_normalizar_saca_tildes():
+    assert normalizar("Cámara DAÑOS") == "camara danos"
+
+
+def test_analizar_clausulas():
+    assert analizar('daño "mala praxis" resp* AND') == [
+        ("termino", "dano"), ("frase", ["mala", "praxis"]), ("prefijo", "resp"),
+    ]
+
+
+def test_prefijo_recortado_no_es_completo(monkeypatch):
+    monkeypatch.setattr(indice, "MAX_EXPANSION_PREFIJO", 3)
+    idx = _indice([{"id": i, "autos": f"d{i:03d}"} for i in range(10)] + [{"id": 999, "autos": "dzeta"}])
+
+    estado = {}
+    amplio = [i for i, _ in idx.buscar("d*", estado=estado)]
+    assert not estado["completa"]
+    assert 999 not in amplio  # quedó afuera por el tope
+
+    # refinar sobre un resultado recortado perdería el 999; sin refinar aparece
+    assert [i for i, _ in idx.buscar("dz*")] == [999]
+    estado = {}
+    idx.buscar("dz*", estado=estado)
+    assert estado["completa"]
+
+
+def test_version_sube_al_indexar():
+    idx = _indice([{"id": 1, "autos": "uno"}])
+    antes = idx.version
+    idx.agregar_cuerpo(1, "texto nuevo")
+    assert idx.version > antes
+    antes = idx.version
+    idx.quitar(1)
+    assert idx.version > antes
+    assert idx.buscar("uno") == []
+
+
+def test_bm25_ordena_por_relevancia():
+    idx = _indice([
+        {"id": 1, "autos": "perez c/ gomez", "voces": "daños"},
+        {"id": 2, "autos": "lopez c/ daños", "voces": "daños daños"},
+        {"id": 3, "autos": "garcia c/ ruiz", "voces": "alimentos"},
+    ])
+    idx.agregar_cuerpo(1, "un texto muy largo " * 50 + "daños")
+    assert [i for i, _ in idx.buscar("DAÑOS")] == [2, 1]
+    # AND: tienen que estar todos los términos
+    assert [i for i, _ in idx.buscar("daños y gomez")] == [1]
+    # un término raro pesa más que uno común
+    idx2 = _indice([{"id": i, "voces": "comun"} for i in range(10)] + [{"id": 10, "voces": "comun raro"}])
+    puntajes = dict(idx2.buscar("comun"))
+    assert dict(idx2.buscar("raro"))[10] > puntajes[10]
+
+
+def test_prefijo_expande_terminos():
+    idx = _indice([
+        {"id": 1, "voces": "responsabilidad"},
+        {"id": 2, "voces": "respuesta"},
+        {"id": 3, "voces": "resarcimiento"},
+    ])
+    assert sorted(i for i, _ in idx.buscar("resp*")) == [1, 2]
+    assert sorted(i for i, _ in idx.buscar("res*")) == [1, 2, 3]
+    assert idx.buscar("resp* resarc*") == []
+
+
+def test_frase_se_confirma_con_el_texto():
+    idx = _indice([{"id": 1, "autos": "mala praxis medica"}, {"id": 2, "autos": "praxis de la mala fe"}])
+    textos = {1: "Mala praxis médica", 2: "praxis de la mala fe"}
+    assert sorted(i for i, _ in idx.buscar('"mala praxis"')) == [1, 2]  # sin verificar: AND
+    assert [i for i, _ in idx.buscar('"mala praxis"', verificar=lambda ids: textos)] == [1]
+
+
+def test_dentro_de_refina():
+    idx = _indice([{"id": i, "voces": "daños"} for i in range(5)])
+    assert [i for i, _ in idx.buscar("daños", dentro_de=[1, 3])] == [1, 3]
+
+
+def test_consulta_sin_terminos_no_es_base_para_refinar():
+    idx = _indice([{"id": 1, "autos": "dano"}, {"id": 2, "autos": "delito"}])
+    for vacia in ("y ", "- ", ""):
+        estado = {}
+        assert idx.buscar(vacia, estado=estado) == []
+        assert not estado["completa"]
+    # "y " y después "y d": se busca de cero, no dentro del resultado vacío
+    assert idx.buscar("y d*") == idx.buscar("d*")
+    assert sorted(i for i, _ in idx.buscar("y d*")) == [1, 2]
@@ -0,0 +1,144 @@
+import random
+
+import informacion
+from informacion import AlturasFilas, BarraPaginas, CacheAlturas, IndiceGrupos, clave_orden, grupo_de
+
+
+def test_alturas_offset_y_fila_en_contra_suma_directa():
+    azar = random.Random(6)
+    altos = [azar.randint(20, 400) for _ in range(257)]
+    filas = AlturasFilas(altos)
+    for _ in range(300):
+        i = azar.randrange(len(altos))
+        altos[i] = azar.randint(0, 400)
+        filas.actualizar(i, altos[i])
+    assert filas.total() == sum(altos)
+    for i in range(len(altos) + 1):
+        assert filas.offset(i) == sum(altos[:i])
+    for y in (0, 1, 999, sum(altos) // 2, sum(altos) - 1):
+        i = filas.fila_en(y)
+        assert filas.offset(i) <= y < filas.offset(i) + altos[i] or altos[i] == 0
+
+
+def test_alturas_actualizar_devuelve_el_delta_y_fila_en_acota():
+    filas = AlturasFilas([10, 20, 30])
+    assert filas.actualizar(1, 25) == 5
+    assert filas.actualizar(1, 25) == 0
+    assert [filas[i] for i in range(len(filas))] == [10, 25, 30]
+    assert filas.fila_en(-5) == 0
+    assert filas.fila_en(10_000) == 2
+    assert AlturasFilas().fila_en(100) == 0
+
+
+class _Fuente:
+    """Métricas fijas en lugar de tkfont.Font (no hace falta un Tk)."""
+
+    def __init__(self, root=None, font=None):
+        pass
+
+    def metrics(self, que):
+        return 15
+
+    def measure(self, texto):
+        return 7 * len(texto)
+
+
+def _cache_alturas(monkeypatch):
+    monkeypatch.setattr(informacion.tkfont, "Font", _Fuente)
+    return CacheAlturas(None)
+
+
+def test_cache_alturas_medida_estimada_y_olvidar(monkeypatch):
+    cache = _cache_alturas(monkeypatch)
+    corto = {"id": 1, "autos": "Perez c/ Gomez"}
+    largo = {"id": 2, "autos": "x" * 5000}
+    assert cache.alto(largo, 600) > cache.alto(corto, 600)
+    assert cache.alto(largo, 300) > cache.alto(largo, 600)  # más angosto, más líneas
+
+    estimado = cache.alto(corto, 600)
+    cache.medir(corto, 600, estimado + 40)
+    assert cache.alto(corto, 600) == estimado + 40
+    # el error observado corrige la estimación de los que no se midieron
+    assert cache.alto(largo, 600) > cache._base(largo, 600)
+
+    cache.olvidar(1)
+    assert 1 not in cache._medidas and 1 not in cache._estimadas
+    # vuelve a ser una estimación (corregida), no la medida vieja
+    assert cache.alto(corto, 600) == cache._base(corto, 600) + round(cache._error)
+    assert 1 not in cache._medidas
+    assert 2 in cache._estimadas  # los demás no se tocan
+
+
+def _reconstruido(datos):
+    grupos = IndiceGrupos()
+    grupos.reconstruir(datos)
+    return grupos
+
+
+def test_grupos_rangos_y_secciones():
+    datos = sorted(
+        [{"id": i, "tema": t, "subtema": st} for i, (t, st) in enumerate(
+            [("A", "x"), ("A", "x"), ("A", None), ("B", "y"), ("C", None), ("C", None)])],
+        key=clave_orden,
+    )
+    grupos = _reconstruido(datos)
+    assert grupos.rango("A") == (0, 3)
+    assert grupos.rango("A", "SIN SUBTEMA") == (0, 1)
+    assert grupos.rango("C") == (4, 6) and grupos.cantidad("B", "y") == 1
+    assert grupos.rango("Z") is None and grupos.cantidad("Z") == 0
+    assert grupos.secciones() == [
+        ("A", 3, [("SIN SUBTEMA", 1), ("x", 2)]), ("B", 1, [("y", 1)]), ("C", 2, [("SIN SUBTEMA", 2)]),
+    ]
+
+
+def test_grupos_quitar_e_insertar_igual_que_reconstruir():
+    azar = random.Random(14)
+    temas = ["A", "B", "C", "D"]
+    datos = sorted(
+        ({"id": i, "tema": azar.choice(temas), "subtema": azar.choice(["x", "y", None])} for i in range(60)),
+        key=clave_orden,
+    )
+    grupos = _reconstruido(datos)
+    for _ in range(200):
+        # una edición de tema/subtema: sale de su lugar y entra en el nuevo
+        pos = azar.randrange(len(datos))
+        reg = datos.pop(pos)
+        grupos.quitar(pos, *grupo_de(reg))
+        reg = dict(reg, tema=azar.choice(temas + ["E"]), subtema=azar.choice(["x", None]))
+        nueva = 0
+        while nueva < len(datos) and clave_orden(datos[nueva]) < clave_orden(reg):
+            nueva += 1
+        datos.insert(nueva, reg)
+        grupos.insertar(nueva, *grupo_de(reg))
+
+        esperado = _reconstruido(datos)
+        assert grupos.temas == esperado.temas
+        assert grupos.subtemas == esperado.subtemas
+
+
+def test_numeros_de_la_barra():
+    numeros = BarraPaginas.numeros
+    assert numeros(1, 1) == [1]
+    assert numeros(4, 9, vecinas=2) == list(range(1, 10))
+    assert numeros(1, 250, vecinas=2) == [1, 2, 3, 4, 5, 6, 7, None, 250]
+    assert numeros(125, 250, vecinas=2) == [1, None, 123, 124, 125, 126, 127, None, 250]
+    assert numeros(250, 250, vecinas=2) == [1, None, 244, 245, 246, 247, 248, 249, 250]
+    # «…» nunca tapa una sola página
+    assert numeros(5, 250, vecinas=2) == [1, 2, 3, 4, 5, 6, 7, None, 250]
+
+
+def test_numeros_siempre_entran_en_los_huecos():
+    for vecinas in (1, 2, 3):
+        huecos = 2 * vecinas + 5
+        for total in range(1, 40):
+            for actual in range(1, total + 1):
+                n = BarraPaginas.numeros(actual, total, vecinas)
+                paginas = [p for p in n if p is not None]
+                assert len(n) <= huecos
+                assert paginas == sorted(set(paginas))
+                assert paginas[0] == 1 and paginas[-1] == total
+                assert all(p in paginas for p in range(max(1, actual - vecinas), min(total, actual + vecinas) + 1))
+                # cada «…» tapa al menos dos páginas
+                for i, p in enumerate(n):
+                    if p is None:
+                        assert n[i + 1] - n[i - 1] > 2
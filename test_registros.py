@@ -0,0 +1,43 @@
+import pytest
+
+from registros import Registro, registros
+
+
+def test_se_usa_como_dict():
+    fila = {"id": 7, "tema": "DAÑOS", "autos": "Perez c/ Gomez", "updated_at": "2024-01-01"}
+    reg = Registro(fila)
+    assert dict(reg) == fila
+    assert reg["id"] == 7 and reg.get("voces") is None and reg.get("voces", "-") == "-"
+    assert "tema" in reg and "voces" not in reg and "updated_at" in reg and "otro" not in reg
+    assert list(reg.keys()) == ["id", "tema", "autos", "updated_at"]
+    assert len(reg) == 4
+    with pytest.raises(KeyError):
+        reg["voces"]
+    with pytest.raises(KeyError):
+        reg["otro"]
+
+
+def test_escritura_y_pop():
+    reg = Registro(id=1)
+    reg.update({"tema": "X"}, voces="a; b")
+    reg["extra"] = 3
+    assert dict(reg) == {"id": 1, "tema": "X", "voces": "a; b", "extra": 3}
+    assert reg.pop("voces") == "a; b" and "voces" not in reg
+    assert reg.pop("extra") == 3 and reg.pop("extra", None) is None
+    with pytest.raises(KeyError):
+        reg.pop("voces")
+    reg.clear()
+    assert dict(reg) == {}
+
+
+def test_ida_y_vuelta_y_copia():
+    filas = [{"id": i, "tema": "T", "fecha": None, "link_fallo": ""} for i in range(3)]
+    regs = registros(filas)
+    assert [dict(r) for r in regs] == filas
+    assert dict(regs[0], jurisprudencia="x") == dict(filas[0], jurisprudencia="x")
+
+
+def test_categoricos_internados():
+    a = Registro({"tema": "".join(["DAÑOS ", "Y PERJUICIOS"])})
+    b = Registro({"tema": "".join(["DAÑOS Y ", "PERJUICIOS"])})
+    assert a["tema"] is b["tema"]